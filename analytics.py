@@ -0,0 +1,172 @@
+import argparse
+import csv
+from datetime import datetime, timezone
+
+from parquet_export import PARQUET_PATH, _require_pyarrow, schema
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = None
+
+ENGAGEMENT_AGGREGATES = [
+    ("tweet_id", "count"),
+    ("likes", "sum"),
+    ("retweets", "sum"),
+    ("replies", "sum"),
+    ("views", "sum"),
+    ("engagement", "mean"),
+    ("health", "mean"),
+]
+
+
+def _utc(value):
+    """datetime for "2025-10-01" / ISO strings (naive values are UTC); datetimes pass through."""
+    if value is None or isinstance(value, datetime):
+        return value
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+# ----------------------------------------------------------
+# 🔎 Filtered reads
+# ----------------------------------------------------------
+def dataset(path=PARQUET_PATH):
+    """
+    The exported dataset, with `account` recovered from the hive partition directories.
+
+    Read with the export schema, so partitions written before a column
+    existed read it as null.
+    """
+    _require_pyarrow()
+    return ds.dataset(path, schema=schema(), format="parquet", partitioning="hive")
+
+
+def load(path=PARQUET_PATH, accounts=None, since=None, until=None, health=None, columns=None):
+    """
+    Read only the tweets a query needs.
+
+    Account filters prune whole partition directories, and time/health
+    filters are pushed down to the Parquet row groups, so the rest of the
+    archive is never decoded.
+
+    Args:
+        accounts: Usernames to keep (None = all)
+        since / until: Datetimes or ISO dates bounding created_at (until is exclusive)
+        health: True/False to filter on the health verdict
+        columns: Columns to read (None = all)
+    """
+    condition = None
+
+    def add(expression):
+        nonlocal condition
+        condition = expression if condition is None else condition & expression
+
+    if accounts:
+        add(ds.field("account").isin([a.lower() for a in accounts]))
+    if since is not None:
+        add(ds.field("created_at") >= pa.scalar(_utc(since), pa.timestamp("s", tz="UTC")))
+    if until is not None:
+        add(ds.field("created_at") < pa.scalar(_utc(until), pa.timestamp("s", tz="UTC")))
+    if health is not None:
+        add(ds.field("is_health") == bool(health))
+    return dataset(path).to_table(columns=columns, filter=condition)
+
+
+# ----------------------------------------------------------
+# 📊 Aggregates
+# ----------------------------------------------------------
+def _with_metrics(table):
+    """
+    Add engagement (likes + retweets + replies) and health (verdict as 0/1).
+
+    health is null unless the row is `classified`: health-dump rows are all
+    positives, so counting them would report a share of 1.0 for accounts
+    whose timelines were never classified as a whole. health_share is
+    therefore null for such accounts.
+    """
+    zero = pa.scalar(0, pa.int64())
+    engagement = pc.add(pc.add(pc.coalesce(table["likes"], zero), pc.coalesce(table["retweets"], zero)),
+                        pc.coalesce(table["replies"], zero))
+    table = table.append_column("engagement", engagement)
+    if "classified" not in table.column_names:
+        return table.append_column("health", pa.nulls(table.num_rows, pa.float64()))
+    classified = pc.fill_null(table["classified"], False)
+    health = pc.if_else(classified, pc.cast(table["is_health"], pa.float64()), pa.scalar(None, pa.float64()))
+    return table.append_column("health", health)
+
+
+def _aggregate(table, keys):
+    result = _with_metrics(table).group_by(keys).aggregate(ENGAGEMENT_AGGREGATES)
+    names = {
+        "tweet_id_count": "tweets",
+        "engagement_mean": "mean_engagement",
+        "health_mean": "health_share",
+    }
+    result = result.rename_columns([names.get(n, n) for n in result.column_names])
+    return result.sort_by([(k, "ascending") for k in keys])
+
+
+def per_account(table):
+    """Tweets, total likes/retweets/replies/views, mean engagement and health share per account."""
+    return _aggregate(table, ["account"])
+
+
+def per_week(table):
+    """The same aggregates per account and week (weeks start on Monday, UTC)."""
+    week = pc.floor_temporal(table["created_at"], unit="week", week_starts_monday=True)
+    return _aggregate(table.append_column("week", week), ["account", "week"])
+
+
+def print_table(table):
+    rows = table.to_pylist()
+    if not rows:
+        print("(no tweets match)")
+        return
+    headers = table.column_names
+
+    def cell(value):
+        if isinstance(value, float):
+            return f"{value:.3f}"
+        if isinstance(value, datetime):
+            return value.date().isoformat()
+        return "" if value is None else str(value)
+
+    cells = [[cell(row[h]) for h in headers] for row in rows]
+    widths = [max(len(h), *(len(r[i]) for r in cells)) for i, h in enumerate(headers)]
+    print("  ".join(h.ljust(w) for h, w in zip(headers, widths)))
+    for row in cells:
+        print("  ".join(c.ljust(w) for c, w in zip(row, widths)))
+
+
+def write_csv(table, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(table.column_names)
+        for row in table.to_pylist():
+            writer.writerow([row[h] for h in table.column_names])
+    print(f"💾 Saved {table.num_rows} rows to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Engagement and health-share aggregates over the Parquet export.")
+    parser.add_argument("report", choices=["accounts", "weekly"])
+    parser.add_argument("--path", default=PARQUET_PATH)
+    parser.add_argument("--account", action="append", help="Only this username (repeatable)")
+    parser.add_argument("--since", help="ISO date, e.g. 2025-01-01")
+    parser.add_argument("--until", help="ISO date (exclusive)")
+    parser.add_argument("--health", action="store_true", help="Only health-related tweets")
+    parser.add_argument("--csv", help="Also write the result to this CSV file")
+    args = parser.parse_args()
+
+    # e.g. python analytics.py weekly --account WilliamsRuto --since 2025-09-01
+    table = load(args.path, accounts=args.account, since=args.since, until=args.until,
+                 health=True if args.health else None,
+                 columns=["account", "tweet_id", "created_at", "likes", "retweets", "replies", "views",
+                          "is_health", "classified"])
+    result = per_account(table) if args.report == "accounts" else per_week(table)
+    print_table(result)
+    if args.csv:
+        write_csv(result, args.csv)
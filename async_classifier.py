@@ -0,0 +1,222 @@
+import asyncio
+import collections
+import random
+import threading
+import time
+
+import environ
+
+import metrics
+from key_pool import KeyPool, openai_keys
+from ratelimit import retry_after_seconds
+
+# ----------------------------------------------------------
+# ⚙️ Load environment variables
+# ----------------------------------------------------------
+env = environ.Env()
+env.read_env()
+
+# Send classification requests through the async engine (False = one blocking call at a time)
+ASYNC_LLM = env.bool("ASYNC_LLM", default=True)
+# Chat completions in flight at once, across every thread of the process
+LLM_CONCURRENCY = env.int("LLM_CONCURRENCY", default=8)
+# Account limits of the OpenAI organisation for the classifier model
+OPENAI_RPM = env.int("OPENAI_RPM", default=500)
+OPENAI_TPM = env.int("OPENAI_TPM", default=200_000)
+LLM_MAX_RETRIES = env.int("LLM_MAX_RETRIES", default=6)
+
+WINDOW = 60.0
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+
+def estimate_tokens(request):
+    """Rough token count of a chat request (4 characters per token) plus its completion allowance."""
+    chars = sum(len(m.get("content") or "") for m in request.get("messages", []))
+    return chars // 4 + (request.get("max_tokens") or 16)
+
+
+# ----------------------------------------------------------
+# 🪣 Requests/tokens per minute budget
+# ----------------------------------------------------------
+class MinuteBudget:
+    """
+    Sliding one-minute window over requests and tokens.
+
+    acquire() waits until one more request of the estimated size fits both
+    limits; settle() swaps the estimate for the real usage once known;
+    pause() holds every caller back after a rate-limit error.
+
+    Args:
+        rpm: Requests per minute
+        tpm: Tokens per minute
+    """
+
+    def __init__(self, rpm=OPENAI_RPM, tpm=OPENAI_TPM):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._window = collections.deque()
+        self._tokens = 0
+        self._paused_until = 0.0
+        self._lock = None
+
+    def _prune(self, now):
+        while self._window and self._window[0][0] <= now - WINDOW:
+            self._tokens -= self._window.popleft()[1][0]
+
+    async def acquire(self, tokens):
+        """Reserve a request slot; returns a handle for settle()."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._prune(now)
+                fits_tpm = self._tokens + tokens <= self.tpm or not self._window
+                if len(self._window) < self.rpm and fits_tpm:
+                    entry = [tokens]
+                    self._window.append((now, entry))
+                    self._tokens += tokens
+                    return entry
+                await asyncio.sleep(max(self._window[0][0] + WINDOW - now, 0.05))
+
+    def settle(self, entry, actual_tokens):
+        """Replace a reservation's estimate with the tokens the API actually billed."""
+        if actual_tokens and any(e is entry for _, e in self._window):
+            self._tokens += actual_tokens - entry[0]
+            entry[0] = actual_tokens
+
+    def pause(self, seconds):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+# ----------------------------------------------------------
+# ⚡ Async chat-completions engine
+# ----------------------------------------------------------
+class AsyncLLMEngine:
+    """
+    AsyncOpenAI on a private event loop, shared by every thread of the process.
+
+    Callers stay synchronous: complete_many() schedules one coroutine per
+    request on the engine's loop and returns the answers in input order. A
+    semaphore bounds the requests in flight and MinuteBudget keeps them under
+    the RPM/TPM limits; rate-limit errors back off with full jitter (or the
+    server's Retry-After) and are retried.
+
+    With several keys (OPENAI_API_KEYS) every key gets its own client and
+    budget, requests go to the least-loaded key that isn't cooling down, and
+    a rate-limited request is retried on another key straight away.
+
+    Args:
+        concurrency: Maximum requests in flight
+        rpm / tpm: Requests and tokens per minute, per key
+        max_retries: Rate-limit / server-error retries per request
+    """
+
+    def __init__(self, concurrency=LLM_CONCURRENCY, rpm=OPENAI_RPM, tpm=OPENAI_TPM, max_retries=LLM_MAX_RETRIES):
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.rpm = rpm
+        self.tpm = tpm
+        self.keys = None
+        self._budgets = {}
+        self._clients = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-engine", daemon=True)
+        self._thread.start()
+        self._semaphore = None
+
+    def _setup(self):
+        if self.keys is None:
+            from openai import AsyncOpenAI
+
+            self.keys = KeyPool("openai", openai_keys())
+            for key in self.keys.keys:
+                # OPENAI_BASE_URL comes from the environment; retries are ours
+                self._clients[key.label] = AsyncOpenAI(api_key=key.value, max_retries=0)
+                self._budgets[key.label] = MinuteBudget(self.rpm, self.tpm)
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def _acquire_key(self):
+        while True:
+            key, wait = self.keys.try_acquire()
+            if key is not None:
+                return key
+            await asyncio.sleep(wait)
+
+    async def _complete(self, request):
+        import openai
+
+        self._setup()
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                key = await self._acquire_key()
+                budget = self._budgets[key.label]
+                entry = await budget.acquire(estimate_tokens(request))
+                started = time.perf_counter()
+                try:
+                    response = await self._clients[key.label].chat.completions.create(**request)
+                except (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError) as e:
+                    headers = getattr(getattr(e, "response", None), "headers", None)
+                    wait = retry_after_seconds(headers) if headers else None
+                    if wait is None:
+                        wait = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+                    rate_limited = isinstance(e, openai.RateLimitError)
+                    self.keys.release(key, headers, rate_limited=rate_limited, wait=wait)
+                    if rate_limited:
+                        metrics.count("llm_429s")
+                        budget.pause(wait)
+                    metrics.count("llm_retries")
+                    # Another key can take the retry at once; with one key (or none healthy) wait it out
+                    if not rate_limited or len(self.keys) == 1:
+                        print(f"⏳ {type(e).__name__}, retrying in {wait:.1f}s...")
+                        await asyncio.sleep(wait)
+                    continue
+                except openai.OpenAIError as e:
+                    self.keys.release(key)
+                    metrics.count("llm_errors")
+                    print(f"⚠️ OpenAI error: {e}")
+                    return None
+                finally:
+                    metrics.observe("llm_request", time.perf_counter() - started)
+
+                self.keys.release(key)
+                metrics.record_llm_usage(response)
+                usage = getattr(response, "usage", None)
+                budget.settle(entry, getattr(usage, "total_tokens", 0))
+                return response.choices[0].message.content
+
+        metrics.count("llm_errors")
+        print(f"⚠️ Still failing after {self.max_retries} retries")
+        return None
+
+    def complete_many(self, requests):
+        """
+        Run chat completions concurrently.
+
+        Args:
+            requests: Keyword arguments for chat.completions.create, one dict per request
+
+        Returns:
+            The reply text of each request (None where it failed), in input order.
+        """
+        futures = [asyncio.run_coroutine_threadsafe(self._complete(r), self._loop) for r in requests]
+        return [f.result() for f in futures]
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_engine():
+    """Process-wide engine, or None when ASYNC_LLM is off."""
+    global _shared
+    if not ASYNC_LLM:
+        return None
+    with _shared_lock:
+        if _shared is None:
+            _shared = AsyncLLMEngine()
+        return _shared
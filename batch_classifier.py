@@ -0,0 +1,218 @@
+import json
+import re
+import time
+
+import metrics
+from async_classifier import get_engine
+from classification_cache import get_cache, prompt_version
+from local_classifier import first_stage
+import near_duplicates
+
+# ----------------------------------------------------------
+# 📦 Batch prompt: N numbered tweets in, N verdicts out
+# ----------------------------------------------------------
+BATCH_PROMPT = """You classify tweets. Apply these instructions to EACH numbered tweet independently:
+
+{criteria}
+
+Reply with a JSON object of the form {{"verdicts": [true, false, ...]}} containing exactly {count} booleans,
+one per tweet, in the same order as the numbering. true means health-related."""
+
+_ARRAY_RE = re.compile(r"\[.*\]", re.DOTALL)
+
+
+def batch_version(version):
+    """Cache version for verdicts produced by the batch prompt of a given per-tweet classifier."""
+    return prompt_version(version, BATCH_PROMPT)
+
+
+def parse_verdicts(answer, expected):
+    """
+    Parse a batch reply into a list of booleans.
+
+    Returns None when the reply is malformed or has the wrong length so the
+    caller can fall back to per-tweet classification.
+    """
+    try:
+        data = json.loads(answer)
+    except (TypeError, ValueError):
+        match = _ARRAY_RE.search(answer or "")
+        if not match:
+            return None
+        try:
+            data = json.loads(match.group(0))
+        except ValueError:
+            return None
+
+    if isinstance(data, dict):
+        data = data.get("verdicts")
+    if not isinstance(data, list) or len(data) != expected:
+        return None
+
+    verdicts = []
+    for value in data:
+        if isinstance(value, bool):
+            verdicts.append(value)
+        elif isinstance(value, str) and value.strip().lower() in ("true", "yes", "false", "no"):
+            verdicts.append(value.strip().lower() in ("true", "yes"))
+        else:
+            return None
+    return verdicts
+
+
+def batch_request(texts, criteria, model="gpt-4o-mini", temperature=0):
+    """chat.completions.create() arguments asking for one JSON verdict per tweet."""
+    numbered = "\n\n".join(f"{i}. {json.dumps(text, ensure_ascii=False)}" for i, text in enumerate(texts, 1))
+    return dict(
+        model=model,
+        messages=[
+            {"role": "system", "content": BATCH_PROMPT.format(criteria=criteria.strip(), count=len(texts))},
+            {"role": "user", "content": numbered},
+        ],
+        response_format={"type": "json_object"},
+        max_tokens=20 + 8 * len(texts),
+        temperature=temperature
+    )
+
+
+def classify_batch(client, texts, criteria, model="gpt-4o-mini", temperature=0):
+    """Classify several tweets with one chat completion. Returns a list of bools or None."""
+    try:
+        with metrics.timer("llm_request"):
+            response = client.chat.completions.create(**batch_request(texts, criteria, model, temperature))
+        metrics.record_llm_usage(response)
+        answer = response.choices[0].message.content
+    except Exception as e:
+        metrics.count("llm_errors")
+        print(f"⚠️ Batch classification failed: {e}")
+        return None
+
+    return parse_verdicts(answer, len(texts))
+
+
+# ----------------------------------------------------------
+# 🧠 Cache-aware batch driver shared by all scripts
+# ----------------------------------------------------------
+def classify_many(client, items, criteria, version, classify_one, batch_size=20,
+                  model="gpt-4o-mini", temperature=0, precheck=None, langs=None,
+                  single_request=None, parse_single=None):
+    """
+    Classify (tweet_id, text) pairs, packing cache misses into batches.
+
+    Order of stages: near-duplicate clustering, precheck, verdict cache, local
+    model (CLASSIFIER_BACKEND), then batched LLM requests for whatever is still
+    undecided. Only one tweet per near-duplicate cluster goes through the
+    stages; the others get its verdict. With ASYNC_LLM on (the default) the
+    LLM batches are sent concurrently through the async engine. A chunk of
+    one tweet (or a tweet of a malformed batch reply) always uses the
+    per-tweet prompt: through the engine when single_request is given, so it
+    shares the engine's concurrency limit, budget and rate-limit retries,
+    otherwise through classify_one.
+
+    Args:
+        client: OpenAI client
+        items: List of (tweet_id, text) pairs
+        criteria: Classification instructions shown to the model
+        version: Prompt version of the per-tweet classifier (see classification_cache)
+        classify_one: Per-tweet fallback, called as classify_one(text, tweet_id)
+        batch_size: Tweets per request; 1 = one per-tweet prompt per tweet
+        precheck: Optional function(text, lang) returning True/False to skip the LLM, or None
+        langs: Optional tweet language per item (twitterapi.io `lang`), passed to precheck
+        single_request: Optional function(text) returning the chat.completions.create()
+            arguments of classify_one's prompt
+        parse_single: Function(answer) turning a reply to single_request into True/False
+
+    Returns:
+        A list of True/False verdicts, in the same order as items (None for a tweet
+        the engine still couldn't classify after its retries).
+    """
+    started = time.perf_counter()
+    cache = get_cache()
+    single_version, version = version, batch_version(version)
+    results = [None] * len(items)
+    pending = []
+
+    langs = langs if langs is not None else [None] * len(items)
+    dedup = near_duplicates.index if near_duplicates.NEAR_DUPLICATES else None
+    clusters = [None] * len(items)
+    leaders = {}
+    followers = []
+
+    for i, ((tweet_id, text), lang) in enumerate(zip(items, langs)):
+        if dedup is not None:
+            clusters[i] = cluster = dedup.cluster(text)
+            if cluster is not None:
+                known = dedup.verdict(cluster, version)
+                if known is not None:
+                    results[i] = known
+                    continue
+                if cluster in leaders:
+                    followers.append((i, leaders[cluster]))
+                    continue
+                leaders[cluster] = i
+
+        verdict = precheck(text, lang) if precheck else None
+        if verdict is None:
+            verdict = cache.get(tweet_id, text, version)
+        if verdict is None:
+            pending.append(i)
+        else:
+            results[i] = verdict
+
+    # Optional offline model (CLASSIFIER_BACKEND=local/hybrid) before any OpenAI request
+    local = first_stage([items[i][1] for i in pending]) if pending else None
+    if local is not None:
+        for i, verdict in zip(pending, local):
+            results[i] = verdict
+        pending = [i for i, verdict in zip(pending, local) if verdict is None]
+
+    chunks = [pending[start:start + batch_size] for start in range(0, len(pending), max(batch_size, 1))]
+    # Single tweets go through the per-tweet prompt, so both paths cache them under the same version
+    batched = [chunk for chunk in chunks if len(chunk) > 1]
+    singles = [chunk[0] for chunk in chunks if len(chunk) == 1]
+    engine = get_engine()
+    if engine is not None:
+        # All chunks in flight at once (bounded by LLM_CONCURRENCY and the RPM/TPM budget), answers in order
+        answers = engine.complete_many([batch_request([items[i][1] for i in chunk], criteria, model, temperature)
+                                        for chunk in batched])
+        replies = [parse_verdicts(answer, len(chunk)) if answer is not None else None
+                   for chunk, answer in zip(batched, answers)]
+    else:
+        replies = [classify_batch(client, [items[i][1] for i in chunk], criteria, model, temperature)
+                   for chunk in batched]
+
+    for chunk, verdicts in zip(batched, replies):
+        if verdicts is None:
+            print(f"⚠️ Malformed batch reply, classifying {len(chunk)} tweets one by one")
+            singles.extend(chunk)
+            continue
+
+        for i, verdict in zip(chunk, verdicts):
+            results[i] = verdict
+            cache.set(items[i][0], items[i][1], version, verdict)
+
+    if engine is not None and single_request is not None:
+        # Per-tweet prompt through the engine, cached like classify_one caches it
+        for i in singles:
+            results[i] = cache.get(items[i][0], items[i][1], single_version)
+        asked = [i for i in singles if results[i] is None]
+        answers = engine.complete_many([single_request(items[i][1]) for i in asked])
+        for i, answer in zip(asked, answers):
+            if answer is None:
+                # Out of retries: left unclassified rather than guessed
+                continue
+            results[i] = parse_single(answer)
+            cache.set(items[i][0], items[i][1], single_version, results[i])
+    else:
+        for i in singles:
+            results[i] = classify_one(items[i][1], items[i][0])
+
+    for cluster, i in leaders.items():
+        if results[i] is not None:
+            dedup.set_verdict(cluster, version, results[i])
+    for i, leader in followers:
+        results[i] = results[leader]
+
+    metrics.count("classified_tweets", len(items))
+    metrics.observe("classification", time.perf_counter() - started)
+    return results
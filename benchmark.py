@@ -0,0 +1,222 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from mock_servers import MockOpenAIServer, MockTwitterServer, Timelines, load_fixtures, start
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCENARIOS = ("getalltweets", "tweety", "multi-account")
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+# ----------------------------------------------------------
+# 🏃 One scenario (runs in a fresh child process)
+# ----------------------------------------------------------
+def run_scenario(scenario, users, max_tweets):
+    """Run one script flow in this process; returns timings and peak memory."""
+    import twitter_client
+
+    latencies = []
+    last_tweets = twitter_client.TwitterAPIClient.last_tweets
+
+    def timed_last_tweets(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return last_tweets(self, *args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    twitter_client.TwitterAPIClient.last_tweets = timed_last_tweets
+
+    started = time.perf_counter()
+    if scenario == "getalltweets":
+        import getalltweets
+        for user in users:
+            getalltweets.main(user, max_tweets=max_tweets, incremental=False)
+    elif scenario == "tweety":
+        import tweety
+        for user in users:
+            tweety.main(user, max_tweets=max_tweets, incremental=False)
+    elif scenario == "multi-account":
+        import influencertweetscrape
+        influencertweetscrape.process_accounts(users)
+    else:
+        raise ValueError(f"Unknown scenario {scenario!r}")
+    elapsed = time.perf_counter() - started
+
+    return {
+        "elapsed": elapsed,
+        "page_latencies": latencies,
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def _child_env(workdir, twitter_url, openai_url, rate):
+    state = os.path.join(workdir, ".cache")
+    return dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join(filter(None, [HERE, os.environ.get("PYTHONPATH")])),
+        TWITTER_API_KEY="benchmark",
+        OPENAI_API_KEY="benchmark",
+        TWITTER_API_BASE_URL=twitter_url,
+        OPENAI_BASE_URL=openai_url,
+        TWITTER_API_RATE=str(rate),
+        TWITTER_API_MAX_RATE=str(rate * 2),
+        RATE_LIMIT_STATE=os.path.join(state, "ratelimit.sqlite3"),
+        CLASSIFICATION_CACHE=os.path.join(state, "classifications.sqlite3"),
+        CHECKPOINT_DIR=os.path.join(state, "checkpoints"),
+        WATERMARK_PATH=os.path.join(workdir, "data", "watermarks.json"),
+        TWEET_STORE=os.path.join(workdir, "data", "tweets.sqlite3"),
+        # Every request has to reach the stand-in server to be measured
+        TWITTER_CACHE="off",
+    )
+
+
+# ----------------------------------------------------------
+# 📊 Harness
+# ----------------------------------------------------------
+def benchmark(scenarios=SCENARIOS, users=("MoghaluGeorge",), max_tweets=400, tweets_per_user=400,
+              api_latency=0.05, llm_latency=0.2, rate_limit_ratio=0.0, rate=50.0, verbose=False):
+    """
+    Run each scenario against the local stand-in servers, in a clean working
+    directory and a fresh process, and collect its numbers.
+
+    Args:
+        scenarios: Any of "getalltweets", "tweety", "multi-account"
+        users: Accounts to crawl (any name works; timelines are generated from data/)
+        max_tweets: Tweets per account for getalltweets / tweety
+        tweets_per_user: Length of each generated timeline
+        api_latency: Mean seconds per twitterapi.io page
+        llm_latency: Mean seconds per chat completion
+        rate_limit_ratio: Share of pages answered with 429
+        rate: Starting request rate of the adaptive limiter (req/s)
+        verbose: Show the scripts' own output
+    """
+    twitter = start(MockTwitterServer(Timelines(load_fixtures(os.path.join(HERE, "data")), tweets_per_user),
+                                      latency=api_latency, rate_limit_ratio=rate_limit_ratio))
+    openai = start(MockOpenAIServer(latency=llm_latency))
+    results = {}
+
+    try:
+        for scenario in scenarios:
+            before_twitter, before_openai = dict(twitter.counters), dict(openai.counters)
+            with tempfile.TemporaryDirectory() as workdir, tempfile.NamedTemporaryFile("r", suffix=".json") as out:
+                command = [sys.executable, os.path.abspath(__file__), "--child", scenario,
+                           "--result", out.name, "--max-tweets", str(max_tweets), "--users", *users]
+                print(f"\n🏃 Running {scenario}...")
+                subprocess.run(
+                    command, cwd=workdir, check=True,
+                    env=_child_env(workdir, twitter.url, openai.url, rate),
+                    stdout=None if verbose else subprocess.DEVNULL,
+                )
+                child = json.load(out)
+
+            tweets = twitter.counters["tweets"] - before_twitter["tweets"]
+            results[scenario] = {
+                "tweets": tweets,
+                "seconds": round(child["elapsed"], 3),
+                "tweets_per_second": round(tweets / child["elapsed"], 1) if child["elapsed"] else 0.0,
+                "pages": len(child["page_latencies"]),
+                "page_p50_ms": round(percentile(child["page_latencies"], 50) * 1000, 1),
+                "page_p99_ms": round(percentile(child["page_latencies"], 99) * 1000, 1),
+                "peak_rss_mb": round(child["peak_rss_mb"], 1),
+                "api_requests": twitter.counters["requests"] - before_twitter["requests"],
+                "api_429s": twitter.counters["rate_limited"] - before_twitter["rate_limited"],
+                "llm_requests": openai.counters["requests"] - before_openai["requests"],
+            }
+    finally:
+        twitter.shutdown()
+        openai.shutdown()
+
+    return results
+
+
+# ----------------------------------------------------------
+# 🥶 Cold start
+# ----------------------------------------------------------
+COLD_START_COMMANDS = {
+    "cli --help": ["cli.py", "--help"],
+    "cli convert (empty)": ["cli.py", "convert", "--input", "empty", "--output", "csv"],
+    "import getalltweets": ["-c", "import getalltweets"],
+    "import + OpenAI client": ["-c", "import getalltweets; getalltweets.client.resolve()"],
+}
+
+
+def cold_start(runs=5):
+    """Median wall time of fresh interpreter starts for each COLD_START_COMMANDS entry, in ms."""
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        os.makedirs(os.path.join(workdir, "empty"))
+        env = _child_env(workdir, "http://127.0.0.1:9", "http://127.0.0.1:9/v1", 1.0)
+        for name, args in COLD_START_COMMANDS.items():
+            command = [sys.executable] + [os.path.join(HERE, a) if a.endswith(".py") else a for a in args]
+            timings = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                subprocess.run(command, cwd=workdir, env=env, check=True, stdout=subprocess.DEVNULL)
+                timings.append(time.perf_counter() - started)
+            results[name] = round(percentile(timings, 50) * 1000, 1)
+            print(f"🥶 {name:<26}{results[name]:>8.1f} ms")
+    return results
+
+
+def print_results(results):
+    print(f"\n{'scenario':<15}{'tweets':>8}{'tweets/s':>10}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'peak MB':>9}{'API req':>9}{'429s':>6}{'LLM req':>9}")
+    for scenario, r in results.items():
+        print(f"{scenario:<15}{r['tweets']:>8}{r['tweets_per_second']:>10.1f}{r['page_p50_ms']:>9.1f}"
+              f"{r['page_p99_ms']:>9.1f}{r['peak_rss_mb']:>9.1f}{r['api_requests']:>9}{r['api_429s']:>6}"
+              f"{r['llm_requests']:>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against local API stand-ins.")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--users", nargs="+", default=["MoghaluGeorge", "DrTedros", "melindagates"])
+    parser.add_argument("--max-tweets", type=int, default=400, help="Tweets per account (getalltweets/tweety)")
+    parser.add_argument("--tweets-per-user", type=int, default=400, help="Length of each generated timeline")
+    parser.add_argument("--api-latency", type=float, default=0.05, help="Mean seconds per twitterapi.io page")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Mean seconds per chat completion")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="Share of pages answered with 429")
+    parser.add_argument("--rate", type=float, default=50.0, help="Starting limiter rate in req/s")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show the scripts' output")
+    parser.add_argument("--cold-start", action="store_true", help="Only time interpreter start-up per entry point")
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_scenario(args.child, args.users, args.max_tweets)
+        with open(args.result, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        sys.exit(0)
+
+    if args.cold_start:
+        # e.g. python benchmark.py --cold-start --json cold.json
+        results = cold_start()
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+        sys.exit(0)
+
+    # e.g. python benchmark.py --scenarios getalltweets --rate-limit-ratio 0.05 --json before.json
+    results = benchmark(args.scenarios, args.users, args.max_tweets, args.tweets_per_user, args.api_latency,
+                        args.llm_latency, args.rate_limit_ratio, args.rate, args.verbose)
+    print_results(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Saved results to {args.json}")
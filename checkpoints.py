@@ -0,0 +1,99 @@
+import json
+import os
+import re
+import shutil
+
+import environ
+
+# ----------------------------------------------------------
+# ⚙️ Load environment variables
+# ----------------------------------------------------------
+env = environ.Env()
+env.read_env()
+
+CHECKPOINT_DIR = env("CHECKPOINT_DIR", default=os.path.join(".cache", "checkpoints"))
+
+
+# ----------------------------------------------------------
+# 📌 Cursor checkpoints for long timeline crawls
+# ----------------------------------------------------------
+class CrawlCheckpoint:
+    """
+    On-disk progress of one account's crawl, written after every page.
+
+    `state.json` holds the cursor for the next page and `pages.ndjson` holds
+    one line per page already fetched, so a crawl that dies on page 40 can
+    resume from page 41 instead of page 1.
+
+    Args:
+        username: Twitter username without @
+        scope: Which pipeline owns the crawl, e.g. "raw" or "health"
+        folder: Root folder for all checkpoints
+    """
+
+    def __init__(self, username, scope, folder=CHECKPOINT_DIR):
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", f"{scope}_{username.lower()}")
+        self.path = os.path.join(folder, safe)
+        self.state_path = os.path.join(self.path, "state.json")
+        self.pages_path = os.path.join(self.path, "pages.ndjson")
+
+    def exists(self):
+        return os.path.exists(self.state_path)
+
+    def load(self):
+        """Saved state: {"next_cursor", "page", "fetched", "offset", "since_id", "complete"}, or None."""
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def iter_pages(self):
+        """Yield the pages (lists of tweets) saved so far, oldest page first."""
+        state = self.load()
+        if state is None:
+            return
+        with open(self.pages_path, "rb") as f:
+            # Bytes past state["offset"] belong to a page whose state write never landed
+            for line in f.read(state["offset"]).splitlines():
+                yield json.loads(line)
+
+    def start(self, since_id=None):
+        """Begin a fresh crawl, dropping any older checkpoint."""
+        self.clear()
+        os.makedirs(self.path, exist_ok=True)
+        open(self.pages_path, "w").close()
+        self._write_state({"next_cursor": "", "page": 0, "fetched": 0, "offset": 0, "since_id": since_id})
+
+    def record_page(self, tweets, next_cursor, complete=False):
+        """
+        Append a fetched page and move the cursor forward; both are fsynced.
+
+        An empty next_cursor marks the last page; `complete` records whether the
+        crawl reached the end of the timeline (or the watermark) there.
+        """
+        state = self.load()
+        with open(self.pages_path, "r+b") as f:
+            f.truncate(state["offset"])
+            f.seek(state["offset"])
+            f.write(json.dumps(tweets, ensure_ascii=False).encode("utf-8") + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+            state["offset"] = f.tell()
+
+        state["page"] += 1
+        state["fetched"] += len(tweets)
+        state["next_cursor"] = next_cursor
+        state["complete"] = complete
+        self._write_state(state)
+
+    def _write_state(self, state):
+        tmp = f"{self.state_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.state_path)
+
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors=True)
@@ -0,0 +1,174 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import environ
+
+# ----------------------------------------------------------
+# ⚙️ Load environment variables
+# ----------------------------------------------------------
+env = environ.Env()
+env.read_env()
+
+CACHE_PATH = env("CLASSIFICATION_CACHE", default=os.path.join(".cache", "classifications.sqlite3"))
+MAX_ENTRIES = env.int("CLASSIFICATION_CACHE_MAX_ENTRIES", default=500_000)
+MEMORY_ENTRIES = 10_000
+
+_URL_RE = re.compile(r"https?://\S+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+# ----------------------------------------------------------
+# 🔑 Key helpers
+# ----------------------------------------------------------
+def normalize_text(text):
+    """Normalize tweet text so trivial differences (case, spacing, t.co links) share a verdict."""
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    text = _URL_RE.sub("", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def text_hash(text):
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def prompt_version(*parts):
+    """Short fingerprint of a classifier's model + prompt; changing either invalidates its entries."""
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+# ----------------------------------------------------------
+# 💾 Two-level cache: in-memory LRU in front of SQLite
+# ----------------------------------------------------------
+class ClassificationCache:
+    """
+    Persistent True/False verdict cache shared by all health classifiers.
+
+    Entries are keyed by (tweet_id, hash of normalized text, prompt version).
+    A lookup without a matching tweet id still hits when the same text was
+    classified under the same prompt, so reposts across accounts are free.
+
+    Args:
+        path: SQLite file (created on first use)
+        max_entries: Rows kept on disk; least recently used rows are evicted beyond this
+        memory_entries: Size of the in-memory LRU layer
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES, memory_entries=MEMORY_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS verdicts (
+                tweet_id TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                verdict INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (tweet_id, text_hash, prompt_version)
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_verdicts_text ON verdicts (text_hash, prompt_version)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_verdicts_last_used ON verdicts (last_used)")
+        self._db.commit()
+
+    def _remember(self, key, verdict):
+        self._memory[key] = verdict
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, tweet_id, text, version):
+        """Return the cached verdict (True/False) or None on a miss."""
+        digest = text_hash(text)
+        key = (str(tweet_id or ""), digest, version)
+
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+            row = self._db.execute(
+                "SELECT verdict FROM verdicts WHERE text_hash = ? AND prompt_version = ? "
+                "ORDER BY tweet_id = ? DESC LIMIT 1",
+                (digest, version, key[0]),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            verdict = bool(row[0])
+            self._db.execute(
+                "UPDATE verdicts SET last_used = ? WHERE text_hash = ? AND prompt_version = ?",
+                (time.time(), digest, version),
+            )
+            self._db.commit()
+            self._remember(key, verdict)
+            self.hits += 1
+            return verdict
+
+    def set(self, tweet_id, text, version, verdict):
+        key = (str(tweet_id or ""), text_hash(text), version)
+        with self._lock:
+            self._remember(key, bool(verdict))
+            self._db.execute(
+                "INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?, ?)",
+                key + (int(bool(verdict)), time.time()),
+            )
+            self._writes += 1
+            if self._writes % 1000 == 0:
+                self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """Drop the least recently used rows once the table grows past max_entries."""
+        (count,) = self._db.execute("SELECT COUNT(*) FROM verdicts").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM verdicts WHERE rowid IN "
+                "(SELECT rowid FROM verdicts ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+
+    def labels(self):
+        """Every cached verdict as {text_hash: True/False}, the most recently used one per text."""
+        with self._lock:
+            rows = self._db.execute("SELECT text_hash, verdict FROM verdicts ORDER BY last_used").fetchall()
+        return {digest: bool(verdict) for digest, verdict in rows}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_cache():
+    """Process-wide cache instance shared by every classifier."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ClassificationCache()
+        return _shared
@@ -0,0 +1,162 @@
+import argparse
+import sys
+
+# Only the standard library is imported up here: every subcommand imports what it
+# needs when it runs, so `--help`, `convert` or `test` never load openai or build clients.
+
+
+def read_accounts(usernames=(), path=None):
+    """Usernames from the arguments plus a file (one per line, # comments), without @ or duplicates."""
+    names = list(usernames)
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            names += [line.split("#", 1)[0].strip() for line in f]
+    seen = set()
+    accounts = []
+    for name in names:
+        name = name.strip().lstrip("@")
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            accounts.append(name)
+    return accounts
+
+
+def _accounts(args, parser):
+    accounts = read_accounts(args.usernames, args.accounts_file)
+    if not accounts:
+        parser.error("give usernames or --accounts-file")
+    return accounts
+
+
+# ----------------------------------------------------------
+# 🧭 Subcommands
+# ----------------------------------------------------------
+def cmd_fetch(args, parser):
+    """Raw timelines (tweety.main) for each account."""
+    import metrics
+    import tweety
+
+    metrics.start_run("fetch")
+    for username in _accounts(args, parser):
+        tweety.main(username, max_tweets=args.max_tweets, incremental=not args.full, resume=args.resume)
+
+
+def cmd_classify(args, parser):
+    """Fetch and keep the health-related tweets (getalltweets.main) for each account."""
+    import getalltweets
+    import metrics
+
+    metrics.start_run("classify")
+    for username in _accounts(args, parser):
+        getalltweets.main(username, max_tweets=args.max_tweets, incremental=not args.full, resume=args.resume)
+
+
+def cmd_test(args, parser):
+    """Check the twitterapi.io key and show the first page of each account."""
+    from getalltweets import test_api_connection
+
+    ok = [test_api_connection(username) for username in _accounts(args, parser)]
+    return 0 if all(ok) else 1
+
+
+def cmd_convert(args, parser):
+    """Convert the dumps of a folder to CSV, Parquet or compact folders."""
+    if args.to == "csv":
+        from jsonconverter import convert_folder
+
+        counts = convert_folder(args.input, args.output or "csv", workers=args.workers)
+        return 1 if None in counts.values() else 0
+    elif args.to == "parquet":
+        from parquet_export import PARQUET_PATH, rows_from_dumps, write_dataset
+
+        write_dataset(rows_from_dumps(args.input), args.output or PARQUET_PATH)
+    else:
+        import glob
+        import os
+
+        from compact_format import pack
+
+        for path in sorted(glob.glob(os.path.join(args.input, "*_tweets_*.json"))):
+            pack(path)
+
+
+def cmd_watch(args, parser):
+    """Poll accounts continuously (watch.Watcher)."""
+    import metrics
+    from watch import WATCH_WORKERS, Watcher
+
+    metrics.start_run("watch")
+    Watcher(_accounts(args, parser), workers=args.workers or WATCH_WORKERS).run(duration=args.duration)
+
+
+def cmd_work(args, parser):
+    """Run crawl workers on the shared queue (work_queue.py enqueue fills it)."""
+    from work_queue import LEASE_SECONDS, WORK_QUEUE, open_queue, print_stats, run_workers
+
+    queue = args.queue or WORK_QUEUE
+    run_workers(args.processes, queue, args.job, args.lease or LEASE_SECONDS, args.wait)
+    print_stats(open_queue(queue))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Fetch, classify and convert tweets.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_accounts(p):
+        p.add_argument("usernames", nargs="*", help="Twitter usernames without @")
+        p.add_argument("--accounts-file", help="File with one username per line")
+
+    def add_crawl(p):
+        add_accounts(p)
+        p.add_argument("--max-tweets", type=int, default=None, help="Maximum tweets per account (default: all)")
+        p.add_argument("--full", action="store_true", help="Ignore the watermark and crawl the whole timeline")
+        p.add_argument("--resume", action="store_true", help="Continue an interrupted crawl from its checkpoint")
+
+    p_fetch = sub.add_parser("fetch", help="Save raw timelines")
+    add_crawl(p_fetch)
+    p_fetch.set_defaults(handler=cmd_fetch)
+
+    p_classify = sub.add_parser("classify", help="Fetch and keep the health-related tweets")
+    add_crawl(p_classify)
+    p_classify.set_defaults(handler=cmd_classify)
+
+    p_test = sub.add_parser("test", help="Test the twitterapi.io connection")
+    add_accounts(p_test)
+    p_test.set_defaults(handler=cmd_test)
+
+    p_convert = sub.add_parser("convert", help="Convert data/ dumps")
+    p_convert.add_argument("--to", choices=["csv", "parquet", "compact"], default="csv")
+    p_convert.add_argument("--input", default="data", help="Folder with the dumps")
+    p_convert.add_argument("--output", help="Output folder (default: csv/ or PARQUET_PATH)")
+    p_convert.add_argument("--workers", type=int, default=None, help="CSV conversion processes")
+    p_convert.set_defaults(handler=cmd_convert)
+
+    p_watch = sub.add_parser("watch", help="Continuously poll accounts for new tweets")
+    add_accounts(p_watch)
+    p_watch.add_argument("--workers", type=int, default=None)
+    p_watch.add_argument("--duration", type=float, default=None, help="Stop after this many seconds")
+    p_watch.set_defaults(handler=cmd_watch)
+
+    p_work = sub.add_parser("work", help="Crawl accounts leased from the shared work queue")
+    p_work.add_argument("--queue", help="SQLite path or http://host:port (default: WORK_QUEUE)")
+    p_work.add_argument("--processes", type=int, default=1)
+    p_work.add_argument("--job", choices=["classify", "fetch"], default=None)
+    p_work.add_argument("--lease", type=float, default=None, help="Lease length in seconds")
+    p_work.add_argument("--wait", action="store_true", help="Keep waiting for new tasks")
+    p_work.set_defaults(handler=cmd_work)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    return args.handler(args, parser) or 0
+
+
+if __name__ == "__main__":
+    # e.g. python cli.py classify WilliamsRuto JoeBiden --max-tweets 200
+    #      python cli.py fetch --accounts-file accounts.txt
+    #      python cli.py convert --to parquet
+    #      python cli.py test melindagates
+    #      python cli.py work --processes 8
+    sys.exit(main())
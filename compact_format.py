@@ -0,0 +1,248 @@
+import argparse
+import json
+import os
+import zlib
+from datetime import datetime
+
+import environ
+
+from tweet_output import NDJSONWriter, iter_ndjson
+
+# ----------------------------------------------------------
+# ⚙️ Load environment variables
+# ----------------------------------------------------------
+env = environ.Env()
+env.read_env()
+
+# Projection applied to tweets as they are fetched: "" keeps the full API payload,
+# "core" keeps CORE_FIELDS, anything else is a comma-separated list of top-level fields
+TWEET_FIELDS = env("TWEET_FIELDS", default="")
+
+# Fields the scripts, the store and the CSV export actually read
+CORE_FIELDS = (
+    "type", "id", "url", "text", "createdAt", "lang", "likeCount", "retweetCount", "replyCount",
+    "quoteCount", "viewCount", "bookmarkCount", "isReply", "inReplyToId", "conversationId", "author",
+)
+CORE_AUTHOR_FIELDS = ("id", "userName", "name")
+# Large optional objects moved to the side file of a compact dump
+HEAVY_FIELDS = ("entities", "extendedEntities", "card", "quoted_tweet", "retweeted_tweet", "article", "place")
+
+SUFFIX = ".compact"
+TWEETS_FILE = "tweets.ndjson"
+AUTHORS_FILE = "authors.ndjson"
+BLOBS_FILE = "blobs.bin"
+BLOB_INDEX_FILE = "blobs.idx.ndjson"
+
+
+# ----------------------------------------------------------
+# ✂️ Field projection
+# ----------------------------------------------------------
+def parse_fields(spec=TWEET_FIELDS):
+    """Field tuple for a TWEET_FIELDS value, or None to keep everything."""
+    spec = (spec or "").strip()
+    if not spec:
+        return None
+    if spec == "core":
+        return CORE_FIELDS
+    return tuple(f.strip() for f in spec.split(",") if f.strip())
+
+
+def project(tweet, fields):
+    """Copy of a tweet with only `fields` (a "core" author keeps only id, userName and name)."""
+    if fields is None:
+        return tweet
+    projected = {k: tweet[k] for k in fields if k in tweet}
+    if fields is CORE_FIELDS and isinstance(projected.get("author"), dict):
+        projected["author"] = {k: projected["author"][k] for k in CORE_AUTHOR_FIELDS if k in projected["author"]}
+    return projected
+
+
+def split_tweet(tweet):
+    """
+    Normalize one API tweet.
+
+    Returns:
+        (tweet without author and heavy fields but with "authorId",
+         author dict or None, {heavy field: value} of the non-empty heavy fields)
+    """
+    # Empty heavy fields ({}, None) stay inline: they cost a few bytes and keep the round trip exact
+    author = tweet.get("author") or None
+    if not isinstance(author, dict):
+        # e.g. a health dump, where "author" is just the display name: keep it inline
+        author = None
+    core = {k: v for k, v in tweet.items() if not (k == "author" and author) and not (k in HEAVY_FIELDS and v)}
+    if author:
+        core["authorId"] = str(author.get("id") or author.get("userName") or "")
+    blobs = {k: tweet[k] for k in HEAVY_FIELDS if tweet.get(k)}
+    return core, author, blobs
+
+
+# ----------------------------------------------------------
+# 📝 Writer
+# ----------------------------------------------------------
+def compact_path(username, kind, folder="data"):
+    """Timestamped dump folder like data/<user>_<kind>_<timestamp>.compact."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(folder, f"{username}_{kind}_{timestamp}{SUFFIX}")
+
+
+class CompactWriter:
+    """
+    Normalized dump folder, written page by page like NDJSONWriter.
+
+    - tweets.ndjson: one compact tweet per line, with "authorId" instead of the author object
+    - authors.ndjson: each author once
+    - blobs.bin + blobs.idx.ndjson: zlib-compressed heavy fields, located by tweet id
+      and only read when asked for
+
+    Args:
+        path: Dump folder (created)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        os.makedirs(path, exist_ok=True)
+        authors_path = os.path.join(path, AUTHORS_FILE)
+        # Appending to an existing folder (e.g. a resumed crawl) must not repeat its authors
+        self._seen_authors = {a["id"] for a in iter_ndjson(authors_path)} if os.path.exists(authors_path) else set()
+        self._tweets = NDJSONWriter(os.path.join(path, TWEETS_FILE), compression="")
+        self._authors = NDJSONWriter(authors_path, compression="")
+        self._index = NDJSONWriter(os.path.join(path, BLOB_INDEX_FILE), compression="")
+        self._blobs = open(os.path.join(path, BLOBS_FILE), "ab")
+
+    def write(self, tweet):
+        core, author, blobs = split_tweet(tweet)
+        if author and core["authorId"] not in self._seen_authors:
+            self._seen_authors.add(core["authorId"])
+            self._authors.write(dict(author, id=core["authorId"]))
+        if blobs:
+            data = zlib.compress(json.dumps(blobs, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+            self._index.write({"id": core.get("id"), "offset": self._blobs.tell(), "length": len(data)})
+            self._blobs.write(data)
+        self._tweets.write(core)
+        self.count += 1
+
+    def write_many(self, tweets):
+        for tweet in tweets:
+            self.write(tweet)
+
+    def flush_page(self):
+        """Make everything written so far durable; blobs go first so the index never points past them."""
+        self._blobs.flush()
+        os.fsync(self._blobs.fileno())
+        for writer in (self._index, self._authors, self._tweets):
+            writer.flush_page()
+
+    def close(self):
+        self.flush_page()
+        self._blobs.close()
+        for writer in (self._index, self._authors, self._tweets):
+            writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ----------------------------------------------------------
+# 📖 Reader
+# ----------------------------------------------------------
+def is_compact(path):
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, TWEETS_FILE))
+
+
+class CompactDump:
+    """
+    Read a compact dump folder.
+
+    Tweets stream from tweets.ndjson; every tweet of an author shares one
+    author dict, and heavy fields stay on disk until blobs() is called.
+
+    Args:
+        path: Dump folder
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._authors = None
+        self._index = None
+
+    def authors(self):
+        if self._authors is None:
+            self._authors = {a["id"]: a for a in iter_ndjson(os.path.join(self.path, AUTHORS_FILE))}
+        return self._authors
+
+    def blobs(self, tweet_id):
+        """Heavy fields of one tweet ({} when it had none)."""
+        if self._index is None:
+            self._index = {str(e["id"]): (e["offset"], e["length"])
+                           for e in iter_ndjson(os.path.join(self.path, BLOB_INDEX_FILE))}
+        location = self._index.get(str(tweet_id))
+        if location is None:
+            return {}
+        with open(os.path.join(self.path, BLOBS_FILE), "rb") as f:
+            f.seek(location[0])
+            return json.loads(zlib.decompress(f.read(location[1])))
+
+    def iter_tweets(self, with_author=True, with_blobs=False):
+        """
+        Yield the dump's tweets in API shape.
+
+        Args:
+            with_author: Put the author object back under "author"
+            with_blobs: Also load the heavy fields (entities, card, ...) from the side file
+        """
+        authors = self.authors() if with_author else {}
+        for tweet in iter_ndjson(os.path.join(self.path, TWEETS_FILE)):
+            if with_author and tweet.get("authorId") in authors:
+                tweet["author"] = authors[tweet.pop("authorId")]
+            if with_blobs:
+                tweet.update(self.blobs(tweet.get("id")))
+            yield tweet
+
+
+def _folder_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def pack(json_path, output=None):
+    """Convert a raw JSON/NDJSON dump to a compact folder next to it; returns the folder."""
+    from jsonconverter import iter_records
+
+    output = output or os.path.splitext(json_path)[0].replace(".ndjson", "") + SUFFIX
+    with CompactWriter(output) as writer:
+        writer.write_many(iter_records(json_path))
+
+    before, after = os.path.getsize(json_path), _folder_size(output)
+    core = os.path.getsize(os.path.join(output, TWEETS_FILE)) + os.path.getsize(os.path.join(output, AUTHORS_FILE))
+    print(f"📦 {json_path}: {writer.count} tweets, {before / 1e6:.2f} MB → {after / 1e6:.2f} MB "
+          f"({core / 1e6:.2f} MB loaded by default) in {output}")
+    return output
+
+
+def unpack(path, json_path=None):
+    """Rebuild the classic indented JSON array (authors and heavy fields included)."""
+    if json_path is None:
+        json_path = (path[:-len(SUFFIX)] if path.endswith(SUFFIX) else path) + ".json"
+    tweets = list(CompactDump(path).iter_tweets(with_blobs=True))
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(tweets, f, indent=2, ensure_ascii=False)
+    print(f"💾 Unpacked {len(tweets)} tweets to {json_path}")
+    return json_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normalized compact tweet dumps.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_pack = sub.add_parser("pack", help="Convert raw *_tweets_*.json dumps to compact folders")
+    p_pack.add_argument("paths", nargs="+")
+    p_unpack = sub.add_parser("unpack", help="Rebuild the full JSON array from a compact folder")
+    p_unpack.add_argument("paths", nargs="+")
+    args = parser.parse_args()
+
+    # e.g. python compact_format.py pack data/MoghaluGeorge_tweets_20251103_120749.json
+    for path in args.paths:
+        pack(path) if args.command == "pack" else unpack(path)
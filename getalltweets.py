@@ -1,10 +1,24 @@
-import requests
+import argparse
 import json
 import os
-import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from openai import OpenAI
 import environ
+from key_pool import openai_client, openai_keys, twitter_keys
+from lazy import Lazy
+from twitter_client import TwitterAPIClient, TwitterAPIError
+from watermarks import load_watermark, save_watermark, tweet_id_int
+from checkpoints import CrawlCheckpoint
+from batch_classifier import classify_many
+from classification_cache import get_cache, prompt_version
+import keyword_filter
+import metrics
+import near_duplicates
+from tweet_output import OUTPUT_FORMAT, NDJSONWriter, output_path
+from tweet_store import get_store
+from tweet_record import TweetRecord, dump_json
 
 # ----------------------------------------------------------
 # ⚙️ Load environment variables
@@ -12,153 +26,164 @@ import environ
 env = environ.Env()
 env.read_env()
 
-API_KEY = env("TWITTER_API_KEY")
-OPENAI_API_KEY = env("OPENAI_API_KEY")
+# 🔌 Clients (and their API keys) are only set up the first time they're used
+client = Lazy(lambda: openai_client(openai_keys()))
+twitter = Lazy(lambda: TwitterAPIClient(twitter_keys()))
 
-client = OpenAI(api_key=OPENAI_API_KEY)
-BASE_URL = "https://api.twitterapi.io/twitter/user/last_tweets"
+# 🧵 Pipeline settings: parallel classifier calls / pages buffered ahead of the classifier
+CLASSIFY_WORKERS = env.int("CLASSIFY_WORKERS", default=8)
+PAGE_BUFFER = env.int("PAGE_BUFFER", default=3)
+# 📦 Tweets packed into one classification request (1 = one request per tweet)
+BATCH_SIZE = env.int("BATCH_SIZE", default=20)
 
 
 # === 1. FETCH ALL TWEETS ===
-def fetch_all_tweets(username, max_tweets=None, delay=1):
+def iter_tweet_pages(username, max_tweets=None, delay=None, since_id=None, progress=None,
+                     checkpoint=None, resume=False, cancel=None):
+    """Yield a user's tweets one page at a time (see TwitterAPIClient.iter_pages)."""
+    return twitter.iter_pages(username, max_tweets=max_tweets, delay=delay, since_id=since_id,
+                              progress=progress, checkpoint=checkpoint, resume=resume, cancel=cancel)
+
+
+def fetch_all_tweets(username, max_tweets=None, delay=None, since_id=None, progress=None,
+                     checkpoint=None, resume=False, cancel=None):
+    """Fetch all of a user's tweets into a single list of compact TweetRecords (see iter_tweet_pages)."""
+    tweets = []
+    for page_tweets in iter_tweet_pages(username, max_tweets=max_tweets, delay=delay,
+                                        since_id=since_id, progress=progress,
+                                        checkpoint=checkpoint, resume=resume, cancel=cancel):
+        tweets.extend(TweetRecord.from_api(t) for t in page_tweets)
+    return tweets
+
+
+_DONE = object()
+
+
+def prefetch_pages(pages, buffer=PAGE_BUFFER):
     """
-    Fetch tweets from a user.
+    Drain a page iterator in a background thread.
     
-    Args:
-        username: Twitter username (without @)
-        max_tweets: Maximum number of tweets to fetch (None = all)
-        delay: Delay between API calls in seconds
+    At most `buffer` pages wait in memory, so downloading the next pages
+    overlaps with classifying the current one without holding the whole
+    timeline. Errors raised by the producer are re-raised to the caller.
+    When the caller stops early (error, cancel, generator closed), the
+    producer stops after the page it is fetching instead of blocking on a
+    full queue.
     """
-    tweets = []
-    next_cursor = ""
-    page = 0
-
-    while True:
-        page += 1
-        print(f"\n📄 Fetching page {page}...")
-        
-        params = {
-            "userName": username,
-            "includeReplies": False
-        }
-        
-        # Add cursor only if we have one
-        if next_cursor:
-            params["cursor"] = next_cursor
-            
-        headers = {"X-API-Key": API_KEY}
+    pending = queue.Queue(maxsize=buffer)
+    stop = threading.Event()
 
-        try:
-            response = requests.get(BASE_URL, headers=headers, params=params, timeout=30)
-            print(f"📡 Status: {response.status_code}")
-            
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Request failed: {e}")
-            break
-
-        # Handle non-200 responses
-        if response.status_code == 429:
-            print("⏳ Rate limited. Waiting 60 seconds...")
-            time.sleep(60)
-            continue
-        elif response.status_code == 404:
-            print(f"❌ User '@{username}' not found")
-            break
-        elif response.status_code != 200:
-            print(f"❌ Error {response.status_code}: {response.text[:500]}")
-            break
+    def put(item):
+        while not stop.is_set():
+            try:
+                pending.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
 
+    def produce():
         try:
-            data = response.json()
+            for page in pages:
+                if not put(page):
+                    return
         except Exception as e:
-            print(f"❌ JSON decode error: {e}")
-            print(f"Response text: {response.text[:500]}")
-            break
-
-        # Check API status
-        if data.get("status") == "error":
-            print(f"❌ API Error: {data.get('message', 'Unknown error')}")
-            break
-
-        # Get tweets - they're nested in data.tweets
-        data_obj = data.get("data", {})
-        new_tweets = data_obj.get("tweets", [])
-        
-        if not new_tweets:
-            print("⚠️ No tweets in this batch")
-            # Check if this is truly empty or an error
-            if page == 1:
-                print("\n🔍 Full response for debugging:")
-                print(json.dumps(data, indent=2)[:1000])
-            break
-
-        print(f"✅ Found {len(new_tweets)} tweets")
-        tweets.extend(new_tweets)
-
-        # Check if we've hit the max
-        if max_tweets and len(tweets) >= max_tweets:
-            print(f"🎯 Reached max tweets limit ({max_tweets})")
-            tweets = tweets[:max_tweets]
-            break
-
-        # Check for next page
-        has_next = data.get("has_next_page", False) or data_obj.get("has_next_page", False)
-        if not has_next:
-            print("✅ No more pages available")
-            break
-            
-        next_cursor = data.get("next_cursor", "") or data_obj.get("next_cursor", "")
-        if not next_cursor:
-            print("⚠️ has_next_page=true but no cursor provided")
-            break
-
-        # Rate limiting
-        if delay > 0:
-            print(f"⏳ Waiting {delay}s before next request...")
-            time.sleep(delay)
+            put(e)
+        finally:
+            if stop.is_set() and hasattr(pages, "close"):
+                pages.close()
+            put(_DONE)
 
-    return tweets
+    threading.Thread(target=produce, name="prefetch-pages", daemon=True).start()
+
+    try:
+        while True:
+            item = pending.get()
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
 
 
 # === 2. AI HEALTH CLASSIFIER ===
-def is_health_related(text):
-    """Check if tweet is health-related using OpenAI API."""
+CLASSIFIER_MODEL = "gpt-4o-mini"
+# What counts as health-related; the batch prompt adds its own JSON reply format to it
+HEALTH_CRITERIA = "You classify if text is about health, medicine, diseases, wellbeing, medical research, healthcare, mental health, fitness, or nutrition."
+SYSTEM_PROMPT = HEALTH_CRITERIA + " Reply only 'True' or 'False'."
+PROMPT_VERSION = prompt_version(CLASSIFIER_MODEL, SYSTEM_PROMPT)
+
+
+def health_request(text):
+    """chat.completions.create() arguments of the per-tweet prompt."""
+    return dict(
+        model=CLASSIFIER_MODEL,
+        messages=[
+            {
+                "role": "system", 
+                "content": SYSTEM_PROMPT
+            },
+            {
+                "role": "user", 
+                "content": f"Is this health-related?\n\n{text}"
+            }
+        ],
+        max_tokens=10,
+        temperature=0
+    )
+
+
+def parse_answer(answer):
+    """True/False from a reply to health_request()."""
+    return "true" in (answer or "").strip().lower()
+
+
+def is_health_related(text, tweet_id=None):
+    """Check if tweet is health-related using OpenAI API (cached across runs)."""
+    cache = get_cache()
+    cached = cache.get(tweet_id, text, PROMPT_VERSION)
+    if cached is not None:
+        return cached
+
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system", 
-                    "content": "You classify if text is about health, medicine, diseases, wellbeing, medical research, healthcare, mental health, fitness, or nutrition. Reply only 'True' or 'False'."
-                },
-                {
-                    "role": "user", 
-                    "content": f"Is this health-related?\n\n{text}"
-                }
-            ],
-            max_tokens=10,
-            temperature=0
-        )
+        with metrics.timer("llm_request"):
+            response = client.chat.completions.create(**health_request(text))
+        metrics.record_llm_usage(response)
         
-        answer = response.choices[0].message.content.strip().lower()
-        return "true" in answer
+        answer = response.choices[0].message.content
         
     except Exception as e:
+        metrics.count("llm_errors")
         print(f"⚠️ OpenAI error: {e}")
         return False
 
+    verdict = parse_answer(answer)
+    cache.set(tweet_id, text, PROMPT_VERSION, verdict)
+    return verdict
+
+
+def classify_tweets(tweets, batch_size=BATCH_SIZE):
+    """Classify raw tweets in batches; returns one True/False per tweet, in order."""
+    items = [(t.get("id"), t.get("text", "")) for t in tweets]
+    return classify_many(client, items, HEALTH_CRITERIA, PROMPT_VERSION, is_health_related,
+                         batch_size=batch_size, model=CLASSIFIER_MODEL,
+                         precheck=keyword_filter.prefilter, langs=[t.get("lang") for t in tweets],
+                         single_request=health_request, parse_single=parse_answer)
+
 
 # === 3. SAVE HEALTH-RELATED TWEETS TO JSON ===
 def save_health_tweets(username, tweets):
-    """Save filtered tweets to JSON file."""
+    """Save health tweets (TweetRecords) to JSON file, flattening one record at a time."""
     folder = "data"
     os.makedirs(folder, exist_ok=True)
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     path = os.path.join(folder, f"{username}_health_tweets_{timestamp}.json")
 
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(tweets, f, indent=2, ensure_ascii=False)
+    with metrics.timer("save_json"), open(path, "w", encoding="utf-8") as f:
+        dump_json((health_record(username, t) for t in tweets), f, indent=2)
 
     print(f"\n💾 Saved {len(tweets)} health-related tweets to {path}")
     return path
@@ -169,109 +194,181 @@ def test_api_connection(username):
     """Test if the API is working correctly."""
     print(f"\n🔧 Testing API connection for @{username}...")
     
-    params = {"userName": username, "includeReplies": False}
-    headers = {"X-API-Key": API_KEY}
-    
     try:
-        response = requests.get(BASE_URL, headers=headers, params=params, timeout=30)
-        print(f"Status: {response.status_code}")
-        
-        if response.status_code == 200:
-            data = response.json()
-            data_obj = data.get("data", {})
-            tweet_count = len(data_obj.get("tweets", []))
-            print(f"✅ API working! Found {tweet_count} tweets in first batch")
-            
-            if tweet_count > 0:
-                print("\n📋 Sample tweet:")
-                sample = data_obj["tweets"][0]
-                print(f"  ID: {sample.get('id')}")
-                print(f"  Date: {sample.get('createdAt')}")
-                print(f"  Text: {sample.get('text', '')[:100]}...")
-                return True
-            else:
-                print("⚠️ API returned 0 tweets. Possible reasons:")
-                print("  - Account has no tweets")
-                print("  - Account is private")
-                print("  - Username is incorrect")
-                print("\nFull response:")
-                print(json.dumps(data, indent=2))
-                return False
-        else:
-            print(f"❌ API error: {response.text[:500]}")
-            return False
-            
-    except Exception as e:
-        print(f"❌ Connection error: {e}")
+        data = twitter.last_tweets(username)
+    except TwitterAPIError as e:
+        print(f"❌ API error: {e}")
+        return False
+
+    data_obj = data.get("data", {})
+    tweet_count = len(data_obj.get("tweets", []))
+    print(f"✅ API working! Found {tweet_count} tweets in first batch")
+    
+    if tweet_count > 0:
+        print("\n📋 Sample tweet:")
+        sample = data_obj["tweets"][0]
+        print(f"  ID: {sample.get('id')}")
+        print(f"  Date: {sample.get('createdAt')}")
+        print(f"  Text: {sample.get('text', '')[:100]}...")
+        return True
+    else:
+        print("⚠️ API returned 0 tweets. Possible reasons:")
+        print("  - Account has no tweets")
+        print("  - Account is private")
+        print("  - Username is incorrect")
+        print("\nFull response:")
+        print(json.dumps(data, indent=2))
         return False
 
 
 # === 5. MAIN LOGIC ===
-def main(username, max_tweets=None, test_mode=False):
+def health_record(username, tweet):
+    """Flatten a raw API tweet (or TweetRecord) into the health-tweet output schema."""
+    return {
+        "username": username,
+        "tweet_id": tweet.get("id"),
+        "url": tweet.get("url"),
+        "created_at": tweet.get("createdAt"),
+        "text": tweet.get("text", ""),
+        "likes": tweet.get("likeCount", 0),
+        "retweets": tweet.get("retweetCount", 0),
+        "replies": tweet.get("replyCount", 0),
+        "author": tweet.get("author", {}).get("name")
+    }
+
+
+def main(username, max_tweets=None, test_mode=False, incremental=True, resume=False, cancel=None):
     """
     Main function to fetch and filter health tweets.
     
+    Pages are classified as soon as they arrive while later pages are
+    still downloading, and health hits are reported as they are found.
+    
     Args:
         username: Twitter username without @
         max_tweets: Maximum tweets to fetch (None = all)
         test_mode: If True, only test API connection
+        incremental: If True, only fetch tweets newer than the last completed run
+        resume: If True, continue an interrupted crawl from its last checkpointed cursor
+        cancel: Optional threading.Event; when set the crawl stops between pages
+            and keeps its checkpoint as it is (see work_queue)
     """
     
     if test_mode:
         test_api_connection(username)
         return
     
-    print(f"🐦 Fetching tweets for @{username}...")
-    all_tweets = fetch_all_tweets(username, max_tweets=max_tweets)
-    
-    print(f"\n📊 Total tweets fetched: {len(all_tweets)}")
+    since_id = None
+    if incremental:
+        mark = load_watermark(username, "health")
+        if mark:
+            since_id = int(mark["tweet_id"])
+            print(f"🔖 Incremental run: only tweets newer than {mark['tweet_id']} ({mark['created_at']})")
+
+    print(f"🐦 Fetching and analyzing tweets for @{username}...")
+
+    health_tweets = []
+    found = 0
+    total = 0
+    newest = None
+    progress = {}
+    checkpoint = CrawlCheckpoint(username, "health")
+    # With OUTPUT_FORMAT=ndjson hits are appended to disk as they're found instead of kept in memory
+    stream = None
+    store = get_store()
+
+    pages = prefetch_pages(iter_tweet_pages(username, max_tweets=max_tweets,
+                                            since_id=since_id, progress=progress,
+                                            checkpoint=checkpoint, resume=resume,
+                                            cancel=cancel))
+    try:
+        with ThreadPoolExecutor(max_workers=CLASSIFY_WORKERS) as pool:
+            for page_tweets in pages:
+                if cancel is not None and cancel.is_set():
+                    progress["error"] = "crawl cancelled"
+                    break
+                newest = max(page_tweets + ([newest] if newest else []), key=tweet_id_int)
+                candidates = [t for t in page_tweets if t.get("text")]
+                print(f"🏥 Analyzing {len(candidates)} tweets for health content...")
+                batches = [candidates[i:i + BATCH_SIZE] for i in range(0, len(candidates), BATCH_SIZE)]
+                verdicts = [v for batch in pool.map(classify_tweets, batches) for v in batch]
+                if store is not None:
+                    store.upsert_raw(username, candidates, verdicts)
 
-    if not all_tweets:
+                for tweet, is_health in zip(candidates, verdicts):
+                    if not is_health:
+                        continue
+                    found += 1
+                    if OUTPUT_FORMAT == "ndjson":
+                        if stream is None:
+                            stream = NDJSONWriter(output_path(username, "health_tweets"))
+                        stream.write(health_record(username, tweet))
+                    elif OUTPUT_FORMAT != "store":
+                        # Only the fields health_record needs; flattened when saved
+                        health_tweets.append(TweetRecord.from_api(tweet, keep_raw=False))
+                    print(f"✅ [{tweet.get('id')}] Health-related! Total found: {found}")
+
+                if stream is not None:
+                    stream.flush_page()
+                total += len(page_tweets)
+    finally:
+        # Stops the prefetch thread when the loop was left early
+        pages.close()
+        if stream is not None:
+            stream.close()
+
+    print(f"\n📊 Total tweets fetched: {total}")
+
+    if progress.get("error"):
+        if stream is not None:
+            print(f"\n⚠️ Crawl stopped early ({progress['error']}). Partial results are in {stream.path};")
+        else:
+            print(f"\n⚠️ Crawl stopped early ({progress['error']}). Nothing was saved;")
+        print("💡 re-run with resume=True (or --resume) to continue from the last fetched page.")
+        return
+
+    if not total and since_id:
+        print("\n✅ No new tweets since the last run")
+        checkpoint.clear()
+        return
+
+    if not total:
         print("\n❌ No tweets found!")
         print("💡 Try running in test mode: main('melindagates', test_mode=True)")
+        checkpoint.clear()
         return
 
-    # Analyze for health content
-    health_tweets = []
-    print(f"\n🏥 Analyzing {len(all_tweets)} tweets for health content...")
-    
-    for i, tweet in enumerate(all_tweets, 1):
-        text = tweet.get("text", "")
-        
-        if not text:
-            continue
-            
-        print(f"🔄 [{i}/{len(all_tweets)}] Analyzing...", end="\r")
-        
-        if is_health_related(text):
-            health_tweets.append({
-                "username": username,
-                "tweet_id": tweet.get("id"),
-                "url": tweet.get("url"),
-                "created_at": tweet.get("createdAt"),
-                "text": text,
-                "likes": tweet.get("likeCount", 0),
-                "retweets": tweet.get("retweetCount", 0),
-                "replies": tweet.get("replyCount", 0),
-                "author": tweet.get("author", {}).get("name")
-            })
-            print(f"✅ [{i}/{len(all_tweets)}] Health-related! Total found: {len(health_tweets)}")
-
-    print(f"\n\n🏥 Found {len(health_tweets)} health-related tweets out of {len(all_tweets)} total")
+    print(f"\n\n🏥 Found {found} health-related tweets out of {total} total")
+    print(keyword_filter.stats.report())
+    print(near_duplicates.index.report())
     
-    if health_tweets:
+    if stream is not None:
+        print(f"\n💾 Streamed {found} health-related tweets to {stream.path}")
+    elif OUTPUT_FORMAT == "store" and store is not None:
+        print(f"\n🗄️ Stored {total} classified tweets in {store.path}")
+    elif health_tweets:
         save_health_tweets(username, health_tweets)
     else:
         print("💡 No health-related tweets found")
+    # Only advance the watermark when nothing between it and the newest tweet was skipped.
+    # Saved before the checkpoint goes, so a failed save leaves the crawl resumable
+    if progress.get("complete") and newest:
+        save_watermark(username, "health", [newest])
+    checkpoint.clear()
 
 
 # === RUN ===
 if __name__ == "__main__":
-    # Test API connection first
-    # main("melindagates", test_mode=True)
-    
-    # Then run full scrape (fetch all tweets)
-    main("CyrilRamaphosa")
-    
-    # Or limit to first 100 tweets for testing
-    # main("melindagates", max_tweets=100)
\ No newline at end of file
+    metrics.start_run("getalltweets")
+    parser = argparse.ArgumentParser(description="Fetch a user's tweets and keep the health-related ones.")
+    parser.add_argument("username", nargs="?", default="CyrilRamaphosa", help="Twitter username without @")
+    parser.add_argument("--max-tweets", type=int, default=None, help="Maximum tweets to fetch (default: all)")
+    parser.add_argument("--test", action="store_true", help="Only test the API connection")
+    parser.add_argument("--full", action="store_true", help="Ignore the watermark and crawl the whole timeline")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted crawl from its checkpoint")
+    args = parser.parse_args()
+
+    # e.g. python getalltweets.py melindagates --test
+    #      python getalltweets.py melindagates --max-tweets 100
+    main(args.username, max_tweets=args.max_tweets, test_mode=args.test,
+         incremental=not args.full, resume=args.resume)
@@ -0,0 +1,106 @@
+import environ
+from key_pool import openai_client, openai_keys
+from lazy import Lazy
+from batch_classifier import classify_many
+from classification_cache import get_cache, prompt_version
+import keyword_filter
+import metrics
+from keyword_filter import classify_text
+
+# ----------------------------------------------------------
+# ⚙️ Load environment variables
+# ----------------------------------------------------------
+env = environ.Env()
+env.read_env()
+
+# 🧠 OpenAI client, built on first use
+client = Lazy(lambda: openai_client(openai_keys()))
+
+CLASSIFIER_MODEL = "gpt-4o-mini"
+HEALTH_CRITERIA = """
+    You are analyzing tweets to determine if they are **health-related**.
+
+    Mark as "yes" ONLY if the tweet is about:
+    - health, healthcare, or hospitals
+    - diseases, infections, or outbreaks
+    - disease prevention, vaccination, or medical topics
+    - public health updates, advice, or statements
+"""
+HEALTH_PROMPT = HEALTH_CRITERIA + """
+    Respond strictly with "yes" or "no".
+
+    Tweet:
+    "{text}"
+    """
+# 📦 Tweets packed into one classification request (1 = one request per tweet)
+BATCH_SIZE = env.int("BATCH_SIZE", default=20)
+# Cache entries are shared with every classifier that uses the same model + prompt
+PROMPT_VERSION = prompt_version(CLASSIFIER_MODEL, HEALTH_PROMPT)
+
+
+# ----------------------------------------------------------
+# 🧠 Check if tweet is health-related (keyword cascade, then AI)
+# ----------------------------------------------------------
+def quick_check(text: str, lang=None):
+    """Keyword cascade shortcut (see keyword_filter): True when the LLM isn't needed, else None."""
+    return classify_text(text, lang)[0]
+
+
+def health_request(text: str):
+    """chat.completions.create() arguments of the per-tweet prompt."""
+    return dict(
+        model=CLASSIFIER_MODEL,
+        messages=[{"role": "user", "content": HEALTH_PROMPT.format(text=text)}],
+        temperature=0.2
+    )
+
+
+def parse_answer(answer: str) -> bool:
+    """True/False from a reply to health_request()."""
+    return (answer or "").strip().lower().startswith("yes")
+
+
+def is_health_related_tweet(text: str, tweet_id=None) -> bool:
+    """Return True if the tweet is about health, disease, or public health topics (keyword cascade, then AI)."""
+    quick = quick_check(text)
+    if quick is not None:
+        return quick
+
+    cache = get_cache()
+    cached = cache.get(tweet_id, text, PROMPT_VERSION)
+    if cached is not None:
+        return cached
+
+    try:
+        with metrics.timer("llm_request"):
+            response = client.chat.completions.create(**health_request(text))
+        metrics.record_llm_usage(response)
+        answer = response.choices[0].message.content
+    except Exception as e:
+        metrics.count("llm_errors")
+        print(f"⚠️ AI health check failed: {e}")
+        return False
+
+    verdict = parse_answer(answer)
+    cache.set(tweet_id, text, PROMPT_VERSION, verdict)
+    return verdict
+
+
+def classify_tweets(items, batch_size=BATCH_SIZE, langs=None):
+    """Batch version of is_health_related_tweet for (tweet_id, text) pairs; returns True/False per pair."""
+    return classify_many(client, items, HEALTH_CRITERIA, PROMPT_VERSION, is_health_related_tweet,
+                         batch_size=batch_size, model=CLASSIFIER_MODEL, temperature=0.2,
+                         precheck=keyword_filter.prefilter, langs=langs,
+                         single_request=health_request, parse_single=parse_answer)
+
+
+def classify_api_tweets(tweets, batch_size=BATCH_SIZE):
+    """classify_tweets for raw API tweets; tweets without text skip the classifier and get None."""
+    texts = [t.get("text", "").strip() for t in tweets]
+    candidates = [i for i, text in enumerate(texts) if text]
+    verdicts = [None] * len(tweets)
+    found = classify_tweets([(tweets[i].get("id"), texts[i]) for i in candidates], batch_size=batch_size,
+                            langs=[tweets[i].get("lang") for i in candidates]) if candidates else []
+    for i, verdict in zip(candidates, found):
+        verdicts[i] = verdict
+    return verdicts
@@ -1,8 +1,15 @@
 import csv
-import requests
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor
 import time
 import environ
+from key_pool import twitter_keys
+from lazy import Lazy
+from health_classifier import classify_api_tweets
+import keyword_filter
+import metrics
+import near_duplicates
+from twitter_client import TwitterAPIClient
+from tweet_store import get_store
 
 # ----------------------------------------------------------
 # ⚙️ Load environment variables
@@ -10,12 +17,11 @@ import environ
 env = environ.Env()
 env.read_env()
 
-API_KEY = env("TWITTER_API_KEY")
-OPENAI_API_KEY = env("OPENAI_API_KEY")
-BASE_URL = "https://api.twitterapi.io/twitter/user/last_tweets"
+# 🚦 Concurrency settings (accounts processed in parallel; API pacing lives in ratelimit.py)
+MAX_WORKERS = env.int("MAX_WORKERS", default=5)
 
-# 🧠 OpenAI Client
-client = OpenAI(api_key=OPENAI_API_KEY)
+# 🐦 twitterapi.io client, one connection per worker
+twitter = Lazy(lambda: TwitterAPIClient(twitter_keys(), pool_size=MAX_WORKERS))
 
 # 👥 List of usernames to process
 USERNAMES = [
@@ -42,98 +48,76 @@ USERNAMES = [
     "KagutaMuseveni",
 ]
 
-# ----------------------------------------------------------
-# 🧠 Check if tweet is health-related (AI only)
-# ----------------------------------------------------------
-def is_health_related_tweet(text: str) -> bool:
-    """Return True if the tweet is about health, disease, or public health topics (AI-only version)."""
-    if len(text.split()) < 5:
-        return False
-
-    prompt = f"""
-    You are analyzing tweets to determine if they are **health-related**.
-
-    Mark as "yes" ONLY if the tweet is about:
-    - health, healthcare, or hospitals
-    - diseases, infections, or outbreaks
-    - disease prevention, vaccination, or medical topics
-    - public health updates, advice, or statements
-
-    Respond strictly with "yes" or "no".
-
-    Tweet:
-    "{text}"
-    """
-
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.2
-        )
-        answer = response.choices[0].message.content.strip().lower()
-        return answer.startswith("yes")
-    except Exception as e:
-        print(f"⚠️ AI health check failed: {e}")
-        return False
-
 
 # ----------------------------------------------------------
 # 🐦 Fetch latest tweets for a username
 # ----------------------------------------------------------
 def get_latest_tweets(username, count=20):
-    headers = {"X-API-Key": API_KEY}
-    params = {"userName": username, "limit": count}
-    response = requests.get(BASE_URL, headers=headers, params=params)
+    return twitter.latest_tweets(username, count)
 
-    if response.status_code != 200:
-        print(f"Error fetching @{username} ({response.status_code}): {response.text}")
-        return []
 
-    data = response.json()
-    tweets = data.get("tweets") or data.get("data", {}).get("tweets")
-    if not tweets:
-        print(f"No tweets found for @{username}")
-        return []
+# ----------------------------------------------------------
+# 🧵 Fetch + classify one account (runs inside a worker thread)
+# ----------------------------------------------------------
+def process_account(username):
+    """Fetch and classify the latest tweets of one account.
 
-    return tweets[:count]
+    Returns the CSV rows for the account. Console output is buffered and
+    printed in one go so parallel accounts don't interleave their lines.
+    """
+    lines = [
+        "\n==============================",
+        f"📥 Fetching tweets for @{username}",
+        "==============================",
+    ]
+    rows = []
+
+    tweets = get_latest_tweets(username)
+    lines.append(f"✅ Found {len(tweets)} tweets from @{username}\n")
+    verdicts = classify_api_tweets(tweets)
+    store = get_store()
+    if store is not None:
+        store.upsert_raw(username, tweets, verdicts)
+
+    for i, (t, is_health) in enumerate(zip(tweets, verdicts), start=1):
+        created_at = t.get("createdAt") or "Unknown time"
+        text = t.get("text", "").strip()
+        if not text:
+            continue
+
+        label = "Yes" if is_health else "No"
+
+        lines.append(f"{i}. ({created_at}) → Health related: {label}")
+        lines.append(f"{text}\n")
+
+        rows.append({
+            "Username": username,
+            "Created At": created_at,
+            "Tweet Text": text,
+            "Health Related": label
+        })
+
+    print("\n".join(lines))
+    return rows
+
+
+def process_accounts(usernames, max_workers=MAX_WORKERS):
+    """Process many accounts concurrently, keeping the rows in `usernames` order."""
+    all_tweets = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for rows in pool.map(process_account, usernames):
+            all_tweets.extend(rows)
+    return all_tweets
 
 
 # ----------------------------------------------------------
 # 🚀 Main program
 # ----------------------------------------------------------
 if __name__ == "__main__":
-    all_tweets = []
-
-    for username in USERNAMES:
-        print(f"\n==============================")
-        print(f"📥 Fetching tweets for @{username}")
-        print(f"==============================")
-
-        tweets = get_latest_tweets(username)
-        print(f"✅ Found {len(tweets)} tweets from @{username}\n")
-
-        for i, t in enumerate(tweets, start=1):
-            created_at = t.get("createdAt") or "Unknown time"
-            text = t.get("text", "").strip()
-            if not text:
-                continue
-
-            is_health = is_health_related_tweet(text)
-            label = "Yes" if is_health else "No"
-
-            print(f"{i}. ({created_at}) → Health related: {label}")
-            print(f"{text}\n")
-
-            all_tweets.append({
-                "Username": username,
-                "Created At": created_at,
-                "Tweet Text": text,
-                "Health Related": label
-            })
-
-        # ⏳ Optional delay to avoid hitting API limits
-        time.sleep(2)
+    metrics.start_run("influencertweetscrape")
+    started = time.monotonic()
+    all_tweets = process_accounts(USERNAMES)
+    print(f"⏱️ Processed {len(USERNAMES)} accounts in {time.monotonic() - started:.1f}s")
 
     # ----------------------------------------------------------
     # 💾 Save all tweets to one CSV
@@ -144,4 +128,6 @@ if __name__ == "__main__":
         writer.writeheader()
         writer.writerows(all_tweets)
 
+    print(keyword_filter.stats.report())
+    print(near_duplicates.index.report())
     print(f"\n✅ Done! Saved {len(all_tweets)} tweets to '{csv_filename}'.")
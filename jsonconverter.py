@@ -1,41 +1,166 @@
+import argparse
 import json
 import csv
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from compact_format import SUFFIX, CompactDump, is_compact
+from tweet_output import iter_ndjson
+
+CSV_HEADER = ['username', 'tweet_id', 'url', 'created_at', 'text', 'author']
+
+
+def iter_json_array(json_file_path, chunk_size=1 << 16):
+    """
+    Yield the elements of a top-level JSON array one at a time.
+
+    Only the current element is held in memory, so a 50 MB dump costs the
+    same as a 50 KB one.
+    """
+    decoder = json.JSONDecoder()
+    with open(json_file_path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        eof = False
+        while not buffer and not eof:
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = chunk.lstrip()
+        if not buffer.startswith('['):
+            raise ValueError(f"{json_file_path} is not a JSON array")
+        buffer = buffer[1:]
+
+        while True:
+            buffer = buffer.lstrip().lstrip(',').lstrip()
+            if buffer.startswith(']'):
+                return
+            try:
+                item, end = decoder.raw_decode(buffer)
+                # Only a following delimiter proves the value is whole: "12" or "1e" may go on in the next chunk
+                complete = eof or (end < len(buffer) and buffer[end] in ',] \t\r\n')
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+            if not complete:
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer += chunk
+                continue
+            yield item
+            buffer = buffer[end:]
+
+
+def iter_records(path):
+    """Records of a dump in any of our formats: JSON array, NDJSON (optionally .gz/.zst) or compact folder."""
+    if is_compact(path):
+        return CompactDump(path).iter_tweets()
+    if '.ndjson' in os.path.basename(path):
+        return iter_ndjson(path)
+    return iter_json_array(path)
+
+
+def to_row(record):
+    """CSV row for either schema: raw API tweets (nested author) or flattened health records."""
+    if 'tweet_id' in record:
+        return [record.get('username', ''), record.get('tweet_id', ''), record.get('url', ''),
+                record.get('created_at', ''), record.get('text', ''), record.get('author', '')]
+
+    author = record.get('author') or {}
+    return [author.get('userName', ''), record.get('id', ''), record.get('url', ''),
+            record.get('createdAt', ''), record.get('text', ''), author.get('name', '')]
+
 
 def convert_json_to_csv(json_file_path, csv_file_path):
     """
     Convert JSON file with tweet data to CSV format.
-    
+
+    The input is streamed record by record; raw API tweets and health records
+    are detected per record, so both kinds of dump produce the same columns.
+
     Args:
-        json_file_path: Path to input JSON file
+        json_file_path: Path to input JSON (or NDJSON) file
         csv_file_path: Path to output CSV file
     """
-    # Read JSON file
-    with open(json_file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
+    count = 0
+
     # Open CSV file for writing
     with open(csv_file_path, 'w', newline='', encoding='utf-8') as f:
         writer = csv.writer(f)
-        
+
         # Write header
-        writer.writerow(['username', 'tweet_id', 'url', 'created_at', 'text', 'author'])
-        
+        writer.writerow(CSV_HEADER)
+
         # Write data rows
-        for tweet in data:
-            username = tweet.get('author', {}).get('userName', '')
-            tweet_id = tweet.get('id', '')
-            url = tweet.get('url', '')
-            created_at = tweet.get('createdAt', '')
-            text = tweet.get('text', '')
-            author = tweet.get('author', {}).get('name', '')
-            
-            writer.writerow([username, tweet_id, url, created_at, text, author])
-    
-    print(f"Successfully converted {json_file_path} to {csv_file_path}")
+        for record in iter_records(json_file_path):
+            writer.writerow(to_row(record))
+            count += 1
+
+    print(f"Successfully converted {json_file_path} to {csv_file_path} ({count} rows)")
+    return count
+
+
+def _csv_path(json_file_path, output_folder):
+    name = os.path.basename(json_file_path)
+    for ext in ('.ndjson.gz', '.ndjson.zst', '.ndjson', '.json', SUFFIX):
+        if name.endswith(ext):
+            name = name[:-len(ext)]
+            break
+    return os.path.join(output_folder, name + '.csv')
+
+
+def convert_folder(input_folder="data", output_folder="csv", workers=None):
+    """
+    Convert every dump in a folder, one file per process.
+
+    Args:
+        input_folder: Folder with *.json / *.ndjson[.gz|.zst] dumps and *.compact folders
+        output_folder: Where the CSV files go (created if needed)
+        workers: Number of processes (None = one per CPU core)
+
+    Returns:
+        {dump path: rows written}, with None for a file that failed; a
+        broken dump is reported and skipped, the others are still converted
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    paths = sorted(
+        p for p in glob.glob(os.path.join(input_folder, '*'))
+        if p.endswith(('.json', '.ndjson', '.ndjson.gz', '.ndjson.zst', SUFFIX))
+        and os.path.basename(p) != 'watermarks.json'
+    )
+
+    counts = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {p: pool.submit(convert_json_to_csv, p, _csv_path(p, output_folder)) for p in paths}
+        for path, future in futures.items():
+            try:
+                counts[path] = future.result()
+            except Exception as e:
+                print(f"❌ Could not convert {path}: {e}")
+                counts[path] = None
+                # Don't leave a truncated CSV behind
+                if os.path.exists(_csv_path(path, output_folder)):
+                    os.remove(_csv_path(path, output_folder))
+
+    failed = [p for p, count in counts.items() if count is None]
+    converted = sum(count for count in counts.values() if count is not None)
+    print(f"\n✅ Converted {len(paths) - len(failed)} files ({converted} rows) into {output_folder}/")
+    if failed:
+        print(f"⚠️ {len(failed)} files failed: {', '.join(os.path.basename(p) for p in failed)}")
+    return counts
+
 
 if __name__ == "__main__":
-    # Replace these with your actual file paths
-    input_json = "data/CCSoludo_tweets_20251103_120004.json"
-    output_csv = "CCSoludo_tweets.csv"
-    
-    convert_json_to_csv(input_json, output_csv)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Convert tweet dumps to CSV.")
+    parser.add_argument("input", nargs="?", default="data", help="A dump file, or a folder to convert in parallel")
+    parser.add_argument("output", nargs="?", help="CSV file, or output folder in folder mode (default: csv/)")
+    parser.add_argument("--workers", type=int, default=None, help="Processes for folder mode (default: CPU count)")
+    args = parser.parse_args()
+
+    # e.g. python jsonconverter.py data/CCSoludo_tweets_20251103_120004.json CCSoludo_tweets.csv
+    if os.path.isdir(args.input):
+        counts = convert_folder(args.input, args.output or "csv", workers=args.workers)
+        if None in counts.values():
+            raise SystemExit(1)
+    else:
+        convert_json_to_csv(args.input, args.output or _csv_path(args.input, "."))
@@ -0,0 +1,243 @@
+import atexit
+import hashlib
+import re
+import threading
+import time
+
+import environ
+
+import metrics
+from ratelimit import DEFAULT_BACKOFF, get_limiter, retry_after_seconds
+
+# ----------------------------------------------------------
+# ⚙️ Load environment variables
+# ----------------------------------------------------------
+env = environ.Env()
+env.read_env()
+
+_SPLIT_RE = re.compile(r"[\s,]+")
+
+
+def parse_keys(value):
+    """Keys from a comma/whitespace-separated string (or an iterable), without blanks or duplicates."""
+    items = _SPLIT_RE.split(value) if isinstance(value, str) else list(value)
+    return list(dict.fromkeys(k.strip() for k in items if k and k.strip()))
+
+
+def env_keys(name):
+    """
+    API keys from NAME_KEYS (several, comma-separated) or else NAME_KEY.
+
+    e.g. env_keys("TWITTER_API") reads TWITTER_API_KEYS, then TWITTER_API_KEY.
+    """
+    keys = parse_keys(env(f"{name}_KEYS", default=""))
+    return keys or [env(f"{name}_KEY")]
+
+
+def twitter_keys():
+    return env_keys("TWITTER_API")
+
+
+def openai_keys():
+    return env_keys("OPENAI_API")
+
+
+# ----------------------------------------------------------
+# 🔑 Per-key state
+# ----------------------------------------------------------
+class APIKey:
+    """
+    One key of a pool and what we know about it.
+
+    Args:
+        value: The secret itself (never printed)
+        label: Short name used in logs and metrics, e.g. "key2"
+        limiter: Optional AdaptiveRateLimiter pacing this key alone
+    """
+
+    def __init__(self, value, label, limiter=None):
+        self.value = value
+        self.label = label
+        self.limiter = limiter
+        self.in_flight = 0
+        self.requests = 0
+        self.rate_limited = 0
+        self.remaining = None
+        self.cooldown_until = 0.0
+
+    @property
+    def masked(self):
+        return f"…{self.value[-4:]}" if len(self.value) > 8 else "…"
+
+
+class KeyPool:
+    """
+    Several API keys for one provider, each with its own rate state.
+
+    acquire() hands out the least-loaded healthy key: keys cooling down
+    after a 429 are skipped, then the one with the fewest requests in flight
+    (and the most quota left, when the API reports it) wins. When a key has
+    its own limiter the request also has to get a token from it, so each key
+    is paced on its own and the pool's throughput grows with its size.
+
+    Args:
+        provider: Name used in logs, metrics and limiter names ("twitterapi", "openai")
+        keys: Key strings
+        limiters: Give every key its own AdaptiveRateLimiter (shared across
+            processes through RATE_LIMIT_STATE like the single-key limiter)
+    """
+
+    def __init__(self, provider, keys, limiters=False):
+        keys = parse_keys(keys)
+        if not keys:
+            raise ValueError(f"No API keys for {provider}")
+        self.provider = provider
+        self.keys = []
+        for i, value in enumerate(keys, 1):
+            limiter = None
+            if limiters:
+                # A lone key keeps the historical bucket name so its learned rate carries over
+                name = provider if len(keys) == 1 else f"{provider}:{hashlib.sha1(value.encode()).hexdigest()[:10]}"
+                limiter = get_limiter(name)
+            self.keys.append(APIKey(value, f"key{i}", limiter))
+        self._lock = threading.Lock()
+        if len(self.keys) > 1:
+            atexit.register(lambda: print(self.report()))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _load(self, key):
+        remaining = key.remaining if key.remaining is not None else float("inf")
+        return key.in_flight, -remaining, key.requests
+
+    def try_acquire(self, now=None):
+        """Reserve the least-loaded key that may send right now; returns (key, 0) or (None, seconds to wait)."""
+        now = time.time() if now is None else now
+        waits = []
+        with self._lock:
+            for key in sorted(self.keys, key=self._load):
+                if key.cooldown_until > now:
+                    waits.append(key.cooldown_until - now)
+                    continue
+                wait = key.limiter.try_acquire() if key.limiter is not None else 0.0
+                if wait > 0:
+                    waits.append(wait)
+                    continue
+                key.in_flight += 1
+                key.requests += 1
+                metrics.count(f"{self.provider}_{key.label}_requests")
+                return key, 0.0
+        return None, min(waits)
+
+    def acquire(self):
+        """Block until a key may send a request, and reserve it; pair with release()."""
+        while True:
+            key, wait = self.try_acquire()
+            if key is not None:
+                return key
+            time.sleep(wait)
+
+    def release(self, key, headers=None, rate_limited=False, wait=None):
+        """
+        Return a key after its request.
+
+        Args:
+            headers: Response headers (X-RateLimit-Remaining / Retry-After are read)
+            rate_limited: The request got a 429; the key cools down
+            wait: Cool-down in seconds when the caller already knows it
+
+        Returns:
+            The cool-down applied (0.0 when not rate limited)
+        """
+        lowered = {k.lower(): v for k, v in (headers or {}).items()}
+        with self._lock:
+            key.in_flight = max(key.in_flight - 1, 0)
+            try:
+                key.remaining = int(lowered["x-ratelimit-remaining"])
+            except (KeyError, ValueError):
+                pass
+            if not rate_limited:
+                if key.limiter is not None:
+                    key.limiter.on_success(headers)
+                return 0.0
+
+            key.rate_limited += 1
+            metrics.count(f"{self.provider}_{key.label}_429s")
+            if key.limiter is not None:
+                cooldown = key.limiter.on_rate_limited(headers)
+            else:
+                cooldown = wait if wait is not None else retry_after_seconds(headers)
+                cooldown = DEFAULT_BACKOFF if cooldown is None else cooldown
+            key.cooldown_until = max(key.cooldown_until, time.time() + cooldown)
+            return cooldown
+
+    def report(self):
+        lines = [f"🔑 {self.provider} keys:"]
+        with self._lock:
+            for key in self.keys:
+                rate = f", {key.limiter.rate:.2f} req/s" if key.limiter is not None else ""
+                quota = f", {key.remaining} left" if key.remaining is not None else ""
+                lines.append(f"   {key.label} ({key.masked}): {key.requests} requests, "
+                             f"{key.rate_limited} rate-limited{quota}{rate}")
+        return "\n".join(lines)
+
+
+# ----------------------------------------------------------
+# 🧠 OpenAI over several keys
+# ----------------------------------------------------------
+class PooledOpenAI:
+    """
+    Drop-in for the parts of OpenAI() the scripts use (chat.completions.create),
+    spreading requests over a KeyPool.
+
+    A rate-limited key cools down for the server's Retry-After and the
+    request is retried at once on the next healthy key.
+
+    Args:
+        keys: OpenAI API keys
+        max_retries: Rate-limit retries per request, across keys
+    """
+
+    def __init__(self, keys, max_retries=6):
+        from openai import OpenAI
+
+        self.pool = KeyPool("openai", keys)
+        self.max_retries = max_retries
+        # The SDK's own retries would sleep on a throttled key instead of moving to the next one
+        self._clients = {key.label: OpenAI(api_key=key.value, max_retries=0) for key in self.pool.keys}
+        self.chat = _Namespace(completions=_Namespace(create=self.create))
+
+    def create(self, **request):
+        import openai
+
+        for attempt in range(self.max_retries + 1):
+            key = self.pool.acquire()
+            try:
+                response = self._clients[key.label].chat.completions.create(**request)
+            except openai.RateLimitError as e:
+                headers = getattr(getattr(e, "response", None), "headers", None)
+                self.pool.release(key, headers, rate_limited=True)
+                if attempt == self.max_retries:
+                    raise
+                continue
+            except Exception:
+                self.pool.release(key)
+                raise
+            self.pool.release(key)
+            return response
+
+
+class _Namespace:
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+
+def openai_client(keys):
+    """OpenAI client for one key, PooledOpenAI for several; the SDK is only imported here."""
+    keys = parse_keys(keys)
+    if len(keys) == 1:
+        from openai import OpenAI
+
+        return OpenAI(api_key=keys[0])
+    return PooledOpenAI(keys)
@@ -0,0 +1,165 @@
+import re
+import threading
+import unicodedata
+
+# ----------------------------------------------------------
+# 📚 Health lexicons per tweet language
+# ----------------------------------------------------------
+# "strong" terms make a tweet health-related on their own; everything else goes to
+# the LLM. "weak" terms only label the tier in the stats. Terms are matched accent-
+# and case-insensitively as whole words, with an optional plural ending (s / es / x).
+# Words with a common non-health sense ("patient" = calm, computer "virus") are left
+# out of "strong": a strong match skips the LLM entirely.
+LEXICONS = {
+    "common": {
+        "strong": [
+            "covid", "covid19", "covid-19", "coronavirus", "ebola", "mpox", "monkeypox", "cholera",
+            "malaria", "polio", "hiv", "lassa", "ncdc", "gavi", "tuberculosis",
+        ],
+        "weak": ["who", "oms", "africa cdc", "cdc", "unicef"],
+    },
+    "en": {
+        "strong": [
+            "health", "healthcare", "health care", "public health", "mental health", "hospital", "clinic",
+            "vaccine", "vaccination", "vaccinate", "immunization", "immunisation", "disease", "outbreak",
+            "epidemic", "pandemic", "infection", "measles", "cancer", "diabetes", "doctor",
+            "nurse", "midwife", "medical", "medicine", "surgery", "pharmaceutical",
+            "maternal health", "malnutrition", "nutrition", "universal health coverage", "uhc",
+            "epidemiology", "hepatitis", "sickle cell", "dengue", "yellow fever", "antimicrobial",
+        ],
+        "weak": [
+            "care", "wellbeing", "well-being", "healthy", "fitness", "life", "lives", "safety", "water",
+            "sanitation", "food", "hunger", "women", "children", "mothers", "newborn", "emergency",
+            "research", "science", "treatment", "drug", "aids", "prevention", "protect", "insurance",
+        ],
+    },
+    "fr": {
+        "strong": [
+            "sante", "sante publique", "sante mentale", "hopital", "hopitaux", "clinique", "vaccin",
+            "vaccination", "maladie", "epidemie", "pandemie", "paludisme", "cholera", "rougeole",
+            "medecin", "infirmier", "infirmiere", "sage-femme", "medical", "medicaux", "medicale",
+            "medicament", "soins de sante", "cancer", "diabete", "vih", "sida",
+            "tuberculose", "depistage", "pharmacie", "chirurgie", "malnutrition", "nutrition",
+            "couverture sanitaire", "sanitaire", "epidemiologie", "hepatite", "drepanocytose",
+        ],
+        "weak": [
+            "soins", "bien-etre", "prevention", "urgence", "femmes", "enfants", "meres", "eau",
+            "assainissement", "alimentation", "faim", "recherche", "science", "traitement", "protection",
+            "securite", "vie", "assurance",
+        ],
+    },
+    "pt": {
+        "strong": [
+            "saude", "saude publica", "hospital", "hospitais", "clinica", "vacina", "vacinacao", "doenca",
+            "epidemia", "pandemia", "medico", "enfermeiro", "enfermeira", "medicamento",
+            "cancro", "cancer", "diabetes", "tuberculose", "sarampo", "desnutricao", "nutricao",
+        ],
+        "weak": ["cuidados", "prevencao", "emergencia", "mulheres", "criancas", "agua", "tratamento", "vida"],
+    },
+    "es": {
+        "strong": [
+            "salud", "salud publica", "hospital", "hospitales", "clinica", "vacuna", "vacunacion",
+            "enfermedad", "epidemia", "pandemia", "medico", "enfermera", "medicamento",
+            "cancer", "diabetes", "tuberculosis", "sarampion", "desnutricion", "nutricion",
+        ],
+        "weak": ["cuidados", "prevencion", "emergencia", "mujeres", "ninos", "agua", "tratamiento", "vida"],
+    },
+    "sw": {
+        "strong": ["afya", "hospitali", "chanjo", "ugonjwa", "magonjwa", "daktari", "wauguzi", "zahanati", "dawa"],
+        "weak": ["huduma", "wanawake", "watoto", "maji", "maisha"],
+    },
+}
+
+def normalize(text):
+    """Lower-case and strip accents so "Santé" and "sante" match the same term."""
+    text = unicodedata.normalize("NFKD", text or "").casefold()
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def _compile(terms):
+    """One alternation regex for a word list, longest terms first."""
+    if not terms:
+        return None
+    alternatives = "|".join(re.escape(normalize(t)) for t in sorted(set(terms), key=len, reverse=True))
+    return re.compile(rf"(?<![\w])#?(?:{alternatives})(?:s|es|x)?(?![\w])")
+
+
+class _Lexicon:
+    def __init__(self, languages):
+        self.strong = _compile([t for lang in languages for t in LEXICONS[lang]["strong"]])
+        self.weak = _compile([t for lang in languages for t in LEXICONS[lang]["weak"]])
+
+
+_ALL_LANGUAGES = [lang for lang in LEXICONS if lang != "common"]
+_lexicons = {lang: _Lexicon(["common", lang]) for lang in _ALL_LANGUAGES}
+# Unknown or missing `lang`: search every lexicon
+_fallback = _Lexicon(list(LEXICONS))
+
+
+# ----------------------------------------------------------
+# 📊 Tier statistics
+# ----------------------------------------------------------
+class CascadeStats:
+    """Thread-safe counters of how many tweets each tier decided."""
+
+    TIERS = ("positive", "weak", "unmatched")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = dict.fromkeys(self.TIERS, 0)
+
+    def add(self, tier):
+        with self._lock:
+            self.counts[tier] += 1
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def report(self):
+        total = self.total
+        if not total:
+            return "🔎 Keyword cascade: no tweets checked"
+        parts = ", ".join(f"{tier} {n} ({n / total:.0%})" for tier, n in self.counts.items())
+        saved = self.counts["positive"]
+        return f"🔎 Keyword cascade: {total} tweets → {parts}; {saved} decided without the LLM"
+
+
+stats = CascadeStats()
+
+
+# ----------------------------------------------------------
+# 🔎 Cascade
+# ----------------------------------------------------------
+def classify_text(text, lang=None):
+    """
+    Cheap first-stage verdict for a tweet.
+
+    Only a strong health term is conclusive. Silence is not: earlier health
+    dumps hold many LLM-confirmed health tweets that match no lexicon term
+    ("Centre d'hémodialyse de Buea…", "Be active."), so everything else is
+    left to the LLM, tagged "weak" or "unmatched" for the stats.
+
+    Args:
+        text: Tweet text
+        lang: The tweet's `lang` field from twitterapi.io (e.g. "en", "fr")
+
+    Returns:
+        (verdict, tier): verdict is True when the keywords are conclusive and
+        None when the tweet should go to the LLM
+    """
+    norm = normalize(text)
+    lexicon = _lexicons.get(lang) or _fallback
+
+    if lexicon.strong.search(norm):
+        return True, "positive"
+    if lexicon.weak.search(norm):
+        return None, "weak"
+    return None, "unmatched"
+
+
+def prefilter(text, lang=None):
+    """classify_text() that also records the tier in the module stats; returns True or None."""
+    verdict, tier = classify_text(text, lang)
+    stats.add(tier)
+    return verdict
@@ -0,0 +1,36 @@
+import threading
+
+
+class Lazy:
+    """
+    Stand-in for an object that is only built on first use.
+
+    Scripts keep module-level names like `client` and `twitter`, but the
+    factory (importing openai, reading the API keys, opening sessions) runs
+    the first time an attribute is read, so commands that never touch the
+    client don't pay for it.
+
+    Args:
+        factory: Zero-argument callable returning the real object
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._value = None
+        self._lock = threading.Lock()
+
+    def resolve(self):
+        """The real object (built once, thread-safely)."""
+        if self._value is None:
+            with self._lock:
+                if self._value is None:
+                    self._value = self._factory()
+        return self._value
+
+    @property
+    def built(self):
+        return self._value is not None
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
@@ -0,0 +1,374 @@
+import argparse
+import glob
+import json
+import math
+import os
+import re
+import threading
+import time
+import zlib
+
+import environ
+
+from classification_cache import CACHE_PATH, ClassificationCache, text_hash
+from jsonconverter import iter_records
+from keyword_filter import normalize
+from tweet_store import STORE_PATH, TweetStore
+
+# NumPy/SciPy are imported on first use (see _require_numpy); the default "llm" backend never needs them
+np = None
+sparse = None
+
+# ----------------------------------------------------------
+# ⚙️ Load environment variables
+# ----------------------------------------------------------
+env = environ.Env()
+env.read_env()
+
+MODEL_PATH = env("LOCAL_CLASSIFIER_MODEL", default=os.path.join(".cache", "local_classifier.npz"))
+# "llm" = OpenAI only (default), "local" = local model decides every tweet without any network call,
+# "hybrid" = local model decides the confident tweets and the LLM only sees the uncertain ones
+BACKENDS = ("llm", "local", "hybrid")
+BACKEND = env("CLASSIFIER_BACKEND", default="llm").strip().lower()
+if BACKEND not in BACKENDS:
+    raise ValueError(f"CLASSIFIER_BACKEND must be one of {', '.join(BACKENDS)}, not {BACKEND!r}")
+# In hybrid mode a tweet is decided locally when p(health) >= CONFIDENCE or <= 1 - CONFIDENCE
+CONFIDENCE = env.float("LOCAL_CLASSIFIER_CONFIDENCE", default=0.9)
+
+N_FEATURES = 2 ** 18
+
+_URL_RE = re.compile(r"https?://\S+")
+_MENTION_RE = re.compile(r"@\w+")
+_TOKEN_RE = re.compile(r"\w\w+")
+
+
+def _require_numpy():
+    global np, sparse
+    if np is None:
+        try:
+            import numpy
+            from scipy import sparse as scipy_sparse
+        except ImportError:
+            raise ImportError("The local classifier needs `pip install numpy scipy`") from None
+        np, sparse = numpy, scipy_sparse
+
+
+def _has_numpy():
+    try:
+        _require_numpy()
+    except ImportError:
+        return False
+    return True
+
+
+# ----------------------------------------------------------
+# 🔢 Hashed features
+# ----------------------------------------------------------
+def tokens(text):
+    """Unigrams and bigrams of the normalized text; links and @mentions are dropped."""
+    text = _MENTION_RE.sub(" ", _URL_RE.sub(" ", text or ""))
+    words = _TOKEN_RE.findall(normalize(text))
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def hash_counts(texts, n_features=N_FEATURES):
+    """Sparse (len(texts), n_features) matrix of sublinear term frequencies."""
+    _require_numpy()
+    rows, cols = [], []
+    for i, text in enumerate(texts):
+        buckets = [zlib.crc32(token.encode("utf-8")) % n_features for token in tokens(text)]
+        rows.extend([i] * len(buckets))
+        cols.extend(buckets)
+
+    counts = sparse.csr_matrix(
+        (np.ones(len(cols), dtype=np.float32), (np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64))),
+        shape=(len(texts), n_features),
+    )
+    counts.sum_duplicates()
+    counts.data = 1 + np.log(counts.data)
+    return counts
+
+
+def _l2_normalize(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ matrix
+
+
+# ----------------------------------------------------------
+# 🧮 Hashed TF-IDF + logistic regression
+# ----------------------------------------------------------
+class LocalClassifier:
+    """
+    Offline health classifier: hashed TF-IDF features and a linear model.
+
+    Inference is one sparse matrix product per batch, so thousands of tweets
+    per second are classified on CPU without touching the network.
+
+    Args:
+        weights: Linear weights, one per hashed feature
+        bias: Intercept
+        idf: Inverse document frequency per hashed feature
+        meta: Free-form training info saved with the model
+    """
+
+    def __init__(self, weights, bias, idf, meta=None):
+        _require_numpy()
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = float(bias)
+        self.idf = np.asarray(idf, dtype=np.float32)
+        self.meta = meta or {}
+
+    def features(self, texts):
+        return _l2_normalize(hash_counts(texts, len(self.idf)) @ sparse.diags(self.idf))
+
+    def predict_proba(self, texts):
+        """p(health-related) for each text, as a NumPy array."""
+        if not texts:
+            return np.zeros(0, dtype=np.float32)
+        scores = self.features(texts) @ self.weights + self.bias
+        return 1 / (1 + np.exp(-scores))
+
+    def predict(self, texts, threshold=0.5):
+        return [bool(p >= threshold) for p in self.predict_proba(texts)]
+
+    def decide(self, texts, confidence=CONFIDENCE):
+        """True/False for confident predictions, None where the LLM should decide."""
+        return [True if p >= confidence else False if p <= 1 - confidence else None
+                for p in self.predict_proba(texts)]
+
+    @classmethod
+    def train(cls, texts, labels, l2=1e-4, max_iter=300, n_features=N_FEATURES):
+        """
+        Fit a class-balanced, L2-regularized logistic regression.
+
+        Args:
+            texts: Training tweets
+            labels: True/False per tweet
+            l2: Regularization strength
+            max_iter: L-BFGS iterations
+        """
+        _require_numpy()
+        from scipy.optimize import minimize
+
+        counts = hash_counts(texts, n_features)
+        df = np.bincount(counts.indices, minlength=n_features)
+        idf = (np.log((1 + len(texts)) / (1 + df)) + 1).astype(np.float32)
+        X = _l2_normalize(counts @ sparse.diags(idf)).tocsr()
+
+        y = np.where(np.asarray(labels, dtype=bool), 1.0, -1.0)
+        positives = (y > 0).sum()
+        # Balanced class weights: both classes count as much in the loss
+        c = np.where(y > 0, len(y) / (2 * max(positives, 1)), len(y) / (2 * max(len(y) - positives, 1)))
+        c /= c.sum()
+        XT = X.T.tocsr()
+
+        def loss(params):
+            w, b = params[:-1], params[-1]
+            margins = y * (X @ w + b)
+            value = c @ np.logaddexp(0, -margins) + 0.5 * l2 * (w @ w)
+            g = -c * y / (1 + np.exp(margins))
+            return value, np.append(XT @ g + l2 * w, g.sum())
+
+        result = minimize(loss, np.zeros(n_features + 1), jac=True, method="L-BFGS-B",
+                          options={"maxiter": max_iter})
+        meta = {"trained_on": len(y), "positives": int(positives), "iterations": int(result.nit),
+                "loss": float(result.fun), "trained_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+        return cls(result.x[:-1], result.x[-1], idf, meta)
+
+    def save(self, path=MODEL_PATH):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp = path + ".tmp.npz"
+        np.savez_compressed(tmp, weights=self.weights, bias=self.bias, idf=self.idf,
+                            meta=json.dumps(self.meta))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        _require_numpy()
+        with np.load(path) as data:
+            return cls(data["weights"], data["bias"], data["idf"], json.loads(str(data["meta"])))
+
+
+_shared = None
+_shared_lock = threading.Lock()
+_warned = False
+
+
+def get_classifier():
+    """The trained model at MODEL_PATH, loaded once; None if it (or NumPy/SciPy) is missing."""
+    global _shared, _warned
+    with _shared_lock:
+        if _shared is None and os.path.exists(MODEL_PATH) and _has_numpy():
+            _shared = LocalClassifier.load(MODEL_PATH)
+        if _shared is None and not _warned:
+            print(f"⚠️ No local classifier at {MODEL_PATH} (train it with `python local_classifier.py train`)")
+            _warned = True
+        return _shared
+
+
+def is_health_related(text, tweet_id=None):
+    """Same interface as the scripts' LLM classifiers, answered by the local model."""
+    model = get_classifier()
+    if model is None:
+        raise RuntimeError(f"No local classifier at {MODEL_PATH}")
+    return model.predict([text])[0]
+
+
+def first_stage(texts):
+    """
+    Local verdicts for classify_many() according to CLASSIFIER_BACKEND.
+
+    Returns a True/False/None list ("local": every tweet decided, "hybrid":
+    only confident ones), or None when the LLM should see everything.
+
+    Raises:
+        ImportError / RuntimeError: "local" without NumPy/SciPy or a trained
+            model (only "hybrid" falls back to the LLM)
+    """
+    if BACKEND == "llm":
+        return None
+    model = get_classifier()
+    if model is None:
+        if BACKEND == "local":
+            # "local" opts out of OpenAI: never send the tweets there instead
+            _require_numpy()
+            raise RuntimeError(f"CLASSIFIER_BACKEND=local but no local classifier at {MODEL_PATH} "
+                               "(train it with `python local_classifier.py train`)")
+        return None
+    if BACKEND == "local":
+        return model.predict(texts)
+    return model.decide(texts)
+
+
+# ----------------------------------------------------------
+# 🏷️ Training data from earlier runs
+# ----------------------------------------------------------
+def load_labelled(folder="data", store_path=STORE_PATH, cache_path=CACHE_PATH):
+    """
+    Collect (tweet_id, text, label, source) tuples from everything earlier runs left behind.
+
+    Only tweets with a real LLM verdict are used:
+    - *_health_tweets_* dumps: health-related ("dump")
+    - raw timeline dumps: the cached verdict for the same text ("cache");
+      tweets that were never classified are skipped, not taken as negatives
+    - tweet store rows with a verdict: that verdict ("store")
+    """
+    labelled = {}
+    cached = ClassificationCache(cache_path).labels() if os.path.exists(cache_path) else {}
+
+    paths = sorted(glob.glob(os.path.join(folder, "*_tweets_*.json")) +
+                   glob.glob(os.path.join(folder, "*_tweets_*.ndjson*")))
+    for path in paths:
+        for record in iter_records(path):
+            if "tweet_id" in record:
+                labelled[str(record["tweet_id"])] = (record.get("text", ""), True, "dump")
+                continue
+            tweet_id, text = str(record.get("id", "")), record.get("text", "")
+            if not tweet_id or not text or tweet_id in labelled:
+                continue
+            verdict = cached.get(text_hash(text))
+            if verdict is not None:
+                labelled[tweet_id] = (text, verdict, "cache")
+
+    if store_path and os.path.exists(store_path):
+        store = TweetStore(store_path)
+        for row in store.query():
+            if row["is_health"] is not None and row["text"]:
+                labelled[row["tweet_id"]] = (row["text"], bool(row["is_health"]), "store")
+        store.close()
+
+    return [(tweet_id, text, label, source) for tweet_id, (text, label, source) in labelled.items() if text]
+
+
+def is_held_out(tweet_id, percent=20):
+    """Stable train/test split: the same tweet always lands on the same side."""
+    return zlib.crc32(str(tweet_id).encode("utf-8")) % 100 < percent
+
+
+def evaluate(model, texts, labels, confidence=CONFIDENCE):
+    """Accuracy, precision, recall and F1 at 0.5, plus hybrid-mode coverage and accuracy."""
+    started = time.perf_counter()
+    probs = model.predict_proba(texts)
+    elapsed = time.perf_counter() - started
+
+    truth = np.asarray(labels, dtype=bool)
+    pred = probs >= 0.5
+    tp = int((pred & truth).sum())
+    fp = int((pred & ~truth).sum())
+    fn = int((~pred & truth).sum())
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+
+    confident = (probs >= confidence) | (probs <= 1 - confidence)
+    return {
+        "tweets": len(texts),
+        "accuracy": float((pred == truth).mean()) if len(texts) else 0.0,
+        "precision": precision,
+        "recall": recall,
+        "f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        "hybrid_coverage": float(confident.mean()) if len(texts) else 0.0,
+        "hybrid_accuracy": float((pred == truth)[confident].mean()) if confident.any() else 0.0,
+        "tweets_per_second": len(texts) / elapsed if elapsed else math.inf,
+    }
+
+
+def print_report(title, metrics):
+    print(f"\n📊 {title}: {metrics['tweets']} tweets")
+    print(f"   accuracy {metrics['accuracy']:.1%}, precision {metrics['precision']:.1%}, "
+          f"recall {metrics['recall']:.1%}, F1 {metrics['f1']:.3f}")
+    print(f"   hybrid mode decides {metrics['hybrid_coverage']:.0%} locally "
+          f"at {metrics['hybrid_accuracy']:.1%} accuracy")
+    print(f"   ⚡ {metrics['tweets_per_second']:,.0f} tweets/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline hashed TF-IDF health classifier.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_train = sub.add_parser("train", help="Train on data/ + store + cache labels and evaluate on a held-out split")
+    p_train.add_argument("--data", default="data", help="Folder with earlier dumps")
+    p_train.add_argument("--held-out", type=int, default=20, help="Percent of tweets kept for evaluation")
+    p_train.add_argument("--l2", type=float, default=1e-4, help="Regularization strength")
+    p_train.add_argument("--output", default=MODEL_PATH, help="Where to save the model")
+
+    p_eval = sub.add_parser("evaluate", help="Evaluate the saved model on the held-out split")
+    p_eval.add_argument("--data", default="data")
+    p_eval.add_argument("--held-out", type=int, default=20)
+
+    p_predict = sub.add_parser("predict", help="Classify texts given on the command line")
+    p_predict.add_argument("texts", nargs="+")
+
+    args = parser.parse_args()
+
+    if args.command == "predict":
+        model = get_classifier()
+        if model is not None:
+            for text, p in zip(args.texts, model.predict_proba(args.texts)):
+                print(f"{'🏥' if p >= 0.5 else '➖'} {p:.2f}  {text}")
+        raise SystemExit(0 if model is not None else 1)
+
+    examples = load_labelled(args.data)
+    train = [e for e in examples if not is_held_out(e[0], args.held_out)]
+    test = [e for e in examples if is_held_out(e[0], args.held_out)]
+    positives = sum(e[2] for e in examples)
+    print(f"🏷️ {len(examples)} tweets with an LLM verdict ({positives} health-related) "
+          f"→ {len(train)} train / {len(test)} held out")
+    if not positives or positives == len(examples):
+        raise SystemExit("❌ Need both health and non-health verdicts (classify some raw timelines first)")
+
+    if args.command == "train":
+        started = time.monotonic()
+        model = LocalClassifier.train([e[1] for e in train], [e[2] for e in train], l2=args.l2)
+        print(f"🧮 Trained in {time.monotonic() - started:.1f}s ({model.meta['iterations']} L-BFGS iterations)")
+        model.meta["held_out"] = args.held_out
+        model.save(args.output)
+        print(f"💾 Saved model to {args.output}")
+    else:
+        model = get_classifier()
+        if model is None:
+            raise SystemExit(1)
+
+    print_report("Held-out", evaluate(model, [e[1] for e in test], [e[2] for e in test]))
@@ -0,0 +1,198 @@
+import atexit
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import re
+import threading
+import time
+
+import environ
+
+# ----------------------------------------------------------
+# ⚙️ Load environment variables
+# ----------------------------------------------------------
+env = environ.Env()
+env.read_env()
+
+# Where the end-of-run summary goes: *.prom = Prometheus textfile, anything else = JSON ("" = console only)
+METRICS_FILE = env("METRICS_FILE", default="")
+# Set to a path (e.g. run.pstats) to profile the whole run with cProfile
+PROFILE_FILE = env("PROFILE_FILE", default="")
+
+# Durations kept per timer for the percentiles
+MAX_SAMPLES = 10_000
+_NAME_RE = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+# ----------------------------------------------------------
+# ⏱️ Counters and timers
+# ----------------------------------------------------------
+class Metrics:
+    """
+    Thread-safe counters and stage timers for one run.
+
+    Timers keep count, total and max plus up to MAX_SAMPLES durations for
+    p50/p99. Names are free-form, e.g. "http_page" or "llm_calls".
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.counters = {}
+        self.timers = {}
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name, seconds):
+        with self._lock:
+            timer = self.timers.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0, "samples": []})
+            timer["count"] += 1
+            timer["total"] += seconds
+            timer["max"] = max(timer["max"], seconds)
+            if len(timer["samples"]) < MAX_SAMPLES:
+                timer["samples"].append(seconds)
+
+    @contextlib.contextmanager
+    def timer(self, name):
+        """Time the enclosed block under `name` (also when it raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def record_llm_usage(self, response):
+        """Count one chat completion and its prompt/completion tokens from response.usage."""
+        self.count("llm_calls")
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            self.count("llm_prompt_tokens", getattr(usage, "prompt_tokens", 0) or 0)
+            self.count("llm_completion_tokens", getattr(usage, "completion_tokens", 0) or 0)
+
+    def summary(self):
+        """Plain dict of everything recorded so far."""
+        with self._lock:
+            timers = {
+                name: {
+                    "count": t["count"],
+                    "total_seconds": round(t["total"], 4),
+                    "mean_ms": round(t["total"] / t["count"] * 1000, 2) if t["count"] else 0.0,
+                    "p50_ms": round(_percentile(t["samples"], 50) * 1000, 2),
+                    "p99_ms": round(_percentile(t["samples"], 99) * 1000, 2),
+                    "max_ms": round(t["max"] * 1000, 2),
+                }
+                for name, t in sorted(self.timers.items())
+            }
+            return {
+                "started_at": self.started,
+                "duration_seconds": round(time.time() - self.started, 3),
+                "counters": dict(sorted(self.counters.items())),
+                "timers": timers,
+            }
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.counters.clear()
+            self.timers.clear()
+
+
+metrics = Metrics()
+count = metrics.count
+timer = metrics.timer
+observe = metrics.observe
+record_llm_usage = metrics.record_llm_usage
+
+
+# ----------------------------------------------------------
+# 📤 Export
+# ----------------------------------------------------------
+def to_prometheus(summary, script):
+    """Prometheus text exposition format (for node_exporter's textfile collector)."""
+    label = f'script="{script}"'
+    lines = [
+        "# TYPE tweetscrape_run_duration_seconds gauge",
+        f"tweetscrape_run_duration_seconds{{{label}}} {summary['duration_seconds']}",
+        "# TYPE tweetscrape_last_run_timestamp_seconds gauge",
+        f"tweetscrape_last_run_timestamp_seconds{{{label}}} {summary['started_at'] + summary['duration_seconds']:.0f}",
+    ]
+    for name, value in summary["counters"].items():
+        metric = f"tweetscrape_{_NAME_RE.sub('_', name)}_total"
+        lines += [f"# TYPE {metric} counter", f"{metric}{{{label}}} {value}"]
+    for name, t in summary["timers"].items():
+        metric = f"tweetscrape_{_NAME_RE.sub('_', name)}_seconds"
+        lines += [
+            f"# TYPE {metric} summary",
+            f'{metric}{{{label},quantile="0.5"}} {t["p50_ms"] / 1000:.6f}',
+            f'{metric}{{{label},quantile="0.99"}} {t["p99_ms"] / 1000:.6f}',
+            f"{metric}_sum{{{label}}} {t['total_seconds']}",
+            f"{metric}_count{{{label}}} {t['count']}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def write_summary(path, script, summary=None):
+    """Write the run summary atomically, as Prometheus text for *.prom paths and JSON otherwise."""
+    summary = metrics.summary() if summary is None else summary
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        if path.endswith(".prom"):
+            f.write(to_prometheus(summary, script))
+        else:
+            json.dump(dict(summary, script=script), f, indent=2)
+    os.replace(tmp, path)
+
+
+def print_summary(summary=None):
+    summary = metrics.summary() if summary is None else summary
+    print(f"\n📈 Run metrics ({summary['duration_seconds']:.1f}s)")
+    for name, value in summary["counters"].items():
+        print(f"   {name}: {value}")
+    for name, t in summary["timers"].items():
+        print(f"   ⏱️ {name}: {t['count']}× total {t['total_seconds']:.2f}s, "
+              f"p50 {t['p50_ms']:.0f}ms, p99 {t['p99_ms']:.0f}ms")
+
+
+def start_run(script, metrics_file=METRICS_FILE, profile_file=PROFILE_FILE):
+    """
+    Call once at the top of a script's __main__: profiles the run when
+    PROFILE_FILE is set, and prints/exports the summary when the process exits.
+
+    Args:
+        script: Name used as the `script` label / JSON field
+        metrics_file: Export path (*.prom or JSON); "" = console only
+        profile_file: cProfile output path; "" = no profiling
+    """
+    metrics.reset()
+    profiler = cProfile.Profile() if profile_file else None
+    if profiler is not None:
+        profiler.enable()
+
+    def finish():
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile_file)
+            print(f"\n🔬 Profile saved to {profile_file} (top functions by cumulative time):")
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+
+        summary = metrics.summary()
+        print_summary(summary)
+        if metrics_file:
+            write_summary(metrics_file, script, summary)
+            print(f"💾 Metrics written to {metrics_file}")
+
+    atexit.register(finish)
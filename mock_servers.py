@@ -0,0 +1,330 @@
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from jsonconverter import iter_records
+from keyword_filter import classify_text
+
+PAGE_SIZE = 20
+
+
+# ----------------------------------------------------------
+# 📂 Fixtures from data/
+# ----------------------------------------------------------
+def _as_api_tweet(record):
+    """Turn a flattened health record back into the twitterapi.io tweet shape."""
+    if "tweet_id" not in record:
+        return record
+    return {
+        "type": "tweet",
+        "id": str(record["tweet_id"]),
+        "url": record.get("url"),
+        "text": record.get("text", ""),
+        "createdAt": record.get("created_at"),
+        "lang": None,
+        "likeCount": record.get("likes", 0),
+        "retweetCount": record.get("retweets", 0),
+        "replyCount": record.get("replies", 0),
+        "author": {"userName": record.get("username"), "name": record.get("author")},
+    }
+
+
+def load_fixtures(folder="data"):
+    """Every tweet of every data/ dump (raw and health schemas) in API shape."""
+    tweets = []
+    for path in sorted(glob.glob(os.path.join(folder, "*_tweets_*.json"))):
+        tweets.extend(_as_api_tweet(record) for record in iter_records(path))
+    return [t for t in tweets if t.get("id") and t.get("text")]
+
+
+class Timelines:
+    """
+    Deterministic fake timelines built from the fixtures.
+
+    Every username gets `tweets_per_user` tweets drawn from the fixture pool,
+    with fresh ids in descending order (newest first), so any account list
+    can be crawled and watermarks behave as with the real API.
+
+    Args:
+        fixtures: Tweets in API shape
+        tweets_per_user: Timeline length per account
+    """
+
+    def __init__(self, fixtures, tweets_per_user=400):
+        self.fixtures = fixtures
+        self.tweets_per_user = tweets_per_user
+        self._timelines = {}
+        self._lock = threading.Lock()
+
+    def get(self, username):
+        key = username.lower()
+        with self._lock:
+            if key not in self._timelines:
+                rng = random.Random(key)
+                base = 1_900_000_000_000_000_000 + rng.randrange(10 ** 12)
+                timeline = []
+                for i in range(self.tweets_per_user):
+                    tweet = dict(rng.choice(self.fixtures))
+                    tweet["id"] = str(base - i * 1000)
+                    tweet["author"] = dict(tweet.get("author") or {}, userName=username)
+                    tweet["url"] = f"https://x.com/{username}/status/{tweet['id']}"
+                    timeline.append(tweet)
+                self._timelines[key] = timeline
+            return self._timelines[key]
+
+
+# ----------------------------------------------------------
+# 🐦 twitterapi.io stand-in
+# ----------------------------------------------------------
+class _TwitterHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        server.count("requests")
+
+        if url.path != "/twitter/user/last_tweets":
+            return self._send(404, {"status": "error", "message": "unknown endpoint"})
+        if not params.get("userName"):
+            return self._send(400, {"status": "error", "message": "userName is required"})
+
+        if server.latency:
+            time.sleep(server.latency * random.uniform(0.5, 1.5))
+        if server.rate_limit_ratio and random.random() < server.rate_limit_ratio:
+            server.count("rate_limited")
+            return self._send(429, {"status": "error", "message": "Too many requests"},
+                              {"Retry-After": str(server.retry_after)})
+        if not server.within_key_quota(self.headers.get("X-API-Key")):
+            server.count("rate_limited")
+            return self._send(429, {"status": "error", "message": "Too many requests for this key"},
+                              {"Retry-After": "1"})
+
+        timeline = server.timelines.get(params["userName"])
+        try:
+            offset = int(params.get("cursor") or 0)
+        except ValueError:
+            return self._send(400, {"status": "error", "message": "bad cursor"})
+
+        page = timeline[offset:offset + server.page_size]
+        has_next = offset + server.page_size < len(timeline)
+        server.count("tweets", len(page))
+        self._send(200, {
+            "status": "success",
+            "data": {"tweets": page},
+            "has_next_page": has_next,
+            "next_cursor": str(offset + server.page_size) if has_next else "",
+        })
+
+
+class MockTwitterServer(ThreadingHTTPServer):
+    """
+    Local twitterapi.io serving paginated /twitter/user/last_tweets from the fixtures.
+
+    Args:
+        timelines: Timelines instance
+        latency: Mean seconds added to every response (0.5x to 1.5x jitter)
+        rate_limit_ratio: Share of requests answered with 429
+        retry_after: Retry-After header on injected 429s
+        page_size: Tweets per page
+        key_rate: Requests per second allowed per X-API-Key (0 = unlimited)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, timelines, host="127.0.0.1", port=0, latency=0.0, rate_limit_ratio=0.0,
+                 retry_after=1, page_size=PAGE_SIZE, key_rate=0):
+        super().__init__((host, port), _TwitterHandler)
+        self.key_rate = key_rate
+        self._key_windows = {}
+        self.timelines = timelines
+        self.latency = latency
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        self.page_size = page_size
+        self.counters = {"requests": 0, "rate_limited": 0, "tweets": 0}
+        self._counter_lock = threading.Lock()
+
+    def count(self, name, n=1):
+        with self._counter_lock:
+            self.counters[name] += n
+
+    def within_key_quota(self, key):
+        """Count one request against `key`'s one-second window; False once key_rate is used up."""
+        if not self.key_rate:
+            return True
+        second = int(time.time())
+        with self._counter_lock:
+            window, used = self._key_windows.get(key, (second, 0))
+            if window != second:
+                window, used = second, 0
+            self._key_windows[key] = (window, used + 1)
+            return used < self.key_rate
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+
+# ----------------------------------------------------------
+# 🧠 OpenAI chat-completions stand-in
+# ----------------------------------------------------------
+_NUMBERED_RE = re.compile(r"^\d+\. (\".*\")$", re.MULTILINE)
+
+
+def _fake_verdict(text):
+    """Keyword verdict standing in for the model's judgement."""
+    return bool(classify_text(text)[0])
+
+
+class _OpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        server.count("requests")
+
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            payload = json.dumps({"error": {"message": "unknown endpoint"}}).encode("utf-8")
+            self.send_response(404)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        if server.latency:
+            time.sleep(server.latency * random.uniform(0.5, 1.5))
+        if server.rate_limit_ratio and random.random() < server.rate_limit_ratio:
+            server.count("rate_limited")
+            payload = json.dumps({"error": {"message": "Rate limit reached", "type": "requests",
+                                            "code": "rate_limit_exceeded"}}).encode("utf-8")
+            self.send_response(429)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.send_header("Retry-After", str(server.retry_after))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        messages = request.get("messages", [])
+        system = " ".join(m.get("content", "") for m in messages if m.get("role") == "system")
+        prompt = "\n".join(m.get("content", "") for m in messages)
+
+        if (request.get("response_format") or {}).get("type") == "json_object":
+            texts = [json.loads(t) for t in _NUMBERED_RE.findall(messages[-1].get("content", ""))]
+            content = json.dumps({"verdicts": [_fake_verdict(t) for t in texts]})
+        else:
+            verdict = _fake_verdict(messages[-1].get("content", ""))
+            if "'True' or 'False'" in system:
+                content = "True" if verdict else "False"
+            else:
+                content = "Yes" if verdict else "No"
+
+        prompt_tokens = len(prompt.split())
+        completion_tokens = len(content.split())
+        server.count("prompt_tokens", prompt_tokens)
+        server.count("completion_tokens", completion_tokens)
+        payload = json.dumps({
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "gpt-4o-mini"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    """
+    Local /v1/chat/completions answering with keyword verdicts after a configurable delay.
+
+    Handles both the per-tweet prompts (True/False or Yes/No) and the JSON
+    batch prompt of batch_classifier, and reports token usage like the API.
+
+    Args:
+        latency: Mean seconds per completion (0.5x to 1.5x jitter)
+        rate_limit_ratio: Share of requests answered with 429
+        retry_after: Retry-After header on injected 429s
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, rate_limit_ratio=0.0, retry_after=1):
+        super().__init__((host, port), _OpenAIHandler)
+        self.latency = latency
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        self.counters = {"requests": 0, "rate_limited": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        self._counter_lock = threading.Lock()
+
+    def count(self, name, n=1):
+        with self._counter_lock:
+            self.counters[name] += n
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/v1"
+
+
+def start(server):
+    """Serve in a daemon thread; returns the server."""
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the local twitterapi.io and OpenAI stand-ins.")
+    parser.add_argument("--twitter-port", type=int, default=8081)
+    parser.add_argument("--openai-port", type=int, default=8082)
+    parser.add_argument("--tweets-per-user", type=int, default=400)
+    parser.add_argument("--api-latency", type=float, default=0.2, help="Mean seconds per twitterapi.io page")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Mean seconds per chat completion")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="Share of pages answered with 429")
+    args = parser.parse_args()
+
+    twitter = start(MockTwitterServer(Timelines(load_fixtures(), args.tweets_per_user), port=args.twitter_port,
+                                      latency=args.api_latency, rate_limit_ratio=args.rate_limit_ratio))
+    openai = start(MockOpenAIServer(port=args.openai_port, latency=args.llm_latency))
+
+    # e.g. TWITTER_API_BASE_URL=http://127.0.0.1:8081 OPENAI_BASE_URL=http://127.0.0.1:8082/v1 python getalltweets.py
+    print(f"🐦 twitterapi.io stand-in: TWITTER_API_BASE_URL={twitter.url}")
+    print(f"🧠 OpenAI stand-in:        OPENAI_BASE_URL={openai.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
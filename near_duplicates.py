@@ -0,0 +1,149 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+import environ
+
+from classification_cache import normalize_text
+
+# ----------------------------------------------------------
+# ⚙️ Load environment variables
+# ----------------------------------------------------------
+env = environ.Env()
+env.read_env()
+
+NEAR_DUPLICATES = env.bool("NEAR_DUPLICATES", default=True)
+# Tweets whose 64-bit SimHashes differ in at most this many bits share a verdict
+MAX_DISTANCE = env.int("SIMHASH_MAX_DISTANCE", default=3)
+# Clusters remembered at once; the least recently matched ones are forgotten beyond this
+MAX_CLUSTERS = env.int("NEAR_DUPLICATES_MAX_CLUSTERS", default=100_000)
+# Texts with fewer words than this are never merged (too little signal for a fingerprint)
+MIN_WORDS = 4
+
+_RETWEET_RE = re.compile(r"^rt @\w+:\s*")
+_MENTION_RE = re.compile(r"@\w+")
+_WORD_RE = re.compile(r"\w+")
+
+
+# ----------------------------------------------------------
+# 🧬 SimHash fingerprints
+# ----------------------------------------------------------
+def words(text):
+    """Words of the normalized text, without the "RT @user:" prefix, links or @mentions."""
+    text = _RETWEET_RE.sub("", normalize_text(text))
+    return _WORD_RE.findall(_MENTION_RE.sub(" ", text))
+
+
+def _hash64(feature):
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(tokens):
+    """64-bit SimHash over unigrams and bigrams: similar texts get fingerprints a few bits apart."""
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    # One 64-char bit string per feature; a fingerprint bit is set when most features set it
+    rows = [format(_hash64(feature), "064b") for feature in features]
+    half = len(rows) / 2
+    return int("".join("1" if column.count("1") > half else "0" for column in map("".join, zip(*rows))), 2)
+
+
+def _bands(max_distance):
+    """Split the 64 bits into max_distance + 1 bands: two fingerprints within the distance share one band."""
+    count = max_distance + 1
+    edges = [64 * i // count for i in range(count + 1)]
+    return [(start, (1 << (end - start)) - 1) for start, end in zip(edges, edges[1:])]
+
+
+# ----------------------------------------------------------
+# 🗂️ Near-duplicate index
+# ----------------------------------------------------------
+class NearDuplicateIndex:
+    """
+    Groups reposts, retweets and boilerplate so each cluster is classified once.
+
+    Every fingerprint is filed under each of its bands; a new text only has to
+    be compared with the fingerprints sharing one of its bands. The index
+    lives for the whole process, so clusters span accounts and pages, but it
+    keeps at most `max_clusters` clusters (least recently matched ones are
+    dropped with their verdicts) so a long-running watch daemon stays bounded.
+
+    Args:
+        max_distance: Largest Hamming distance between fingerprints of one cluster
+        max_clusters: Clusters kept in memory
+    """
+
+    def __init__(self, max_distance=MAX_DISTANCE, max_clusters=MAX_CLUSTERS):
+        self.max_distance = max_distance
+        self.max_clusters = max_clusters
+        self._bands = _bands(max_distance)
+        self._buckets = {}
+        # Leader fingerprint -> {prompt version: verdict}, in least recently matched order
+        self._leaders = OrderedDict()
+        self._lock = threading.Lock()
+        self.seen = 0
+        self.duplicates = 0
+        self.clusters = 0
+
+    def cluster(self, text):
+        """
+        Cluster id for a text: the fingerprint of the first text it matched, or its own.
+
+        Returns None for texts too short to fingerprint reliably.
+        """
+        tokens = words(text)
+        fingerprint = simhash(tokens) if len(tokens) >= MIN_WORDS else None
+        with self._lock:
+            self.seen += 1
+            if fingerprint is None:
+                return None
+            keys = [(i, fingerprint >> start & mask) for i, (start, mask) in enumerate(self._bands)]
+
+            for key in keys:
+                for leader in self._buckets.get(key, ()):
+                    if bin(leader ^ fingerprint).count("1") <= self.max_distance:
+                        self.duplicates += 1
+                        self._leaders.move_to_end(leader)
+                        return leader
+
+            for key in keys:
+                self._buckets.setdefault(key, []).append(fingerprint)
+            self._leaders[fingerprint] = {}
+            self.clusters += 1
+            while len(self._leaders) > self.max_clusters:
+                self._forget(next(iter(self._leaders)))
+            return fingerprint
+
+    def _forget(self, leader):
+        """Drop a cluster from every band bucket along with its verdicts."""
+        del self._leaders[leader]
+        for i, (start, mask) in enumerate(self._bands):
+            key = (i, leader >> start & mask)
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.remove(leader)
+                if not bucket:
+                    del self._buckets[key]
+
+    def __len__(self):
+        return len(self._leaders)
+
+    def verdict(self, cluster_id, version):
+        """The verdict a classifier (prompt version) already gave to a cluster, or None."""
+        with self._lock:
+            return self._leaders.get(cluster_id, {}).get(version)
+
+    def set_verdict(self, cluster_id, version, verdict):
+        with self._lock:
+            # A cluster forgotten in the meantime just isn't remembered
+            if cluster_id in self._leaders:
+                self._leaders[cluster_id][version] = verdict
+
+    def report(self):
+        if not self.seen:
+            return "🧬 Near-duplicates: no tweets checked"
+        return (f"🧬 Near-duplicates: {self.duplicates} of {self.seen} tweets "
+                f"({self.duplicates / self.seen:.0%}) reused a verdict from {self.clusters} clusters")
+
+
+index = NearDuplicateIndex()
@@ -0,0 +1,201 @@
+import argparse
+import glob
+import os
+from datetime import datetime, timezone
+
+import environ
+
+from compact_format import SUFFIX
+from jsonconverter import iter_records
+from tweet_store import _FILENAME_RE, TweetStore, parse_created_at
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = None
+
+# ----------------------------------------------------------
+# ⚙️ Load environment variables
+# ----------------------------------------------------------
+env = environ.Env()
+env.read_env()
+
+# Root of the account-partitioned dataset (parquet/account=<name>/part-0.parquet)
+PARQUET_PATH = env("PARQUET_PATH", default="parquet")
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("The Parquet export needs `pip install pyarrow`")
+
+
+def schema():
+    """Typed columns of the export; `account` becomes the partition directory."""
+    _require_pyarrow()
+    return pa.schema([
+        ("tweet_id", pa.string()),
+        ("account", pa.string()),
+        ("created_at", pa.timestamp("s", tz="UTC")),
+        ("url", pa.string()),
+        ("text", pa.string()),
+        ("author_name", pa.string()),
+        ("lang", pa.string()),
+        ("likes", pa.int64()),
+        ("retweets", pa.int64()),
+        ("replies", pa.int64()),
+        ("views", pa.int64()),
+        ("is_health", pa.bool_()),
+        # True when is_health is a classifier verdict (store rows from a crawl); health-dump rows,
+        # dumped or imported into the store, are True without their negatives, so they can't give a health share
+        ("classified", pa.bool_()),
+    ])
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _timestamp(value):
+    ts = parse_created_at(value)
+    return datetime.fromtimestamp(ts, timezone.utc) if ts is not None else None
+
+
+# ----------------------------------------------------------
+# 📥 Rows from dumps or the tweet store
+# ----------------------------------------------------------
+def row_from_record(record, fallback_account=""):
+    """
+    Typed row for a raw API tweet or a flattened health record (which is health-related by definition).
+
+    Neither counts as `classified`: a health dump only holds the positives of a run.
+    """
+    if "tweet_id" in record:
+        return {
+            "tweet_id": str(record["tweet_id"]),
+            "account": (record.get("username") or fallback_account).lower(),
+            "created_at": _timestamp(record.get("created_at")),
+            "url": record.get("url"),
+            "text": record.get("text", ""),
+            "author_name": record.get("author"),
+            "lang": None,
+            "likes": _int(record.get("likes")),
+            "retweets": _int(record.get("retweets")),
+            "replies": _int(record.get("replies")),
+            "views": None,
+            "is_health": True,
+            "classified": False,
+        }
+
+    author = record.get("author") or {}
+    return {
+        "tweet_id": str(record.get("id")),
+        "account": (author.get("userName") or fallback_account).lower(),
+        "created_at": _timestamp(record.get("createdAt")),
+        "url": record.get("url"),
+        "text": record.get("text", ""),
+        "author_name": author.get("name"),
+        "lang": record.get("lang"),
+        "likes": _int(record.get("likeCount")),
+        "retweets": _int(record.get("retweetCount")),
+        "replies": _int(record.get("replyCount")),
+        "views": _int(record.get("viewCount")),
+        "is_health": None,
+        "classified": False,
+    }
+
+
+def rows_from_dumps(folder="data"):
+    """
+    Deduplicated rows of every dump in a folder.
+
+    A tweet found in both a raw dump and a health dump keeps the raw counts
+    and is marked health-related.
+    """
+    paths = sorted(glob.glob(os.path.join(folder, "*_tweets_*.json")) +
+                   glob.glob(os.path.join(folder, "*_tweets_*.ndjson*")) +
+                   glob.glob(os.path.join(folder, f"*_tweets_*{SUFFIX}")))
+    rows = {}
+    for path in paths:
+        match = _FILENAME_RE.match(os.path.basename(path))
+        fallback = match.group("user") if match else ""
+        for record in iter_records(path):
+            row = row_from_record(record, fallback)
+            if row["tweet_id"] in ("", "None"):
+                continue
+            current = rows.get(row["tweet_id"])
+            if current is None:
+                rows[row["tweet_id"]] = row
+            else:
+                for key, value in row.items():
+                    if current.get(key) is None and value is not None:
+                        current[key] = value
+    return list(rows.values())
+
+
+def rows_from_store(store):
+    """Rows of the tweet store, which is already deduplicated; only its classifier verdicts count as classified."""
+    for row in store.query():
+        yield {
+            "tweet_id": row["tweet_id"],
+            "account": row["account"],
+            "created_at": (datetime.fromtimestamp(row["created_ts"], timezone.utc)
+                           if row["created_ts"] is not None else None),
+            "url": row["url"],
+            "text": row["text"],
+            "author_name": row["author_name"],
+            "lang": row["lang"],
+            "likes": row["likes"],
+            "retweets": row["retweets"],
+            "replies": row["replies"],
+            "views": _int(row["views"]),
+            "is_health": None if row["is_health"] is None else bool(row["is_health"]),
+            "classified": row["verdict_source"] == "classifier",
+        }
+
+
+# ----------------------------------------------------------
+# 📦 Write the dataset
+# ----------------------------------------------------------
+def write_dataset(rows, path=PARQUET_PATH):
+    """
+    Write rows as Parquet partitioned by account (hive style: <path>/account=<name>/).
+
+    Each account's partition is replaced as a whole, so re-exporting never
+    duplicates rows; accounts absent from `rows` are left untouched.
+
+    Returns:
+        Number of rows written
+    """
+    _require_pyarrow()
+    table = pa.Table.from_pylist(list(rows), schema=schema()).sort_by([("account", "ascending"),
+                                                                        ("created_at", "ascending")])
+    ds.write_dataset(
+        table, path, format="parquet",
+        partitioning=ds.partitioning(pa.schema([("account", pa.string())]), flavor="hive"),
+        existing_data_behavior="delete_matching",
+        basename_template="part-{i}.parquet",
+        max_rows_per_group=64 * 1024,
+    )
+    print(f"📦 Wrote {table.num_rows} tweets ({len(table.column('account').unique())} accounts) to {path}/")
+    return table.num_rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export tweets as Parquet partitioned by account.")
+    parser.add_argument("--from-store", action="store_true", help="Export the tweet store instead of data/ dumps")
+    parser.add_argument("--input", default="data", help="Folder with the dumps")
+    parser.add_argument("--output", default=PARQUET_PATH)
+    args = parser.parse_args()
+
+    # e.g. python parquet_export.py
+    #      python parquet_export.py --from-store --output parquet
+    if args.from_store:
+        store = TweetStore()
+        write_dataset(rows_from_store(store), args.output)
+        store.close()
+    else:
+        write_dataset(rows_from_dumps(args.input), args.output)
@@ -0,0 +1,213 @@
+import email.utils
+import os
+import sqlite3
+import threading
+import time
+
+import environ
+
+# ----------------------------------------------------------
+# ⚙️ Load environment variables
+# ----------------------------------------------------------
+env = environ.Env()
+env.read_env()
+
+# SQLite file shared by every process on the host; set RATE_LIMIT_STATE="" to keep state per process
+STATE_PATH = env("RATE_LIMIT_STATE", default=os.path.join(".cache", "ratelimit.sqlite3"))
+START_RATE = env.float("TWITTER_API_RATE", default=1.0)
+MIN_RATE = env.float("TWITTER_API_MIN_RATE", default=0.1)
+MAX_RATE = env.float("TWITTER_API_MAX_RATE", default=20.0)
+DEFAULT_BACKOFF = 60
+
+
+# ----------------------------------------------------------
+# 📡 Rate-limit header parsing
+# ----------------------------------------------------------
+def retry_after_seconds(headers, now=None):
+    """
+    Seconds the server asked us to wait, from Retry-After or X-RateLimit-Reset headers.
+
+    Returns None when no usable hint is present.
+    """
+    now = time.time() if now is None else now
+    headers = {k.lower(): v for k, v in (headers or {}).items()}
+
+    value = headers.get("retry-after")
+    if value:
+        value = value.strip()
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            try:
+                parsed = email.utils.parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                parsed = None
+            if parsed is not None:
+                return max(parsed.timestamp() - now, 0.0)
+
+    reset = headers.get("x-ratelimit-reset")
+    if reset:
+        try:
+            reset = float(reset)
+        except ValueError:
+            return None
+        # Either an epoch timestamp or a number of seconds
+        return max(reset - now, 0.0) if reset > 1e9 else max(reset, 0.0)
+
+    return None
+
+
+def quota_exhausted(headers):
+    """True when X-RateLimit-Remaining says the current window is used up."""
+    headers = {k.lower(): v for k, v in (headers or {}).items()}
+    try:
+        return int(headers.get("x-ratelimit-remaining", "")) <= 0
+    except ValueError:
+        return False
+
+
+# ----------------------------------------------------------
+# 🚦 Adaptive token bucket
+# ----------------------------------------------------------
+class AdaptiveRateLimiter:
+    """
+    Token bucket whose refill rate adapts to the API's responses (AIMD).
+
+    Every success nudges the rate up by `increase` req/s, every 429 halves it
+    and blocks all callers until the server's Retry-After has passed. The
+    bucket is shared by all threads of the process and, when `state_path` is
+    set, by every process on the host through a small SQLite table.
+
+    Args:
+        name: Bucket name (one per API)
+        rate: Starting rate in requests per second
+        min_rate / max_rate: Bounds for the adaptive rate
+        burst: Maximum tokens saved up while idle
+        increase: Rate added after each successful request
+        state_path: SQLite file for cross-process sharing ("" or None = in-process only)
+    """
+
+    def __init__(self, name="twitterapi", rate=START_RATE, min_rate=MIN_RATE, max_rate=MAX_RATE,
+                 burst=5, increase=0.05, state_path=STATE_PATH):
+        self.name = name
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self._lock = threading.Lock()
+        self._state = {"tokens": 1.0, "rate": rate, "updated": time.time(), "blocked_until": 0.0}
+        self._db = None
+
+        if state_path:
+            folder = os.path.dirname(state_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            self._db = sqlite3.connect(state_path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS buckets (
+                    name TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    rate REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    blocked_until REAL NOT NULL
+                )
+                """
+            )
+            self._db.execute(
+                "INSERT OR IGNORE INTO buckets VALUES (?, ?, ?, ?, ?)",
+                (name, self._state["tokens"], rate, self._state["updated"], 0.0),
+            )
+
+    def _update(self, change):
+        """Apply `change(state, now)` atomically (thread lock + SQLite write lock) and return its result."""
+        with self._lock:
+            now = time.time()
+            if self._db is None:
+                return change(self._state, now)
+
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT tokens, rate, updated, blocked_until FROM buckets WHERE name = ?", (self.name,)
+                ).fetchone()
+                state = dict(zip(("tokens", "rate", "updated", "blocked_until"), row))
+                result = change(state, now)
+                self._db.execute(
+                    "UPDATE buckets SET tokens = ?, rate = ?, updated = ?, blocked_until = ? WHERE name = ?",
+                    (state["tokens"], state["rate"], state["updated"], state["blocked_until"], self.name),
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            # Local mirror of the shared row, read by `rate` without touching SQLite
+            self._state = state
+            return result
+
+    def _refill(self, state, now):
+        elapsed = max(now - state["updated"], 0.0)
+        state["tokens"] = min(self.burst, state["tokens"] + elapsed * state["rate"])
+        state["updated"] = now
+
+    def try_acquire(self):
+        """Take a token if one is available; returns 0.0 on success, else the seconds until one might be."""
+        def take(state, now):
+            self._refill(state, now)
+            if now < state["blocked_until"]:
+                return state["blocked_until"] - now
+            if state["tokens"] >= 1:
+                state["tokens"] -= 1
+                return 0.0
+            return (1 - state["tokens"]) / state["rate"]
+
+        return self._update(take)
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def on_success(self, headers=None):
+        """Speed up after a healthy response, or pause if the response says the quota is spent."""
+        pause = retry_after_seconds(headers) if quota_exhausted(headers) else None
+
+        def grow(state, now):
+            state["rate"] = min(self.max_rate, state["rate"] + self.increase)
+            if pause:
+                state["blocked_until"] = max(state["blocked_until"], now + pause)
+
+        self._update(grow)
+
+    def on_rate_limited(self, headers=None):
+        """Halve the rate and block every caller until the server's reset time. Returns the wait."""
+        wait = retry_after_seconds(headers)
+
+        def shrink(state, now):
+            state["rate"] = max(self.min_rate, state["rate"] / 2)
+            state["tokens"] = 0.0
+            backoff = wait if wait is not None else min(DEFAULT_BACKOFF, 2 / state["rate"])
+            state["blocked_until"] = max(state["blocked_until"], now + backoff)
+            return state["blocked_until"] - now
+
+        return self._update(shrink)
+
+    @property
+    def rate(self):
+        """Rate as of this process's last update of the bucket (for logs; no SQLite transaction)."""
+        return self._state["rate"]
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name="twitterapi"):
+    """Process-wide limiter for an API, shared by every worker thread."""
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = AdaptiveRateLimiter(name)
+        return _limiters[name]
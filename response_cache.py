@@ -0,0 +1,249 @@
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import environ
+
+# ----------------------------------------------------------
+# ⚙️ Load environment variables
+# ----------------------------------------------------------
+env = environ.Env()
+env.read_env()
+
+# off: always hit the API; record: serve fresh recorded pages (never a timeline's first page), record the rest;
+# replay: recorded pages only, no network
+CACHE_MODE = env("TWITTER_CACHE", default="off").strip().lower()
+CACHE_DIR = env("TWITTER_CACHE_DIR", default=os.path.join(".cache", "responses"))
+# Seconds a recorded page is served in record mode (0 = forever); replay ignores it
+CACHE_TTL = env.float("TWITTER_CACHE_TTL", default=24 * 3600.0)
+
+MODES = ("off", "record", "replay")
+# Request parameters that identify a page
+KEY_PARAMS = ("userName", "cursor", "includeReplies")
+
+
+class CacheMiss(Exception):
+    """A page that replay mode can't serve because it was never recorded."""
+
+
+def request_key(endpoint, params):
+    """Cache key of a request: hash of (endpoint, userName, cursor, includeReplies)."""
+    parts = {name: str(params.get(name) or "") for name in KEY_PARAMS}
+    parts["userName"] = parts["userName"].lower()
+    payload = json.dumps([endpoint, parts], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ----------------------------------------------------------
+# 📼 Record / replay store
+# ----------------------------------------------------------
+class ResponseCache:
+    """
+    On-disk cache of twitterapi.io response bodies.
+
+    The index (SQLite) maps each request key to the sha256 of its body; the
+    bodies themselves are zlib-compressed blobs under objects/, named by that
+    hash, so a page recorded twice (or shared by two requests) is stored once.
+    Bodies are kept as the API sent them, before field projection, so a
+    replay with a different TWEET_FIELDS still sees every field.
+
+    In record mode a request without a cursor (a timeline's first page) is
+    always fetched live and only recorded: it changes with every new tweet,
+    and a stale copy would make an incremental crawl miss everything posted
+    since. Deeper, cursor-addressed pages are served while fresh.
+
+    Args:
+        folder: Cache root (index.sqlite3 + objects/)
+        mode: "record" or "replay" (see TWITTER_CACHE)
+        ttl: Seconds a recorded page stays fresh in record mode (0 = forever)
+    """
+
+    def __init__(self, folder=CACHE_DIR, mode=CACHE_MODE, ttl=CACHE_TTL):
+        if mode not in MODES:
+            raise ValueError(f"TWITTER_CACHE must be one of {', '.join(MODES)}, not {mode!r}")
+        self.folder = folder
+        self.mode = mode
+        self.ttl = ttl
+        self.objects = os.path.join(folder, "objects")
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(self.objects, exist_ok=True)
+        self.path = os.path.join(folder, "index.sqlite3")
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                request_key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                user_name TEXT NOT NULL,
+                cursor TEXT NOT NULL,
+                include_replies TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                recorded_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_responses_digest ON responses (digest)")
+        self._db.commit()
+
+    @property
+    def replay(self):
+        return self.mode == "replay"
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects, digest[:2], digest[2:] + ".zz")
+
+    def get(self, endpoint, params, refresh=False):
+        """
+        The recorded body (decoded JSON) of a request, or None when it should be fetched.
+
+        Args:
+            refresh: Skip the lookup in record mode even for a cursor page;
+                replay mode still serves from disk
+
+        Raises:
+            CacheMiss: In replay mode, for a page that was never recorded
+        """
+        if not self.replay and (refresh or not params.get("cursor")):
+            return None
+        key = request_key(endpoint, params)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT digest, recorded_at FROM responses WHERE request_key = ?", (key,)
+            ).fetchone()
+
+        fresh = row is not None and (self.replay or not self.ttl or time.time() - row[1] < self.ttl)
+        body = None
+        if fresh:
+            try:
+                with open(self._object_path(row[0]), "rb") as f:
+                    body = zlib.decompress(f.read())
+            except (OSError, zlib.error):
+                body = None
+
+        if body is None:
+            self.misses += 1
+            if self.replay:
+                raise CacheMiss(f"Not recorded: {endpoint} userName={params.get('userName')} "
+                                f"cursor={params.get('cursor') or '(first page)'} (TWITTER_CACHE=replay)")
+            return None
+        self.hits += 1
+        return json.loads(body)
+
+    def put(self, endpoint, params, body):
+        """Record a successful response body (bytes as received)."""
+        if self.replay:
+            return
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(zlib.compress(body, 6))
+            os.replace(tmp, path)
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (request_key(endpoint, params), endpoint, str(params.get("userName") or "").lower(),
+                 str(params.get("cursor") or ""), str(params.get("includeReplies") or ""),
+                 digest, len(body), time.time()),
+            )
+            self._db.commit()
+
+    def prune(self, max_age=None):
+        """
+        Drop index entries older than max_age seconds (default: the TTL) and
+        the blobs no entry points to any more; returns (entries, blobs) removed.
+        """
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            removed = 0
+            if max_age:
+                removed = self._db.execute(
+                    "DELETE FROM responses WHERE recorded_at < ?", (time.time() - max_age,)
+                ).rowcount
+                self._db.commit()
+            live = {digest for (digest,) in self._db.execute("SELECT DISTINCT digest FROM responses")}
+
+        blobs = 0
+        for root, _, files in os.walk(self.objects):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                digest = os.path.basename(root) + name.split(".", 1)[0]
+                if digest not in live:
+                    os.remove(os.path.join(root, name))
+                    blobs += 1
+        return removed, blobs
+
+    def stats(self):
+        """Entries, distinct blobs, and body bytes before / after compression."""
+        with self._lock:
+            entries, blobs = self._db.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT digest) FROM responses").fetchone()
+            (raw,) = self._db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM responses)").fetchone()
+        stored = sum(os.path.getsize(os.path.join(root, name))
+                     for root, _, files in os.walk(self.objects) for name in files)
+        return {"entries": entries, "blobs": blobs, "raw_bytes": raw, "stored_bytes": stored}
+
+    def report(self):
+        total = self.hits + self.misses
+        rate = f" ({self.hits / total:.0%})" if total else ""
+        return f"📼 Response cache ({self.mode}): {self.hits} hits, {self.misses} misses{rate}"
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Process-wide response cache, or None when TWITTER_CACHE is off."""
+    global _shared
+    if CACHE_MODE == "off":
+        return None
+    with _shared_lock:
+        if _shared is None:
+            _shared = ResponseCache()
+            atexit.register(lambda: print(_shared.report()))
+        return _shared
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recorded twitterapi.io responses.")
+    parser.add_argument("--folder", default=CACHE_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Show what is recorded")
+    p_prune = sub.add_parser("prune", help="Remove old entries and unused blobs")
+    p_prune.add_argument("--max-age", type=float, default=None, help="Seconds (default: TWITTER_CACHE_TTL)")
+    args = parser.parse_args()
+
+    # e.g. TWITTER_CACHE=record python getalltweets.py   (first run records, reruns are served from disk)
+    #      TWITTER_CACHE=replay python getalltweets.py   (offline; unrecorded pages fail)
+    #      python response_cache.py prune --max-age 604800
+    cache = ResponseCache(args.folder, mode="record")
+    if args.command == "stats":
+        stats = cache.stats()
+        ratio = stats["raw_bytes"] / stats["stored_bytes"] if stats["stored_bytes"] else 0
+        print(f"📼 {stats['entries']} recorded pages in {stats['blobs']} blobs: "
+              f"{stats['raw_bytes'] / 1e6:.2f} MB of responses in {stats['stored_bytes'] / 1e6:.2f} MB "
+              f"({ratio:.1f}x)")
+    else:
+        entries, blobs = cache.prune(args.max_age)
+        print(f"🧹 Removed {entries} entries and {blobs} blobs")
@@ -0,0 +1,51 @@
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from analytics import load, per_account  # noqa: E402
+from parquet_export import write_dataset  # noqa: E402
+
+
+def row(tweet_id, account, is_health, classified, likes=1):
+    return {"tweet_id": str(tweet_id), "account": account, "created_at": None, "url": None, "text": "t",
+            "author_name": None, "lang": None, "likes": likes, "retweets": 0, "replies": 0, "views": None,
+            "is_health": is_health, "classified": classified}
+
+
+def test_health_share_only_from_classified_timelines(tmp_path):
+    path = str(tmp_path / "parquet")
+    write_dataset([
+        # Store rows: a real verdict for every tweet
+        row(1, "store_account", True, True),
+        row(2, "store_account", False, True),
+        row(3, "store_account", False, True),
+        row(4, "store_account", None, False),
+        # Health-dump rows only: positives without their negatives
+        row(5, "dump_account", True, False),
+        row(6, "dump_account", True, False),
+    ], path)
+
+    shares = {r["account"]: r for r in per_account(load(path)).to_pylist()}
+    assert shares["store_account"]["health_share"] == pytest.approx(1 / 3)
+    assert shares["store_account"]["tweets"] == 4
+    assert shares["dump_account"]["health_share"] is None
+    assert shares["dump_account"]["likes_sum"] == 2
+
+
+def test_backfilled_health_dump_has_no_health_share(tmp_path):
+    import json
+
+    from parquet_export import rows_from_store
+    from tweet_store import TweetStore
+
+    record = {"username": "DrTedros", "tweet_id": "1", "url": None, "created_at": "Mon Nov 03 12:00:00 +0000 2025",
+              "text": "vaccines", "likes": 3, "retweets": 0, "replies": 0, "author": "Tedros"}
+    (tmp_path / "DrTedros_health_tweets_20251103_120000.json").write_text(json.dumps([record]), encoding="utf-8")
+    store = TweetStore(str(tmp_path / "store.sqlite3"))
+    store.import_folder(str(tmp_path))
+
+    path = str(tmp_path / "parquet")
+    write_dataset(rows_from_store(store), path)
+    (shares,) = per_account(load(path)).to_pylist()
+    assert shares["account"] == "drtedros"
+    assert shares["health_share"] is None
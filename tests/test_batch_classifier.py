@@ -0,0 +1,110 @@
+import json
+
+import pytest
+
+import async_classifier
+
+import batch_classifier
+from batch_classifier import classify_many, parse_verdicts
+from classification_cache import ClassificationCache
+
+
+class FakeEngine:
+    def __init__(self):
+        self.requests = []
+        self.single_answers = []
+
+    def complete_many(self, requests):
+        self.requests.extend(requests)
+        return [json.dumps({"verdicts": [True] * (len(r["messages"][1]["content"].split("\n\n")))})
+                if "response_format" in r else self.single_answers.pop(0)
+                for r in requests]
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = FakeEngine()
+    monkeypatch.setattr(batch_classifier, "get_engine", lambda: engine)
+    monkeypatch.setattr(batch_classifier, "get_cache", lambda: ClassificationCache(str(tmp_path / "c.sqlite3")))
+    monkeypatch.setattr(batch_classifier, "first_stage", lambda texts: None)
+    monkeypatch.setattr(batch_classifier.near_duplicates, "NEAR_DUPLICATES", False)
+    return engine
+
+
+def _items(n):
+    return [(str(i), f"tweet number {i}") for i in range(n)]
+
+
+def test_batch_size_one_uses_per_tweet_classifier(engine):
+    calls = []
+    verdicts = classify_many(None, _items(4), "criteria", "v", lambda text, tweet_id: calls.append(tweet_id) or False,
+                             batch_size=1)
+    assert verdicts == [False] * 4
+    assert sorted(calls) == ["0", "1", "2", "3"]
+    assert engine.requests == []
+
+
+def test_lone_tail_chunk_uses_per_tweet_classifier(engine):
+    calls = []
+    verdicts = classify_many(None, _items(4), "criteria", "v", lambda text, tweet_id: calls.append(tweet_id) or False,
+                             batch_size=3)
+    assert verdicts == [True, True, True, False]
+    assert calls == ["3"]
+    assert len(engine.requests) == 1
+
+
+def _single_request(text):
+    return {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": text}]}
+
+
+def _no_sync_call(text, tweet_id):
+    raise AssertionError("the per-tweet prompt must go through the engine")
+
+
+def test_singles_go_through_the_engine(engine):
+    engine.single_answers = ["Yes", None]
+    verdicts = classify_many(None, _items(2), "criteria", "v", _no_sync_call, batch_size=1,
+                             single_request=_single_request, parse_single=lambda a: a == "Yes")
+    # A request the engine gave up on stays unclassified instead of becoming False
+    assert verdicts == [True, None]
+    assert [r["messages"][0]["content"] for r in engine.requests] == ["tweet number 0", "tweet number 1"]
+
+    engine.requests.clear()
+    engine.single_answers = ["No"]
+    assert classify_many(None, _items(2), "criteria", "v", _no_sync_call, batch_size=1,
+                         single_request=_single_request, parse_single=lambda a: a == "Yes") == [True, False]
+    assert len(engine.requests) == 1
+
+
+def test_rate_limited_singles_are_retried_not_labelled_false(tmp_path, monkeypatch):
+    pytest.importorskip("openai")
+    import health_classifier
+    from mock_servers import MockOpenAIServer, start
+
+    server = start(MockOpenAIServer(rate_limit_ratio=0.5, retry_after=0))
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("OPENAI_BASE_URL", server.url)
+    monkeypatch.setattr(batch_classifier, "get_engine",
+                        lambda: async_classifier.AsyncLLMEngine(concurrency=4, max_retries=30))
+    monkeypatch.setattr(batch_classifier, "get_cache", lambda: ClassificationCache(str(tmp_path / "c.sqlite3")))
+    monkeypatch.setattr(batch_classifier, "first_stage", lambda texts: None)
+    monkeypatch.setattr(batch_classifier.near_duplicates, "NEAR_DUPLICATES", False)
+    try:
+        items = [(str(i), f"New vaccine campaign against malaria, round {i}") for i in range(12)]
+        verdicts = classify_many(None, items, health_classifier.HEALTH_CRITERIA, health_classifier.PROMPT_VERSION,
+                                 _no_sync_call, batch_size=1, single_request=health_classifier.health_request,
+                                 parse_single=health_classifier.parse_answer)
+    finally:
+        server.shutdown()
+    assert server.counters["rate_limited"] > 0
+    assert verdicts == [True] * len(items)
+
+
+@pytest.mark.parametrize("answer, expected", [
+    ('{"verdicts": [true, false]}', [True, False]),
+    ('Sure: [true, "no"]', [True, False]),
+    ('{"verdicts": [true]}', None),
+    ("not json", None),
+])
+def test_parse_verdicts(answer, expected):
+    assert parse_verdicts(answer, 2) == expected
@@ -0,0 +1,59 @@
+import json
+
+import compact_format
+from compact_format import CompactDump, CompactWriter, pack, project, unpack
+
+
+def _tweet(i, author="alice", **extra):
+    tweet = {"id": str(i), "text": f"tweet {i}", "createdAt": "Mon Nov 03 12:00:00 +0000 2025", "likeCount": i,
+             "author": {"id": f"{author}-id", "userName": author, "name": author.title(), "followers": 10},
+             "entities": {}, "card": None}
+    tweet.update(extra)
+    return tweet
+
+
+def test_round_trip_is_exact(tmp_path):
+    tweets = [_tweet(1), _tweet(2, author="bob", entities={"hashtags": [{"text": "malaria"}]}),
+              _tweet(3, quoted_tweet={"id": "9", "text": "quoted"})]
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps(tweets), encoding="utf-8")
+
+    folder = pack(str(path))
+    assert list(CompactDump(folder).iter_tweets(with_blobs=True)) == tweets
+
+    restored = unpack(folder, str(tmp_path / "restored.json"))
+    with open(restored, encoding="utf-8") as f:
+        assert json.load(f) == tweets
+
+
+def test_authors_and_blobs_are_stored_once(tmp_path):
+    folder = str(tmp_path / "dump") + compact_format.SUFFIX
+    with CompactWriter(folder) as writer:
+        writer.write_many([_tweet(1), _tweet(2, entities={"urls": ["x"]})])
+    with CompactWriter(folder) as writer:
+        writer.write(_tweet(3))
+
+    dump = CompactDump(folder)
+    assert list(dump.authors()) == ["alice-id"]
+    assert dump.blobs("1") == {}
+    assert dump.blobs("2") == {"entities": {"urls": ["x"]}}
+    lean = list(dump.iter_tweets(with_author=False))
+    assert [t["authorId"] for t in lean] == ["alice-id"] * 3
+    assert "entities" not in lean[1]
+
+
+def test_string_author_stays_inline(tmp_path):
+    record = {"tweet_id": "1", "text": "clinic opened", "author": "Dr Alice"}
+    folder = str(tmp_path / "health") + compact_format.SUFFIX
+    with CompactWriter(folder) as writer:
+        writer.write(record)
+    assert list(CompactDump(folder).iter_tweets()) == [record]
+
+
+def test_project():
+    tweet = _tweet(1)
+    assert project(tweet, compact_format.parse_fields("")) is tweet
+    assert project(tweet, compact_format.parse_fields("id, text")) == {"id": "1", "text": "tweet 1"}
+    core = project(tweet, compact_format.parse_fields("core"))
+    assert core["author"] == {"id": "alice-id", "userName": "alice", "name": "Alice"}
+    assert "entities" not in core
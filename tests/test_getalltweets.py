@@ -0,0 +1,79 @@
+import json
+import threading
+import time
+
+import batch_classifier
+import getalltweets
+from classification_cache import ClassificationCache
+from getalltweets import prefetch_pages
+
+
+def _endless_pages(closed):
+    try:
+        page = 0
+        while True:
+            page += 1
+            yield [{"id": str(page)}]
+    finally:
+        closed.set()
+
+
+def _wait_for(event, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not event.is_set() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return event.is_set()
+
+
+def test_prefetch_yields_pages_in_order_and_reraises():
+    def pages():
+        yield [1]
+        yield [2]
+        raise ValueError("boom")
+
+    got = []
+    try:
+        for page in prefetch_pages(pages(), buffer=1):
+            got.append(page)
+    except ValueError as e:
+        assert str(e) == "boom"
+    assert got == [[1], [2]]
+
+
+def test_consumer_stopping_early_stops_the_producer():
+    closed = threading.Event()
+    pages = prefetch_pages(_endless_pages(closed), buffer=2)
+    assert next(pages) == [{"id": "1"}]
+    time.sleep(0.1)  # let the producer fill the queue and block on it
+    pages.close()
+
+    assert _wait_for(closed)
+    producers = [t for t in threading.enumerate() if t.name == "prefetch-pages"]
+    for producer in producers:
+        producer.join(timeout=5)
+    assert not any(t.is_alive() for t in producers)
+
+
+class FakeEngine:
+    def __init__(self):
+        self.requests = []
+
+    def complete_many(self, requests):
+        self.requests.extend(requests)
+        return [json.dumps({"verdicts": [False] * r["messages"][1]["content"].count("\n\n") + [False]})
+                for r in requests]
+
+
+def test_batch_prompt_asks_only_for_the_json_reply(tmp_path, monkeypatch):
+    engine = FakeEngine()
+    monkeypatch.setattr(batch_classifier, "get_engine", lambda: engine)
+    monkeypatch.setattr(batch_classifier, "get_cache", lambda: ClassificationCache(str(tmp_path / "c.sqlite3")))
+    monkeypatch.setattr(batch_classifier, "first_stage", lambda texts: None)
+    monkeypatch.setattr(batch_classifier.near_duplicates, "NEAR_DUPLICATES", False)
+
+    tweets = [{"id": str(i), "text": f"Great match number {i} last night"} for i in range(3)]
+    assert getalltweets.classify_tweets(tweets) == [False] * 3
+    (request,) = engine.requests
+    system = request["messages"][0]["content"]
+    assert getalltweets.HEALTH_CRITERIA in system
+    assert "'True' or 'False'" not in system
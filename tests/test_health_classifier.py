@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import pytest
+
+import health_classifier
+from classification_cache import ClassificationCache
+
+
+class FakeClient:
+    def __init__(self, answer="yes"):
+        self.answer = answer
+        self.prompts = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, temperature):
+        self.prompts.append(messages[0]["content"])
+        message = SimpleNamespace(content=self.answer)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    client = FakeClient()
+    monkeypatch.setattr(health_classifier, "client", client)
+    cache = ClassificationCache(str(tmp_path / "c.sqlite3"))
+    monkeypatch.setattr(health_classifier, "get_cache", lambda: cache)
+    return client
+
+
+def test_strong_keyword_match_skips_the_llm(client):
+    assert health_classifier.is_health_related_tweet("New vaccine campaign against malaria", "1") is True
+    assert client.prompts == []
+
+
+def test_unmatched_tweet_goes_to_the_llm_once(client):
+    client.answer = "no"
+    assert health_classifier.is_health_related_tweet("Great match last night", "2") is False
+    assert health_classifier.is_health_related_tweet("Great match last night", "2") is False
+    assert len(client.prompts) == 1
+    assert "Great match last night" in client.prompts[0]
+
+
+def test_scripts_share_one_classifier():
+    import influencertweetscrape
+    import melindagates
+
+    assert melindagates.classify_api_tweets is health_classifier.classify_api_tweets
+    assert influencertweetscrape.classify_api_tweets is health_classifier.classify_api_tweets
+
+
+def test_tweets_without_text_skip_the_classifier(monkeypatch):
+    seen = []
+
+    def classify_tweets(items, batch_size, langs):
+        seen.extend(items)
+        return [True] * len(items)
+
+    monkeypatch.setattr(health_classifier, "classify_tweets", classify_tweets)
+    tweets = [{"id": "1", "text": "  "}, {"id": "2", "text": " clinic opened "}, {"id": "3"}]
+    assert health_classifier.classify_api_tweets(tweets) == [None, True, None]
+    assert seen == [("2", "clinic opened")]
+    assert health_classifier.classify_api_tweets([{"id": "4", "text": ""}]) == [None]
@@ -0,0 +1,67 @@
+import json
+import os
+
+import pytest
+
+from jsonconverter import convert_folder, iter_json_array, iter_records
+
+TWEETS = [
+    {"id": "1", "text": "Santé pour tous ✨", "author": {"userName": "a"}, "nested": [1, {"x": "]"}]},
+    {"id": "2", "text": "quote \" and comma , and bracket ]", "likeCount": 12},
+    {"id": "3", "text": "", "values": [True, False, None, 1.5e3]},
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, 1 << 16])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_stream_parse_matches_json_load(tmp_path, chunk_size, indent):
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps(TWEETS, indent=indent, ensure_ascii=False), encoding="utf-8")
+    assert list(iter_json_array(str(path), chunk_size=chunk_size)) == TWEETS
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1 << 16])
+def test_scalars_split_across_chunks(tmp_path, chunk_size):
+    items = [12345, 678, "abc", True, None, 3.25, 1e10]
+    path = tmp_path / "numbers.json"
+    path.write_text(json.dumps(items))
+    assert list(iter_json_array(str(path), chunk_size=chunk_size)) == items
+
+
+@pytest.mark.parametrize("text", ["[]", "  [ \n ]  "])
+def test_empty_array(tmp_path, text):
+    path = tmp_path / "empty.json"
+    path.write_text(text)
+    assert list(iter_json_array(str(path), chunk_size=1)) == []
+
+
+def test_not_an_array(tmp_path):
+    path = tmp_path / "object.json"
+    path.write_text('{"a": 1}')
+    with pytest.raises(ValueError):
+        list(iter_json_array(str(path)))
+
+
+def test_truncated_file_raises(tmp_path):
+    path = tmp_path / "truncated.json"
+    path.write_text(json.dumps(TWEETS)[:-20])
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(str(path), chunk_size=8))
+
+
+def test_iter_records_reads_ndjson(tmp_path):
+    path = tmp_path / "a_tweets_20240101_000000.ndjson"
+    path.write_text("\n".join(json.dumps(t, ensure_ascii=False) for t in TWEETS) + "\n", encoding="utf-8")
+    assert list(iter_records(str(path))) == TWEETS
+
+
+def test_one_broken_dump_does_not_stop_the_folder(tmp_path):
+    data, out = tmp_path / "data", tmp_path / "csv"
+    data.mkdir()
+    (data / "a_tweets_20250101_000000.json").write_text(json.dumps(TWEETS), encoding="utf-8")
+    (data / "b_tweets_20250101_000000.json").write_text('[{"id": "1"}, {"id": ', encoding="utf-8")
+    (data / "c_tweets_20250101_000000.json").write_text(json.dumps(TWEETS[:1]), encoding="utf-8")
+
+    counts = convert_folder(str(data), str(out), workers=2)
+    assert {os.path.basename(p)[0]: count for p, count in counts.items()} == {"a": 3, "b": None, "c": 1}
+    assert sorted(p.name for p in out.iterdir()) == ["a_tweets_20250101_000000.csv", "c_tweets_20250101_000000.csv"]
@@ -0,0 +1,45 @@
+import pytest
+
+from keyword_filter import classify_text, normalize
+
+
+@pytest.mark.parametrize("text, lang", [
+    ("Vaccination campaign against measles starts Monday in all districts", "en"),
+    ("Inauguration du nouvel hôpital régional de Garoua", "fr"),
+    ("Campanha de vacinação contra o sarampo", "pt"),
+    ("#COVID19 cases are falling", None),
+])
+def test_strong_term_is_health(text, lang):
+    assert classify_text(text, lang) == (True, "positive")
+
+
+@pytest.mark.parametrize("text, lang", [
+    # LLM-confirmed health tweets that match no strong term
+    ("Ngaoundéré tient désormais son Centre Hospitalier Régional", "fr"),
+    ("no woman, child or adolescent should die of preventable causes", "en"),
+    ("Be active.", "en"),
+    ("#KeReady #VaccinateToSaveSA @HealthZA", "en"),
+    # Ambiguous words must not count as strong
+    ("Please be patient with us while we restore the service", "en"),
+    ("A new computer virus hit the bank's payment systems", "en"),
+    ("Merci de rester patient pendant les travaux", "fr"),
+])
+def test_no_strong_term_goes_to_llm(text, lang):
+    verdict, tier = classify_text(text, lang)
+    assert verdict is None
+    assert tier in ("weak", "unmatched")
+
+
+def test_never_returns_false():
+    for text in ("ok", "Match day! Come support the team tonight", ""):
+        for lang in (None, "en", "fr", "pt", "es", "sw", "xx"):
+            assert classify_text(text, lang)[0] is not False
+
+
+def test_whole_words_only():
+    # "who" inside "whole" / "hiv" inside "archive" must not match
+    assert classify_text("The whole archive is online now for everyone", "en")[1] == "unmatched"
+
+
+def test_normalize_strips_accents_and_case():
+    assert normalize("Santé PUBLIQUE") == "sante publique"
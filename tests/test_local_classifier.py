@@ -0,0 +1,51 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import local_classifier
+from classification_cache import ClassificationCache
+from local_classifier import load_labelled
+
+
+def test_only_tweets_with_a_verdict_are_labelled(tmp_path):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "a_health_tweets_20240101_000000.json").write_text(json.dumps([
+        {"tweet_id": "1", "text": "Measles vaccination starts Monday", "username": "a"},
+    ]))
+    (data / "a_tweets_20240101_000000.json").write_text(json.dumps([
+        {"id": "2", "text": "Match day! Come support the team"},
+        {"id": "3", "text": "Never classified tweet"},
+    ]))
+    cache_path = str(tmp_path / "cache.sqlite3")
+    cache = ClassificationCache(cache_path)
+    cache.set("2", "Match day! Come support the team", "v", False)
+    cache.close()
+
+    labelled = {e[0]: e[2:] for e in load_labelled(str(data), store_path="", cache_path=cache_path)}
+    assert labelled == {"1": (True, "dump"), "2": (False, "cache")}
+
+
+def test_unknown_backend_is_rejected():
+    env = dict(os.environ, CLASSIFIER_BACKEND="locla")
+    result = subprocess.run([sys.executable, "-c", "import local_classifier"], env=env,
+                            capture_output=True, text=True, cwd=os.path.dirname(os.path.dirname(__file__)))
+    assert result.returncode != 0
+    assert "CLASSIFIER_BACKEND must be one of" in result.stderr
+
+
+def test_local_backend_without_a_model_does_not_fall_back(tmp_path, monkeypatch):
+    monkeypatch.setattr(local_classifier, "MODEL_PATH", str(tmp_path / "missing.npz"))
+    monkeypatch.setattr(local_classifier, "_shared", None)
+    monkeypatch.setattr(local_classifier, "_has_numpy", lambda: True)
+    monkeypatch.setattr(local_classifier, "_require_numpy", lambda: None)
+
+    monkeypatch.setattr(local_classifier, "BACKEND", "hybrid")
+    assert local_classifier.first_stage(["some tweet"]) is None
+
+    monkeypatch.setattr(local_classifier, "BACKEND", "local")
+    with pytest.raises(RuntimeError, match="CLASSIFIER_BACKEND=local"):
+        local_classifier.first_stage(["some tweet"])
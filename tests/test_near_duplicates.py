@@ -0,0 +1,33 @@
+from near_duplicates import NearDuplicateIndex
+
+BASE = "Measles vaccination campaign starts Monday in all districts of the region"
+
+
+def test_reposts_share_a_cluster():
+    index = NearDuplicateIndex()
+    leader = index.cluster(BASE)
+    assert index.cluster(f"RT @moh: {BASE}") == leader
+    assert index.cluster(f"{BASE} @someone https://t.co/x") == leader
+    assert index.cluster("Short text") is None
+    assert len(index) == 1
+
+
+def test_verdicts_are_per_prompt_version():
+    index = NearDuplicateIndex()
+    leader = index.cluster(BASE)
+    index.set_verdict(leader, "v1", True)
+    assert index.verdict(leader, "v1") is True
+    assert index.verdict(leader, "v2") is None
+
+
+def test_index_is_bounded():
+    index = NearDuplicateIndex(max_clusters=5)
+    texts = [f"completely different tweet number {n} about topic {n * 7} and more {n * 13}" for n in range(50)]
+    leaders = [index.cluster(text) for text in texts]
+    for leader in leaders:
+        index.set_verdict(leader, "v1", True)
+
+    assert len(index) == 5
+    assert sum(len(bucket) for bucket in index._buckets.values()) == 5 * len(index._bands)
+    assert index.verdict(leaders[0], "v1") is None
+    assert index.verdict(leaders[-1], "v1") is True
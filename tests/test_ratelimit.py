@@ -0,0 +1,30 @@
+from ratelimit import AdaptiveRateLimiter
+
+
+def test_rate_adapts_and_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "ratelimit.sqlite3")
+    first = AdaptiveRateLimiter("api", rate=2.0, min_rate=0.5, max_rate=4.0, increase=0.5, state_path=path)
+    second = AdaptiveRateLimiter("api", rate=2.0, min_rate=0.5, max_rate=4.0, increase=0.5, state_path=path)
+
+    first.on_success()
+    assert first.rate == 2.5
+    wait = second.on_rate_limited({"Retry-After": "3"})
+    assert second.rate == 1.25
+    assert 2.9 < wait <= 3.0
+    # Blocked for every instance sharing the bucket
+    assert first.try_acquire() > 2.5
+    assert first.rate == 1.25
+
+
+def test_rate_read_does_not_write(tmp_path):
+    limiter = AdaptiveRateLimiter("api", rate=2.0, state_path=str(tmp_path / "ratelimit.sqlite3"))
+    before = limiter._db.total_changes
+    for _ in range(10):
+        limiter.rate
+    assert limiter._db.total_changes == before
+
+
+def test_bucket_without_state_file():
+    limiter = AdaptiveRateLimiter("api", rate=1.0, burst=1, state_path="")
+    assert limiter.try_acquire() == 0.0
+    assert limiter.try_acquire() > 0
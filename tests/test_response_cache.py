@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+from response_cache import CacheMiss, ResponseCache, request_key
+
+PATH = "/twitter/user/last_tweets"
+
+
+def params(cursor="", user="Alice"):
+    p = {"userName": user, "includeReplies": False}
+    if cursor:
+        p["cursor"] = cursor
+    return p
+
+
+def test_request_key_fields():
+    assert request_key(PATH, params("c1")) == request_key(PATH, params("c1", user="alice"))
+    assert request_key(PATH, params("c1")) != request_key(PATH, params("c2"))
+    assert request_key(PATH, params("c1")) != request_key(PATH, {**params("c1"), "includeReplies": True})
+    assert request_key(PATH, params("c1")) != request_key("/other", params("c1"))
+
+
+def test_record_serves_cursor_pages_until_ttl(tmp_path):
+    cache = ResponseCache(str(tmp_path), mode="record", ttl=0.2)
+    cache.put(PATH, params("c1"), b'{"page": 2}')
+    assert cache.get(PATH, params("c1")) == {"page": 2}
+    assert cache.get(PATH, params("c1"), refresh=True) is None
+    time.sleep(0.25)
+    assert cache.get(PATH, params("c1")) is None
+
+
+def test_record_never_serves_first_page(tmp_path):
+    cache = ResponseCache(str(tmp_path), mode="record", ttl=0)
+    cache.put(PATH, params(), b'{"page": 1}')
+    assert cache.get(PATH, params()) is None
+
+
+def test_replay_serves_everything_recorded_and_fails_otherwise(tmp_path):
+    ResponseCache(str(tmp_path), mode="record").put(PATH, params(), b'{"page": 1}')
+    replay = ResponseCache(str(tmp_path), mode="replay", ttl=0.001)
+    time.sleep(0.01)
+    assert replay.get(PATH, params()) == {"page": 1}
+    with pytest.raises(CacheMiss):
+        replay.get(PATH, params("c9"))
+
+
+def test_identical_bodies_are_stored_once_and_compressed(tmp_path):
+    cache = ResponseCache(str(tmp_path), mode="record")
+    body = b'{"tweets": [' + b",".join(b'{"text": "same text again"}' for _ in range(200)) + b"]}"
+    cache.put(PATH, params("a"), body)
+    cache.put(PATH, params("b"), body)
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["blobs"] == 1
+    assert stats["stored_bytes"] < stats["raw_bytes"] / 10
+
+
+def test_prune_removes_old_entries_and_orphan_blobs(tmp_path):
+    cache = ResponseCache(str(tmp_path), mode="record")
+    cache.put(PATH, params("a"), b'{"a": 1}')
+    time.sleep(0.05)
+    cache.put(PATH, params("b"), b'{"b": 1}')
+    assert cache.prune(max_age=0.03) == (1, 1)
+    assert cache.get(PATH, params("b")) == {"b": 1}
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError):
+        ResponseCache(mode="recrod")
@@ -0,0 +1,45 @@
+import io
+import json
+
+import pytest
+
+from tweet_record import TweetRecord, dump_json, from_api
+
+TWEET = {"id": "42", "url": "https://x.com/alice/status/42", "createdAt": "Mon Nov 03 12:00:00 +0000 2025",
+         "text": "Vaccination day — venez nombreux", "lang": "fr", "likeCount": 3, "retweetCount": 1,
+         "replyCount": 0, "author": {"userName": "alice", "name": "Alice", "followers": 7},
+         "entities": {"hashtags": [{"text": "santé"}]}}
+
+
+@pytest.mark.parametrize("items", [[], [{}], [TWEET], [TWEET, {"nested": {"a": [1, 2, {"b": None}]}}, []]])
+@pytest.mark.parametrize("indent", [2, 4])
+def test_dump_json_matches_json_dump(items, indent):
+    expected = io.StringIO()
+    json.dump(items, expected, indent=indent, ensure_ascii=False)
+    actual = io.StringIO()
+    dump_json(iter(items), actual, indent=indent)
+    assert actual.getvalue() == expected.getvalue()
+
+
+def test_record_reads_like_the_api_dict():
+    record = TweetRecord.from_api(TWEET)
+    assert record.get("text") == TWEET["text"]
+    assert record.get("likeCount") == 3
+    assert record.get("viewCount", 0) == 0
+    assert record.get("author")["followers"] == 7
+    assert record.get("entities") == TWEET["entities"]
+    assert record.to_dict() == TWEET
+
+
+def test_record_without_raw_rebuilds_the_core_fields():
+    record = TweetRecord.from_api(TWEET, keep_raw=False)
+    assert record.raw is None
+    assert record.get("author") == {"userName": "alice", "name": "Alice"}
+    assert record.get("entities") is None
+    assert record.to_dict()["text"] == TWEET["text"]
+
+
+def test_usernames_and_languages_are_interned():
+    a, b = from_api([dict(TWEET), json.loads(json.dumps(TWEET))])
+    assert a.username is b.username
+    assert a.lang is b.lang
@@ -0,0 +1,42 @@
+import json
+
+from parquet_export import rows_from_store
+from tweet_store import TweetStore
+
+
+def _api_tweet(tweet_id, text="tweet"):
+    return {"id": str(tweet_id), "text": text, "createdAt": "Mon Nov 03 12:00:00 +0000 2025", "likeCount": 1,
+            "author": {"id": "7", "userName": "DrTedros", "name": "Tedros"}}
+
+
+def _health_record(tweet_id):
+    return {"username": "DrTedros", "tweet_id": str(tweet_id), "url": None,
+            "created_at": "Mon Nov 03 12:00:00 +0000 2025", "text": "vaccines", "likes": 1, "retweets": 0,
+            "replies": 0, "author": "Tedros"}
+
+
+def _classified(store):
+    return {row["tweet_id"]: (row["is_health"], row["classified"]) for row in rows_from_store(store)}
+
+
+def test_imported_health_dump_is_not_classified(tmp_path):
+    dump = tmp_path / "DrTedros_health_tweets_20251103_120000.json"
+    dump.write_text(json.dumps([_health_record(1), _health_record(2)]), encoding="utf-8")
+    raw = tmp_path / "DrTedros_tweets_20251103_120000.json"
+    raw.write_text(json.dumps([_api_tweet(1), _api_tweet(3)]), encoding="utf-8")
+
+    store = TweetStore(str(tmp_path / "store.sqlite3"))
+    store.import_folder(str(tmp_path))
+    assert _classified(store) == {"1": (True, False), "2": (True, False), "3": (None, False)}
+
+
+def test_classifier_verdicts_win_over_health_dumps(tmp_path):
+    store = TweetStore(str(tmp_path / "store.sqlite3"))
+    store.upsert_health([_health_record(1), _health_record(2)])
+    store.upsert_raw("DrTedros", [_api_tweet(1), _api_tweet(2), _api_tweet(3)], [False, True, None])
+    assert _classified(store) == {"1": (False, True), "2": (True, True), "3": (None, False)}
+
+    # A later import of the same dump keeps the classifier's verdicts
+    store.upsert_health([_health_record(1)])
+    store.upsert_raw("DrTedros", [_api_tweet(2)])
+    assert _classified(store) == {"1": (False, True), "2": (True, True), "3": (None, False)}
@@ -0,0 +1,62 @@
+from checkpoints import CrawlCheckpoint
+from twitter_client import TwitterAPIClient
+
+
+class FakeClient(TwitterAPIClient):
+    """Client over a fake three-page timeline; fails once on `fail_on` (a cursor)."""
+
+    def __init__(self, fields=None, fail_on=None):
+        super().__init__(["test-key"], fields=fields, cache=False)
+        self.fail_on = fail_on
+        self.requests = []
+
+    def last_tweets(self, user, cursor="", include_replies=False, refresh=False):
+        from twitter_client import TwitterAPIError
+
+        self.requests.append(cursor)
+        if cursor and cursor == self.fail_on:
+            self.fail_on = None
+            raise TwitterAPIError("boom", 500)
+        page = int(cursor or 0)
+        tweets = [{"id": str(1000 - page * 10 - i), "text": f"t{page}{i}", "lang": "en", "extra": "x"}
+                  for i in range(10)]
+        return {"data": {"tweets": tweets, "has_next_page": page < 2, "next_cursor": str(page + 1)}}
+
+
+def test_iter_pages_paginates_and_stops(tmp_path):
+    client = FakeClient()
+    progress = {}
+    pages = list(client.iter_pages("a", progress=progress))
+    assert [len(p) for p in pages] == [10, 10, 10]
+    assert progress["complete"] is True
+
+
+def test_since_id_stops_at_watermark():
+    pages = list(FakeClient().iter_pages("a", since_id=985))
+    assert [t["id"] for p in pages for t in p] == [str(i) for i in range(1000, 985, -1)]
+
+
+def test_resumed_pages_are_projected_like_fresh_ones(tmp_path):
+    fields = ("id", "text")
+    checkpoint = CrawlCheckpoint("a", "raw", folder=str(tmp_path))
+
+    progress = {}
+    first = list(FakeClient(fields, fail_on="1").iter_pages("a", checkpoint=checkpoint, progress=progress))
+    assert progress["error"] and len(first) == 1
+
+    client = FakeClient(fields)
+    resumed = list(client.iter_pages("a", checkpoint=checkpoint, resume=True))
+    assert client.requests == ["1", "2"]
+    assert len(resumed) == 3
+    assert all(set(t) == set(fields) for page in resumed for t in page)
+    assert resumed == list(FakeClient(fields).iter_pages("a"))
+
+
+def test_resume_skips_recorded_empty_pages(tmp_path):
+    checkpoint = CrawlCheckpoint("a", "raw", folder=str(tmp_path))
+    # Page 2 crossed the watermark: every tweet on it was filtered out
+    list(FakeClient().iter_pages("a", checkpoint=checkpoint, since_id=990))
+    assert [len(p) for p in checkpoint.iter_pages()] == [10, 0]
+
+    resumed = list(FakeClient().iter_pages("a", checkpoint=checkpoint, resume=True))
+    assert [len(p) for p in resumed] == [10]
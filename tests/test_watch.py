@@ -0,0 +1,54 @@
+import functools
+
+import pytest
+
+import getalltweets
+import watch
+import watermarks
+
+
+class FakeTwitter:
+    """iter_pages stand-in yielding fixed pages; `complete` is what the crawl reports."""
+
+    def __init__(self, ids, complete):
+        self.ids = ids
+        self.complete = complete
+
+    def iter_pages(self, username, since_id=None, progress=None, refresh=False, max_tweets=None):
+        yield [{"id": str(i), "text": f"tweet {i}", "createdAt": None} for i in self.ids]
+        if self.complete:
+            progress["complete"] = True
+
+
+@pytest.fixture
+def watcher(tmp_path, monkeypatch):
+    path = str(tmp_path / "watermarks.json")
+    monkeypatch.setattr(watch, "load_watermark", functools.partial(watermarks.load_watermark, path=path))
+    monkeypatch.setattr(watch, "save_watermark", functools.partial(watermarks.save_watermark, path=path))
+    monkeypatch.setattr(watch, "get_store", lambda: None)
+    monkeypatch.setattr(getalltweets, "classify_tweets", lambda tweets: [False] * len(tweets))
+    return watch.Watcher(["alice"], schedule=watch.Schedule(str(tmp_path / "state.json")))
+
+
+def _mark(watcher):
+    mark = watch.load_watermark("alice", watch.SCOPE)
+    return mark and mark["tweet_id"]
+
+
+def test_seed_poll_sets_the_watermark(watcher, monkeypatch):
+    monkeypatch.setattr(getalltweets, "twitter", FakeTwitter([100, 99], complete=False))
+    watcher.poll("alice")
+    assert _mark(watcher) == "100"
+
+
+def test_incomplete_poll_keeps_the_watermark(watcher, monkeypatch):
+    watch.save_watermark("alice", watch.SCOPE, [{"id": "100"}])
+
+    # Stopped mid-timeline (e.g. an empty page): tweets 101..199 were never read
+    monkeypatch.setattr(getalltweets, "twitter", FakeTwitter([300, 200], complete=False))
+    watcher.poll("alice")
+    assert _mark(watcher) == "100"
+
+    monkeypatch.setattr(getalltweets, "twitter", FakeTwitter([300, 200, 150, 101], complete=True))
+    watcher.poll("alice")
+    assert _mark(watcher) == "300"
@@ -0,0 +1,47 @@
+import json
+import multiprocessing
+
+from watermarks import load_watermark, save_watermark
+
+
+def tweet(tweet_id):
+    return {"id": str(tweet_id), "createdAt": f"t{tweet_id}"}
+
+
+def test_watermark_only_moves_forward(tmp_path):
+    path = str(tmp_path / "watermarks.json")
+    assert load_watermark("Alice", "raw", path=path) is None
+
+    save_watermark("Alice", "raw", [tweet(5), tweet(9), tweet(7)], path=path)
+    assert load_watermark("alice", "raw", path=path) == {"tweet_id": "9", "created_at": "t9"}
+
+    save_watermark("Alice", "raw", [tweet(3)], path=path)
+    assert load_watermark("Alice", "raw", path=path)["tweet_id"] == "9"
+    assert load_watermark("Alice", "health", path=path) is None
+
+
+def test_empty_or_idless_tweets_are_ignored(tmp_path):
+    path = str(tmp_path / "watermarks.json")
+    assert save_watermark("Alice", "raw", [], path=path) is None
+    assert save_watermark("Alice", "raw", [{"text": "no id"}], path=path) is None
+    assert load_watermark("Alice", "raw", path=path) is None
+
+
+def _save_many(path, worker):
+    for i in range(1, 31):
+        save_watermark(f"user{worker}_{i}", "raw", [tweet(i)], path=path)
+
+
+def test_concurrent_processes_lose_no_update(tmp_path):
+    path = str(tmp_path / "watermarks.json")
+    procs = [multiprocessing.Process(target=_save_many, args=(path, w)) for w in range(4)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+        assert proc.exitcode == 0
+
+    with open(path, encoding="utf-8") as f:
+        marks = json.load(f)
+    assert len(marks) == 4 * 30
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,123 @@
+import threading
+import time
+
+import pytest
+
+from checkpoints import CrawlCheckpoint
+from twitter_client import TwitterAPIClient
+from work_queue import HTTPQueue, QueueServer, SQLiteQueue, _heartbeat, open_queue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SQLiteQueue(str(tmp_path / "queue.sqlite3"))
+
+
+def test_enqueue_is_idempotent(queue):
+    assert queue.enqueue("fetch", ["a", "b"]) == 2
+    assert queue.enqueue("fetch", ["b", "c"]) == 1
+    assert queue.stats()["pending"] == 3
+
+
+def test_lease_hands_each_task_out_once(queue):
+    queue.enqueue("fetch", ["a", "b"])
+    first = queue.lease("w1")
+    second = queue.lease("w2")
+    assert {first["account"], second["account"]} == {"a", "b"}
+    assert queue.lease("w3") is None
+    assert queue.complete(first["id"], first["token"])
+    assert queue.stats()["done"] == 1
+
+
+def test_expired_lease_is_requeued_and_stale_token_rejected(queue):
+    queue.enqueue("fetch", ["a"])
+    old = queue.lease("w1", lease_seconds=0.05)
+    time.sleep(0.1)
+    new = queue.lease("w2", lease_seconds=30)
+    assert new["id"] == old["id"] and new["attempts"] == 2
+
+    assert not queue.heartbeat(old["id"], old["token"])
+    assert not queue.complete(old["id"], old["token"])
+    assert not queue.fail(old["id"], old["token"], "late")
+    assert queue.complete(new["id"], new["token"])
+    assert queue.stats()["done"] == 1
+
+
+def test_heartbeat_keeps_lease(queue):
+    queue.enqueue("fetch", ["a"])
+    task = queue.lease("w1", lease_seconds=0.2)
+    for _ in range(3):
+        time.sleep(0.1)
+        assert queue.heartbeat(task["id"], task["token"], lease_seconds=0.2)
+    assert queue.lease("w2") is None
+
+
+def test_fail_retries_until_max_attempts(queue):
+    queue.enqueue("fetch", ["a"], max_attempts=2)
+    for attempt in (1, 2):
+        task = queue.lease("w1")
+        assert task["attempts"] == attempt
+        queue.fail(task["id"], task["token"], "boom")
+    stats = queue.stats()
+    assert stats["failed"] == 1 and stats["failed_tasks"][0]["last_error"] == "boom"
+    assert queue.lease("w1") is None
+
+    assert queue.retry_failed() == 1
+    assert queue.lease("w1")["attempts"] == 1
+
+
+def test_lost_lease_sets_cancel(queue):
+    queue.enqueue("fetch", ["a"])
+    task = queue.lease("w1", lease_seconds=0.06)
+    time.sleep(0.1)
+    queue.lease("w2", lease_seconds=30)
+
+    stop, lost = threading.Event(), threading.Event()
+    beat = threading.Thread(target=_heartbeat, args=(queue, task, 0.06, stop, lost))
+    beat.start()
+    assert lost.wait(2)
+    stop.set()
+    beat.join()
+
+
+def test_http_backend(queue):
+    server = QueueServer(queue, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        remote = open_queue(f"http://127.0.0.1:{server.server_address[1]}")
+        assert isinstance(remote, HTTPQueue)
+        assert remote.enqueue(job="fetch", accounts=["a"]) == 1
+        task = remote.lease(owner="remote")
+        assert task["account"] == "a"
+        assert remote.complete(task_id=task["id"], token=task["token"])
+        assert remote.stats()["done"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class _PagedClient(TwitterAPIClient):
+    """Client serving numbered fake pages; sets `cancel` after the first one."""
+
+    def __init__(self, cancel):
+        super().__init__(["test-key"], cache=False)
+        self.cancel = cancel
+
+    def last_tweets(self, user, cursor="", include_replies=False, refresh=False):
+        page = int(cursor or 0)
+        self.cancel.set()
+        tweets = [{"id": str(1000 - page * 10 - i), "text": "t"} for i in range(10)]
+        return {"data": {"tweets": tweets, "has_next_page": True, "next_cursor": str(page + 1)}}
+
+
+def test_cancelled_crawl_leaves_checkpoint_alone(tmp_path):
+    cancel = threading.Event()
+    client = _PagedClient(cancel)
+    checkpoint = CrawlCheckpoint("a", "raw", folder=str(tmp_path))
+    progress = {}
+
+    pages = list(client.iter_pages("a", checkpoint=checkpoint, progress=progress, cancel=cancel))
+    assert pages == []
+    assert progress["error"] == "crawl cancelled"
+    # The page fetched when the lease was lost was never recorded
+    assert checkpoint.load()["page"] == 0
@@ -0,0 +1,189 @@
+import argparse
+import gzip
+import json
+import os
+import zlib
+from datetime import datetime
+
+import environ
+
+import metrics
+
+# ----------------------------------------------------------
+# ⚙️ Load environment variables
+# ----------------------------------------------------------
+env = environ.Env()
+env.read_env()
+
+# "json" = one indented file at the end (old behaviour), "ndjson" = stream records as they come,
+# "compact" = stream into a normalized folder (see compact_format.py),
+# "store" = no dump file, only the tweet store (see tweet_store.py)
+OUTPUT_FORMAT = env("OUTPUT_FORMAT", default="json")
+# "", "gzip" or "zstd" (zstd needs `pip install zstandard`)
+OUTPUT_COMPRESSION = env("OUTPUT_COMPRESSION", default="")
+
+EXTENSIONS = {"": ".ndjson", "gzip": ".ndjson.gz", "zstd": ".ndjson.zst"}
+
+
+def output_path(username, kind, compression=OUTPUT_COMPRESSION, folder="data"):
+    """Timestamped NDJSON path like data/<user>_<kind>_<timestamp>.ndjson.gz."""
+    os.makedirs(folder, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(folder, f"{username}_{kind}_{timestamp}{EXTENSIONS[compression]}")
+
+
+def _compression_for(path):
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith(".zst"):
+        return "zstd"
+    return ""
+
+
+# ----------------------------------------------------------
+# 📝 Crash-safe NDJSON writer
+# ----------------------------------------------------------
+class NDJSONWriter:
+    """
+    Append one compact JSON record per line, durable at every page boundary.
+
+    Records are buffered by the OS until flush_page(), which pushes them through
+    the compressor (gzip sync flush / zstd frame end) and fsyncs the file. A
+    crash therefore loses at most the page in progress, and every flushed page
+    stays readable, even in a compressed file.
+
+    Args:
+        path: Output file; opened in append mode
+        compression: "", "gzip" or "zstd"
+    """
+
+    def __init__(self, path, compression=None):
+        self.path = path
+        self.compression = _compression_for(path) if compression is None else compression
+        self.count = 0
+        self._raw = open(path, "ab")
+
+        if self.compression == "gzip":
+            self._out = gzip.GzipFile(fileobj=self._raw, mode="ab")
+        elif self.compression == "zstd":
+            try:
+                import zstandard
+            except ImportError:
+                self._raw.close()
+                raise ImportError("OUTPUT_COMPRESSION=zstd needs `pip install zstandard`")
+            self._zstd = zstandard
+            self._out = zstandard.ZstdCompressor().stream_writer(self._raw, closefd=False)
+        else:
+            self._out = self._raw
+
+    def write(self, record):
+        self._out.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+        self.count += 1
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def flush_page(self):
+        """Make everything written so far durable on disk."""
+        with metrics.timer("ndjson_flush"):
+            if self.compression == "gzip":
+                self._out.flush(zlib.Z_SYNC_FLUSH)
+            elif self.compression == "zstd":
+                self._out.flush(self._zstd.FLUSH_FRAME)
+            self._raw.flush()
+            os.fsync(self._raw.fileno())
+
+    def close(self):
+        self.flush_page()
+        if self._out is not self._raw:
+            self._out.close()
+        self._raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ----------------------------------------------------------
+# 📖 Reading back / exporting
+# ----------------------------------------------------------
+def _gzip_chunks(f):
+    """Decompress concatenated gzip members, stopping quietly at a truncated last member."""
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    while True:
+        data = f.read(1 << 16)
+        if not data:
+            return
+        while data:
+            yield decoder.decompress(data)
+            if decoder.eof:
+                data = decoder.unused_data
+                decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            else:
+                data = b""
+
+
+def _raw_chunks(f):
+    while True:
+        data = f.read(1 << 16)
+        if not data:
+            return
+        yield data
+
+
+def iter_ndjson(path):
+    """Yield the records of an NDJSON file (plain, .gz or .zst), skipping a torn last line."""
+    compression = _compression_for(path)
+    with open(path, "rb") as f:
+        if compression == "gzip":
+            chunks = _gzip_chunks(f)
+        elif compression == "zstd":
+            import zstandard
+            chunks = _raw_chunks(zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True))
+        else:
+            chunks = _raw_chunks(f)
+
+        buffer = b""
+        for chunk in chunks:
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
+
+    if buffer.strip():
+        try:
+            yield json.loads(buffer)
+        except ValueError:
+            print(f"⚠️ Skipping incomplete last record in {path}")
+
+
+def export_json(ndjson_path, json_path=None, indent=2):
+    """Write the classic indented JSON array from an NDJSON file; returns the new path."""
+    if json_path is None:
+        json_path = ndjson_path
+        for ext in EXTENSIONS.values():
+            if json_path.endswith(ext):
+                json_path = json_path[:-len(ext)]
+                break
+        json_path += ".json"
+
+    records = list(iter_ndjson(ndjson_path))
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(records, f, indent=indent, ensure_ascii=False)
+
+    print(f"💾 Exported {len(records)} records to {json_path}")
+    return json_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export streamed NDJSON output as indented JSON.")
+    parser.add_argument("ndjson", nargs="+", help="NDJSON file(s), optionally .gz/.zst")
+    parser.add_argument("--indent", type=int, default=2)
+    args = parser.parse_args()
+
+    for path in args.ndjson:
+        export_json(path, indent=args.indent)
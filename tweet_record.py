@@ -0,0 +1,135 @@
+import json
+import sys
+import zlib
+
+# API fields held as attributes; everything else is only reachable through .raw
+FIELDS = {
+    "id": "id",
+    "url": "url",
+    "createdAt": "created_at",
+    "text": "text",
+    "lang": "lang",
+    "likeCount": "likes",
+    "retweetCount": "retweets",
+    "replyCount": "replies",
+    "viewCount": "views",
+}
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+# ----------------------------------------------------------
+# 🪶 Compact tweet
+# ----------------------------------------------------------
+class TweetRecord:
+    """
+    One tweet with only the fields the pipeline reads, in __slots__.
+
+    Usernames, author names and languages are interned, so every tweet of an
+    account shares one string. The original API object is kept as
+    zlib-compressed JSON and only decoded when .raw (or a field that is not
+    an attribute) is asked for.
+
+    `get()` answers with the API field names, so records can be passed
+    wherever a raw tweet dict was read with .get().
+    """
+
+    __slots__ = ("id", "url", "created_at", "text", "lang", "likes", "retweets", "replies", "views",
+                 "username", "author_name", "_raw")
+
+    def __init__(self, id, url=None, created_at=None, text="", lang=None, likes=0, retweets=0, replies=0,
+                 views=None, username=None, author_name=None, raw=None):
+        self.id = id
+        self.url = url
+        self.created_at = created_at
+        self.text = text
+        self.lang = _intern(lang)
+        self.likes = likes
+        self.retweets = retweets
+        self.replies = replies
+        self.views = views
+        self.username = _intern(username)
+        self.author_name = _intern(author_name)
+        self._raw = raw
+
+    @classmethod
+    def from_api(cls, tweet, keep_raw=True):
+        """
+        Build a record from a twitterapi.io tweet.
+
+        Args:
+            tweet: Tweet dict as returned by the API
+            keep_raw: Keep the compressed original for .raw (False = fields only)
+        """
+        author = tweet.get("author") or {}
+        raw = None
+        if keep_raw:
+            raw = zlib.compress(json.dumps(tweet, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        return cls(
+            id=tweet.get("id"),
+            url=tweet.get("url"),
+            created_at=tweet.get("createdAt"),
+            text=tweet.get("text", ""),
+            lang=tweet.get("lang"),
+            likes=tweet.get("likeCount", 0),
+            retweets=tweet.get("retweetCount", 0),
+            replies=tweet.get("replyCount", 0),
+            views=tweet.get("viewCount"),
+            username=author.get("userName"),
+            author_name=author.get("name"),
+            raw=raw,
+        )
+
+    @property
+    def raw(self):
+        """The original API tweet (a fresh dict each time), or None when it wasn't kept."""
+        if self._raw is None:
+            return None
+        return json.loads(zlib.decompress(self._raw))
+
+    def get(self, key, default=None):
+        """Dict-style access by API field name ("id", "text", "likeCount", "author", ...)."""
+        if key in FIELDS:
+            value = getattr(self, FIELDS[key])
+            return default if value is None else value
+        if key == "author" and self._raw is None:
+            return {"userName": self.username, "name": self.author_name}
+        raw = self.raw
+        return default if raw is None else raw.get(key, default)
+
+    def to_dict(self):
+        """API-shaped dict: the original when kept, otherwise rebuilt from the fields."""
+        raw = self.raw
+        if raw is not None:
+            return raw
+        tweet = {api: getattr(self, attr) for api, attr in FIELDS.items()}
+        tweet["author"] = {"userName": self.username, "name": self.author_name}
+        return tweet
+
+    def __repr__(self):
+        return f"TweetRecord(id={self.id!r}, username={self.username!r}, text={self.text[:40]!r})"
+
+
+def from_api(tweets, keep_raw=True):
+    """Records for a list of API tweets."""
+    return [TweetRecord.from_api(t, keep_raw=keep_raw) for t in tweets]
+
+
+def dump_json(items, f, indent=2):
+    """
+    Write dicts as one indented JSON array, one item at a time.
+
+    Produces the same text as json.dump(list(items), f, indent=indent,
+    ensure_ascii=False) without building the list, so records can be
+    expanded (to_dict / health_record) one by one while saving.
+    """
+    pad = " " * indent
+    f.write("[")
+    first = True
+    for item in items:
+        f.write("\n" if first else ",\n")
+        first = False
+        f.write(pad + json.dumps(item, indent=indent, ensure_ascii=False).replace("\n", "\n" + pad))
+    f.write("]" if first else "\n]")
@@ -0,0 +1,376 @@
+import argparse
+import glob
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import environ
+
+import metrics
+from compact_format import SUFFIX, CompactDump, is_compact, split_tweet
+from tweet_output import iter_ndjson
+from tweet_record import TweetRecord
+
+# ----------------------------------------------------------
+# ⚙️ Load environment variables
+# ----------------------------------------------------------
+env = environ.Env()
+env.read_env()
+
+# Set TWEET_STORE="" to turn the store off
+STORE_PATH = env("TWEET_STORE", default=os.path.join("data", "tweets.sqlite3"))
+
+CREATED_AT_FORMAT = "%a %b %d %H:%M:%S %z %Y"
+_FILENAME_RE = re.compile(r"^(?P<user>.+?)_(?:health_)?tweets_\d{8}_\d{6}")
+
+
+def parse_created_at(value):
+    """Unix timestamp for twitterapi.io's "Mon Oct 13 08:42:25 +0000 2025" strings, or None."""
+    if not value:
+        return None
+    try:
+        return int(datetime.strptime(value, CREATED_AT_FORMAT).timestamp())
+    except ValueError:
+        return None
+
+
+def _int(value):
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+# ----------------------------------------------------------
+# 🗄️ SQLite tweet store
+# ----------------------------------------------------------
+class TweetStore:
+    """
+    Deduplicated tweet archive: one row per tweet_id, upserted by every script.
+
+    Raw API tweets and flattened health records land in the same table.
+    Re-crawls refresh the engagement counts; a known health verdict or raw
+    payload is never overwritten with "unknown".
+
+    `verdict_source` says where is_health came from: "classifier" for a
+    verdict given to a crawled tweet (upsert_raw), "health_dump" for a row
+    imported from a health dump (upsert_health), which only holds the
+    positives of a run. A classifier verdict is never replaced by a dump's.
+
+    Args:
+        path: SQLite file (created on first use)
+    """
+
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS tweets (
+                tweet_id TEXT PRIMARY KEY,
+                account TEXT NOT NULL,
+                created_at TEXT,
+                created_ts INTEGER,
+                url TEXT,
+                text TEXT,
+                author_name TEXT,
+                lang TEXT,
+                likes INTEGER,
+                retweets INTEGER,
+                replies INTEGER,
+                views INTEGER,
+                is_health INTEGER,
+                raw TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS authors (
+                author_id TEXT PRIMARY KEY,
+                user_name TEXT,
+                name TEXT,
+                raw TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_tweets_account_created ON tweets (account, created_ts);
+            CREATE INDEX IF NOT EXISTS idx_tweets_created ON tweets (created_ts);
+            CREATE INDEX IF NOT EXISTS idx_tweets_health ON tweets (is_health, account);
+            """
+        )
+        # Stores created before the authors table keep working: raw rows there still embed the author
+        columns = {row["name"] for row in self._db.execute("PRAGMA table_info(tweets)")}
+        if "author_id" not in columns:
+            self._db.execute("ALTER TABLE tweets ADD COLUMN author_id TEXT")
+        # Verdicts stored before verdict_source existed stay of unknown origin (NULL)
+        if "verdict_source" not in columns:
+            self._db.execute("ALTER TABLE tweets ADD COLUMN verdict_source TEXT")
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _upsert(self, rows, authors=()):
+        with self._lock, metrics.timer("store_upsert"):
+            self._db.executemany(
+                """
+                INSERT INTO authors (author_id, user_name, name, raw, updated_at)
+                VALUES (:author_id, :user_name, :name, :raw, :updated_at)
+                ON CONFLICT (author_id) DO UPDATE SET
+                    user_name = excluded.user_name,
+                    name = excluded.name,
+                    raw = excluded.raw,
+                    updated_at = excluded.updated_at
+                """,
+                authors,
+            )
+            self._db.executemany(
+                """
+                INSERT INTO tweets (tweet_id, account, created_at, created_ts, url, text, author_name, author_id,
+                                    lang, likes, retweets, replies, views, is_health, verdict_source, raw,
+                                    updated_at)
+                VALUES (:tweet_id, :account, :created_at, :created_ts, :url, :text, :author_name, :author_id,
+                        :lang, :likes, :retweets, :replies, :views, :is_health, :verdict_source, :raw,
+                        :updated_at)
+                ON CONFLICT (tweet_id) DO UPDATE SET
+                    likes = excluded.likes,
+                    retweets = excluded.retweets,
+                    replies = excluded.replies,
+                    views = COALESCE(excluded.views, tweets.views),
+                    lang = COALESCE(excluded.lang, tweets.lang),
+                    is_health = CASE WHEN excluded.is_health IS NULL
+                                          OR (tweets.verdict_source = 'classifier'
+                                              AND excluded.verdict_source != 'classifier')
+                                     THEN tweets.is_health ELSE excluded.is_health END,
+                    verdict_source = CASE WHEN excluded.is_health IS NULL
+                                               OR (tweets.verdict_source = 'classifier'
+                                                   AND excluded.verdict_source != 'classifier')
+                                          THEN tweets.verdict_source ELSE excluded.verdict_source END,
+                    author_id = COALESCE(excluded.author_id, tweets.author_id),
+                    raw = COALESCE(excluded.raw, tweets.raw),
+                    updated_at = excluded.updated_at
+                """,
+                rows,
+            )
+            self._db.commit()
+        return len(rows)
+
+    def upsert_raw(self, account, tweets, verdicts=None):
+        """
+        Store raw API tweets.
+
+        The author object is stored once in the authors table; `raw` keeps the
+        rest of the tweet with an "authorId" reference.
+
+        Args:
+            account: Crawled username (stored lower-cased)
+            tweets: Tweets as returned by twitterapi.io (or TweetRecords)
+            verdicts: Optional True/False per tweet from a health classifier
+        """
+        now = time.time()
+        verdicts = verdicts if verdicts is not None else [None] * len(tweets)
+        rows = []
+        authors = {}
+        for tweet, verdict in zip(tweets, verdicts):
+            if isinstance(tweet, TweetRecord):
+                tweet = tweet.to_dict()
+            if not tweet.get("id"):
+                continue
+            core, author, blobs = split_tweet(tweet)
+            if author:
+                authors[core["authorId"]] = {
+                    "author_id": core["authorId"],
+                    "user_name": author.get("userName"),
+                    "name": author.get("name"),
+                    "raw": json.dumps(author, ensure_ascii=False),
+                    "updated_at": now,
+                }
+            rows.append({
+                "tweet_id": str(tweet["id"]),
+                "account": account.lower(),
+                "created_at": tweet.get("createdAt"),
+                "created_ts": parse_created_at(tweet.get("createdAt")),
+                "url": tweet.get("url"),
+                "text": tweet.get("text", ""),
+                "author_name": (tweet.get("author") or {}).get("name"),
+                "author_id": core.get("authorId"),
+                "lang": tweet.get("lang"),
+                "likes": _int(tweet.get("likeCount")),
+                "retweets": _int(tweet.get("retweetCount")),
+                "replies": _int(tweet.get("replyCount")),
+                "views": tweet.get("viewCount"),
+                "is_health": None if verdict is None else int(bool(verdict)),
+                "verdict_source": None if verdict is None else "classifier",
+                "raw": json.dumps(dict(core, **blobs), ensure_ascii=False),
+                "updated_at": now,
+            })
+        return self._upsert(rows, list(authors.values()))
+
+    def upsert_health(self, records):
+        """Store flattened health records (the getalltweets.health_record schema), marked health-related."""
+        now = time.time()
+        rows = []
+        for record in records:
+            if not record.get("tweet_id"):
+                continue
+            rows.append({
+                "tweet_id": str(record["tweet_id"]),
+                "account": (record.get("username") or "").lower(),
+                "created_at": record.get("created_at"),
+                "created_ts": parse_created_at(record.get("created_at")),
+                "url": record.get("url"),
+                "text": record.get("text", ""),
+                "author_name": record.get("author"),
+                "author_id": None,
+                "lang": None,
+                "likes": _int(record.get("likes")),
+                "retweets": _int(record.get("retweets")),
+                "replies": _int(record.get("replies")),
+                "views": None,
+                "is_health": 1,
+                "verdict_source": "health_dump",
+                "raw": None,
+                "updated_at": now,
+            })
+        return self._upsert(rows)
+
+    # ----------------------------------------------------------
+    # 📥 Import existing dumps
+    # ----------------------------------------------------------
+    def import_file(self, path):
+        """Import one data/ dump (JSON array, NDJSON or compact folder; raw or health schema). Returns rows upserted."""
+        if is_compact(path):
+            records = list(CompactDump(path).iter_tweets(with_blobs=True))
+        elif ".ndjson" in os.path.basename(path):
+            records = list(iter_ndjson(path))
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+        if not records:
+            return 0
+
+        if "tweet_id" in records[0]:
+            return self.upsert_health(records)
+
+        match = _FILENAME_RE.match(os.path.basename(path))
+        fallback = match.group("user") if match else ""
+        by_account = {}
+        for tweet in records:
+            account = (tweet.get("author") or {}).get("userName") or fallback
+            by_account.setdefault(account, []).append(tweet)
+        return sum(self.upsert_raw(account, tweets) for account, tweets in by_account.items())
+
+    def import_folder(self, folder="data"):
+        total = 0
+        paths = sorted(glob.glob(os.path.join(folder, "*_tweets_*.json")) +
+                       glob.glob(os.path.join(folder, "*_tweets_*.ndjson*")) +
+                       glob.glob(os.path.join(folder, f"*_tweets_*{SUFFIX}")))
+        for path in paths:
+            count = self.import_file(path)
+            print(f"📥 {os.path.basename(path)}: {count} tweets")
+            total += count
+        return total
+
+    # ----------------------------------------------------------
+    # 🔎 Queries
+    # ----------------------------------------------------------
+    def query(self, account=None, health=None, since=None, until=None, limit=None):
+        """
+        Yield stored tweets as dicts, newest first.
+
+        Args:
+            account: Only this username
+            health: True/False to filter on the health verdict
+            since / until: Unix timestamps bounding created_ts
+            limit: Maximum rows
+        """
+        clauses, params = [], []
+        if account:
+            clauses.append("account = ?")
+            params.append(account.lower())
+        if health is not None:
+            clauses.append("is_health = ?")
+            params.append(int(bool(health)))
+        if since is not None:
+            clauses.append("created_ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_ts < ?")
+            params.append(until)
+
+        sql = "SELECT * FROM tweets"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_ts DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        for row in rows:
+            yield dict(row)
+
+    def stats(self):
+        """Per-account tweet and health counts."""
+        with self._lock:
+            return [dict(row) for row in self._db.execute(
+                "SELECT account, COUNT(*) AS tweets, SUM(is_health = 1) AS health "
+                "FROM tweets GROUP BY account ORDER BY tweets DESC"
+            )]
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_store():
+    """Process-wide store, or None when TWEET_STORE is set to an empty string."""
+    global _shared
+    if not STORE_PATH:
+        return None
+    with _shared_lock:
+        if _shared is None:
+            _shared = TweetStore()
+        return _shared
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local deduplicated tweet store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_import = sub.add_parser("import", help="Import data/*_tweets_*.json dumps (raw and health schemas)")
+    p_import.add_argument("paths", nargs="*", default=["data"], help="Files or folders")
+
+    sub.add_parser("stats", help="Show per-account counts")
+
+    p_export = sub.add_parser("export", help="Export stored tweets as JSON")
+    p_export.add_argument("output")
+    p_export.add_argument("--account")
+    p_export.add_argument("--health", action="store_true", help="Only health-related tweets")
+
+    args = parser.parse_args()
+    store = TweetStore()
+
+    if args.command == "import":
+        total = 0
+        for path in args.paths:
+            total += store.import_folder(path) if os.path.isdir(path) and not is_compact(path) else store.import_file(path)
+        print(f"\n✅ Upserted {total} tweets into {store.path}")
+    elif args.command == "stats":
+        for row in store.stats():
+            print(f"@{row['account']}: {row['tweets']} tweets, {row['health'] or 0} health-related")
+    elif args.command == "export":
+        rows = list(store.query(account=args.account, health=True if args.health else None))
+        for row in rows:
+            row.pop("raw", None)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2, ensure_ascii=False)
+        print(f"💾 Exported {len(rows)} tweets to {args.output}")
@@ -1,9 +1,17 @@
-import requests
-import json
+import argparse
 import os
-import time
 from datetime import datetime
 import environ
+import metrics
+from key_pool import twitter_keys
+from lazy import Lazy
+from twitter_client import TwitterAPIClient
+from watermarks import load_watermark, save_watermark, tweet_id_int
+from tweet_output import OUTPUT_FORMAT, NDJSONWriter, output_path
+from compact_format import CompactWriter, compact_path
+from tweet_record import TweetRecord, dump_json
+from tweet_store import get_store
+from checkpoints import CrawlCheckpoint
 
 # ----------------------------------------------------------
 # ⚙️ Load environment variables
@@ -11,147 +19,145 @@ import environ
 env = environ.Env()
 env.read_env()
 
-API_KEY = env("TWITTER_API_KEY")
-BASE_URL = "https://api.twitterapi.io/twitter/user/last_tweets"
+# 🔌 Built (and TWITTER_API_KEY(S) read) on first use
+twitter = Lazy(lambda: TwitterAPIClient(twitter_keys()))
 
 
-def fetch_all_tweets(username, max_tweets=None, delay=1):
+def fetch_all_tweets(username, max_tweets=None, delay=None, since_id=None, progress=None,
+                     checkpoint=None, resume=False, cancel=None):
     """
-    Fetch tweets from a user.
+    Fetch tweets from a user as compact TweetRecords (see TwitterAPIClient.iter_pages for the options).
     
     Args:
         username: Twitter username (without @)
         max_tweets: Maximum number of tweets to fetch (None = all)
-        delay: Delay between API calls in seconds
+        delay: Fixed delay between API calls in seconds (None = adaptive rate limiter only)
     """
-    tweets = []
-    next_cursor = ""
-    page = 0
-
-    while True:
-        page += 1
-        print(f"\n📄 Fetching page {page}...")
-        
-        params = {
-            "userName": username,
-            "includeReplies": False
-        }
-        
-        if next_cursor:
-            params["cursor"] = next_cursor
-            
-        headers = {"X-API-Key": API_KEY}
-
-        try:
-            response = requests.get(BASE_URL, headers=headers, params=params, timeout=30)
-            print(f"📡 Status: {response.status_code}")
-            
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Request failed: {e}")
-            break
-
-        # Handle non-200 responses
-        if response.status_code == 429:
-            print("⏳ Rate limited. Waiting 60 seconds...")
-            time.sleep(60)
-            continue
-        elif response.status_code == 404:
-            print(f"❌ User '@{username}' not found")
-            break
-        elif response.status_code != 200:
-            print(f"❌ Error {response.status_code}: {response.text[:500]}")
-            break
-
-        try:
-            data = response.json()
-        except Exception as e:
-            print(f"❌ JSON decode error: {e}")
-            print(f"Response text: {response.text[:500]}")
-            break
-
-        # Check API status
-        if data.get("status") == "error":
-            print(f"❌ API Error: {data.get('message', 'Unknown error')}")
-            break
-
-        # Get tweets
-        data_obj = data.get("data", {})
-        new_tweets = data_obj.get("tweets", [])
-        
-        if not new_tweets:
-            print("⚠️ No tweets in this batch")
-            if page == 1:
-                print("\n🔍 Full response for debugging:")
-                print(json.dumps(data, indent=2)[:1000])
-            break
-
-        print(f"✅ Found {len(new_tweets)} tweets")
-        tweets.extend(new_tweets)
-
-        # Check if we've hit the max
-        if max_tweets and len(tweets) >= max_tweets:
-            print(f"🎯 Reached max tweets limit ({max_tweets})")
-            tweets = tweets[:max_tweets]
-            break
-
-        # Check for next page
-        has_next = data.get("has_next_page", False) or data_obj.get("has_next_page", False)
-        if not has_next:
-            print("✅ No more pages available")
-            break
-            
-        next_cursor = data.get("next_cursor", "") or data_obj.get("next_cursor", "")
-        if not next_cursor:
-            print("⚠️ has_next_page=true but no cursor provided")
-            break
-
-        # Rate limiting
-        if delay > 0:
-            print(f"⏳ Waiting {delay}s before next request...")
-            time.sleep(delay)
-
-    return tweets
+    return twitter.fetch_all(username, records=True, max_tweets=max_tweets, delay=delay, since_id=since_id,
+                             progress=progress, checkpoint=checkpoint, resume=resume, cancel=cancel)
 
 
 def save_tweets(username, tweets):
-    """Save tweets to JSON file."""
+    """Save tweets (API dicts or TweetRecords) to JSON file, expanding records one at a time."""
     folder = "data"
     os.makedirs(folder, exist_ok=True)
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     path = os.path.join(folder, f"{username}_tweets_{timestamp}.json")
 
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(tweets, f, indent=2, ensure_ascii=False)
+    with metrics.timer("save_json"), open(path, "w", encoding="utf-8") as f:
+        dump_json((t.to_dict() if isinstance(t, TweetRecord) else t for t in tweets), f, indent=2)
 
     print(f"\n💾 Saved {len(tweets)} tweets to {path}")
     return path
 
 
-def main(username, max_tweets=None):
+def stream_tweets(username, pages):
+    """
+    Append each page to an NDJSON file (OUTPUT_FORMAT=ndjson) or a compact
+    folder (OUTPUT_FORMAT=compact) as soon as it arrives.
+    
+    Returns:
+        (path or None, number of tweets written, newest tweet or None)
+    """
+    writer = None
+    count = 0
+    newest = None
+    store = get_store()
+    try:
+        for page_tweets in pages:
+            if writer is None:
+                if OUTPUT_FORMAT == "compact":
+                    writer = CompactWriter(compact_path(username, "tweets"))
+                else:
+                    writer = NDJSONWriter(output_path(username, "tweets"))
+            writer.write_many(page_tweets)
+            writer.flush_page()
+            if store is not None:
+                store.upsert_raw(username, page_tweets)
+            count += len(page_tweets)
+            newest = max(page_tweets + ([newest] if newest else []), key=tweet_id_int)
+    finally:
+        if writer is not None:
+            writer.close()
+    return (writer.path if writer else None), count, newest
+
+
+def main(username, max_tweets=None, incremental=True, resume=False, cancel=None):
     """
     Main function to fetch and save all tweets.
     
     Args:
         username: Twitter username without @
         max_tweets: Maximum tweets to fetch (None = all)
+        incremental: If True, only fetch and save tweets newer than the last completed run
+        resume: If True, continue an interrupted crawl from its last checkpointed cursor
+        cancel: Optional threading.Event; when set the crawl stops between pages
+            and keeps its checkpoint as it is (see work_queue)
     """
+    since_id = None
+    if incremental:
+        mark = load_watermark(username, "raw")
+        if mark:
+            since_id = int(mark["tweet_id"])
+            print(f"🔖 Incremental run: only tweets newer than {mark['tweet_id']} ({mark['created_at']})")
+
     print(f"🐦 Fetching tweets for @{username}...")
-    all_tweets = fetch_all_tweets(username, max_tweets=max_tweets)
+    progress = {}
+    checkpoint = CrawlCheckpoint(username, "raw")
+    options = dict(max_tweets=max_tweets, since_id=since_id, progress=progress,
+                   checkpoint=checkpoint, resume=resume, cancel=cancel)
+
+    if OUTPUT_FORMAT in ("ndjson", "compact"):
+        path, count, newest = stream_tweets(username, twitter.iter_pages(username, **options))
+        all_tweets = None
+    else:
+        all_tweets = fetch_all_tweets(username, **options)
+        path, count = None, len(all_tweets)
+        newest = max(all_tweets, key=tweet_id_int, default=None)
     
-    print(f"\n📊 Total tweets fetched: {len(all_tweets)}")
+    print(f"\n📊 Total tweets fetched: {count}")
+
+    if progress.get("error"):
+        if path:
+            print(f"\n⚠️ Crawl stopped early ({progress['error']}). Partial results are in {path};")
+        else:
+            print(f"\n⚠️ Crawl stopped early ({progress['error']}). Nothing was saved;")
+        print("💡 re-run with resume=True (or --resume) to continue from the last fetched page.")
+        return
 
-    if not all_tweets:
-        print("\n❌ No tweets found!")
+    if not count:
+        print("\n✅ No new tweets since the last run" if since_id else "\n❌ No tweets found!")
+        checkpoint.clear()
         return
 
-    save_tweets(username, all_tweets)
-    print(f"\n✅ Done! Fetched {len(all_tweets)} tweets from @{username}")
+    store = get_store()
+    if all_tweets is not None and store is not None:
+        store.upsert_raw(username, all_tweets)
+
+    if path:
+        print(f"\n💾 Streamed {count} tweets to {path}")
+    elif OUTPUT_FORMAT == "store" and store is not None:
+        print(f"\n🗄️ Stored {count} tweets in {store.path}")
+    else:
+        save_tweets(username, all_tweets)
+    # Only advance the watermark when nothing between it and the newest tweet was skipped.
+    # Saved before the checkpoint goes, so a failed save leaves the crawl resumable
+    if progress.get("complete"):
+        save_watermark(username, "raw", [newest])
+    checkpoint.clear()
+
+    print(f"\n✅ Done! Fetched {count} tweets from @{username}")
 
 
 if __name__ == "__main__":
-    # Fetch all tweets
-    main("MoghaluGeorge")
-    
-    # Or limit to specific number for testing
-    # main("CyrilRamaphosa", max_tweets=100)
\ No newline at end of file
+    metrics.start_run("tweety")
+    parser = argparse.ArgumentParser(description="Fetch and save a user's tweets.")
+    parser.add_argument("username", nargs="?", default="MoghaluGeorge", help="Twitter username without @")
+    parser.add_argument("--max-tweets", type=int, default=None, help="Maximum tweets to fetch (default: all)")
+    parser.add_argument("--full", action="store_true", help="Ignore the watermark and crawl the whole timeline")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted crawl from its checkpoint")
+    args = parser.parse_args()
+
+    # e.g. python tweety.py CyrilRamaphosa --max-tweets 100
+    main(args.username, max_tweets=args.max_tweets, incremental=not args.full, resume=args.resume)
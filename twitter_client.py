@@ -0,0 +1,342 @@
+import json
+import time
+
+import environ
+
+import metrics
+from compact_format import parse_fields, project
+from tweet_record import TweetRecord
+from key_pool import KeyPool
+from response_cache import CacheMiss, get_response_cache
+from watermarks import tweet_id_int
+
+# ----------------------------------------------------------
+# ⚙️ Load environment variables
+# ----------------------------------------------------------
+env = environ.Env()
+env.read_env()
+
+BASE_URL = env("TWITTER_API_BASE_URL", default="https://api.twitterapi.io")
+LAST_TWEETS_PATH = "/twitter/user/last_tweets"
+FIELDS = parse_fields()
+POOL_SIZE = env.int("TWITTER_POOL_SIZE", default=10)
+HTTP2 = env.bool("TWITTER_HTTP2", default=False)
+
+
+class TwitterAPIError(Exception):
+    """A twitterapi.io request that failed (transport error, non-200, bad JSON or API error)."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# ----------------------------------------------------------
+# 🔌 Pooled twitterapi.io client
+# ----------------------------------------------------------
+class TwitterAPIClient:
+    """
+    One keep-alive connection pool for every twitterapi.io call.
+
+    Requests reuse TCP+TLS connections, ask for gzip, and go through the
+    shared adaptive rate limiter. With several keys every key has its own
+    limiter and each request goes to the least-loaded healthy key, so a 429
+    on one key doesn't stall the others. With http2=True (needs `pip install httpx[http2]`)
+    an httpx client multiplexes requests over HTTP/2 instead. Timeline pages
+    go through the record/replay response cache when TWITTER_CACHE is set.
+
+    Args:
+        api_key: twitterapi.io key, a list of keys, or a KeyPool
+        base_url: API root, e.g. a local stand-in server
+        pool_size: Connections kept open (match the number of worker threads)
+        http2: Use HTTP/2 through httpx when available
+        timeout: Per-request timeout in seconds
+        max_retries: 429 responses retried per request before giving up
+        fields: Top-level tweet fields to keep (None = everything; default from TWEET_FIELDS)
+        cache: ResponseCache for timeline pages (None = the shared one from TWITTER_CACHE, False = none)
+    """
+
+    def __init__(self, api_key, base_url=BASE_URL, pool_size=POOL_SIZE, http2=HTTP2, timeout=30,
+                 max_retries=5, fields=FIELDS, cache=None):
+        self.base_url = base_url.rstrip("/")
+        self.cache = get_response_cache() if cache is None else cache or None
+        self.fields = fields
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.keys = api_key if isinstance(api_key, KeyPool) else KeyPool("twitterapi", api_key, limiters=True)
+        # The key goes on each request (see get), so one session serves the whole pool
+        headers = {"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"}
+
+        self._http2 = False
+        if http2:
+            try:
+                import httpx
+                self._session = httpx.Client(
+                    http2=True,
+                    headers=headers,
+                    timeout=timeout,
+                    limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+                )
+                self._transport_errors = (httpx.HTTPError,)
+                self._http2 = True
+            except ImportError:
+                print("⚠️ httpx[http2] is not installed, falling back to HTTP/1.1 keep-alive")
+
+        if not self._http2:
+            # Imported here so scripts that never build a client don't load requests
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            self._session = requests.Session()
+            self._session.headers.update(headers)
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+            self._transport_errors = (requests.exceptions.RequestException,)
+
+    def close(self):
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, path, params):
+        """
+        GET an API path through the key pool's rate limiters, retrying on 429.
+
+        Returns the final response; raises TwitterAPIError on transport errors
+        or when the API is still rate limiting after max_retries attempts
+        (plus one per extra key).
+        """
+        retries = self.max_retries + len(self.keys) - 1
+        for attempt in range(retries + 1):
+            if attempt:
+                metrics.count("twitter_retries")
+            with metrics.timer("rate_limit_wait"):
+                key = self.keys.acquire()
+            metrics.count("twitter_requests")
+            try:
+                with metrics.timer("http_page"):
+                    response = self._session.get(self.base_url + path, params=params, timeout=self.timeout,
+                                                 headers={"X-API-Key": key.value})
+            except self._transport_errors as e:
+                self.keys.release(key)
+                metrics.count("twitter_errors")
+                raise TwitterAPIError(f"Request failed: {e}") from e
+
+            if response.status_code != 429:
+                self.keys.release(key, response.headers)
+                return response
+
+            metrics.count("twitter_429s")
+            wait = self.keys.release(key, response.headers, rate_limited=True)
+            where = f" on {key.label}" if len(self.keys) > 1 else ""
+            print(f"⏳ Rate limited{where}. Backing off {wait:.0f}s (rate now {key.limiter.rate:.2f} req/s)...")
+
+        raise TwitterAPIError(f"Still rate limited after {retries} retries", 429)
+
+    def last_tweets(self, user, cursor="", include_replies=False, refresh=False):
+        """
+        One page of a user's timeline from /twitter/user/last_tweets.
+
+        A page recorded in the response cache is returned without a request
+        (or any rate-limiter wait); fetched pages are recorded.
+
+        Args:
+            refresh: Fetch the page even if a fresh recording exists
+
+        Returns:
+            The decoded JSON body; tweets are under body["data"]["tweets"]
+        """
+        params = {"userName": user, "includeReplies": include_replies}
+        if cursor:
+            params["cursor"] = cursor
+
+        if self.cache is not None:
+            try:
+                data = self.cache.get(LAST_TWEETS_PATH, params, refresh=refresh)
+            except CacheMiss as e:
+                raise TwitterAPIError(str(e)) from e
+            if data is not None:
+                metrics.count("twitter_cache_hits")
+                print("📼 Status: 200 (recorded)")
+                return data
+
+        response = self.get(LAST_TWEETS_PATH, params)
+        print(f"📡 Status: {response.status_code}")
+
+        if response.status_code != 200:
+            metrics.count("twitter_errors")
+        if response.status_code == 404:
+            raise TwitterAPIError(f"User '@{user}' not found", 404)
+        if response.status_code != 200:
+            raise TwitterAPIError(f"Error {response.status_code}: {response.text[:500]}", response.status_code)
+
+        try:
+            with metrics.timer("json_decode"):
+                data = response.json()
+        except ValueError as e:
+            raise TwitterAPIError(f"JSON decode error: {e}\nResponse text: {response.text[:500]}", 200) from e
+
+        if data.get("status") == "error":
+            raise TwitterAPIError(f"API Error: {data.get('message', 'Unknown error')}", 200)
+        if self.cache is not None:
+            self.cache.put(LAST_TWEETS_PATH, params, response.content)
+        return data
+
+    def latest_tweets(self, user, count=20):
+        """The newest `count` tweets of a user (first page only); [] on error."""
+        try:
+            data = self.last_tweets(user)
+        except TwitterAPIError as e:
+            print(f"❌ Error fetching @{user}: {e}")
+            return []
+
+        tweets = data.get("tweets") or data.get("data", {}).get("tweets")
+        if not tweets:
+            print(f"No tweets found for @{user}. Keys available: {list(data.keys())}")
+            return []
+        return [project(t, self.fields) for t in tweets[:count]]
+
+    # ----------------------------------------------------------
+    # 📄 Cursor pagination
+    # ----------------------------------------------------------
+    def iter_pages(self, user, max_tweets=None, delay=None, since_id=None, progress=None,
+                   checkpoint=None, resume=False, include_replies=False, refresh=False, cancel=None):
+        """
+        Yield a user's tweets one page at a time.
+
+        Args:
+            user: Twitter username (without @)
+            max_tweets: Maximum number of tweets to fetch (None = all)
+            delay: Fixed delay between API calls in seconds (None = adaptive rate limiter only)
+            since_id: Stop paginating once tweets with an id <= since_id show up (incremental crawl)
+            progress: Optional dict; progress["complete"] is set True when the crawl
+                reached the end of the timeline or the since_id watermark, and
+                progress["error"] holds the reason when it stopped on a failure
+            checkpoint: Optional CrawlCheckpoint updated after every page
+            resume: If True, replay the checkpoint's pages and continue from its cursor
+            include_replies: Also return replies
+            refresh: Bypass recorded pages in the response cache (live data only)
+            cancel: Optional threading.Event checked before every page; once set the
+                crawl stops with progress["error"] and leaves the checkpoint untouched
+                (e.g. a queue worker that lost its lease to another worker)
+        """
+        progress = {} if progress is None else progress
+
+        def cancelled():
+            if cancel is not None and cancel.is_set():
+                print("🛑 Crawl cancelled")
+                progress["error"] = "crawl cancelled"
+                return True
+            return False
+
+        if cancelled():
+            return
+        fetched = 0
+        next_cursor = ""
+        page = 0
+
+        if checkpoint is not None:
+            state = checkpoint.load() if resume else None
+            if state:
+                print(f"📌 Resuming from page {state['page'] + 1} ({state['fetched']} tweets already fetched)")
+                # Recorded pages can be empty (e.g. filtered to nothing by the watermark); fresh ones never are
+                yield from ([project(t, self.fields) for t in page] for page in checkpoint.iter_pages() if page)
+                fetched, page, next_cursor = state["fetched"], state["page"], state["next_cursor"]
+                since_id = state["since_id"]
+                if page and not next_cursor:
+                    progress["complete"] = state.get("complete", False)
+                    return
+            else:
+                checkpoint.start(since_id)
+
+        while True:
+            if cancelled():
+                break
+            page += 1
+            print(f"\n📄 Fetching page {page}...")
+
+            try:
+                data = self.last_tweets(user, next_cursor, include_replies, refresh)
+            except TwitterAPIError as e:
+                print(f"❌ {e}")
+                progress["error"] = str(e).splitlines()[0]
+                break
+
+            # Get tweets - they're nested in data.tweets
+            data_obj = data.get("data", {})
+            new_tweets = data_obj.get("tweets", [])
+
+            if not new_tweets:
+                print("⚠️ No tweets in this batch")
+                # Check if this is truly empty or an error
+                if page == 1:
+                    print("\n🔍 Full response for debugging:")
+                    print(json.dumps(data, indent=2)[:1000])
+                break
+
+            # Stop once we reach tweets stored by an earlier run
+            reached_watermark = False
+            if since_id:
+                reached_watermark = tweet_id_int(new_tweets[-1]) <= since_id
+                new_tweets = [t for t in new_tweets if tweet_id_int(t) > since_id]
+
+            print(f"✅ Found {len(new_tweets)} tweets")
+
+            # Check if we've hit the max
+            hit_max = bool(max_tweets) and fetched + len(new_tweets) >= max_tweets
+            if hit_max:
+                new_tweets = new_tweets[:max_tweets - fetched]
+            fetched += len(new_tweets)
+
+            # Check for next page
+            has_next = data.get("has_next_page", False) or data_obj.get("has_next_page", False)
+            next_cursor = data.get("next_cursor", "") or data_obj.get("next_cursor", "")
+            complete = reached_watermark or not has_next
+            done = complete or hit_max or not next_cursor
+
+            if cancelled():
+                break
+            if checkpoint is not None:
+                checkpoint.record_page(new_tweets, "" if done else next_cursor, complete)
+
+            if new_tweets:
+                yield [project(t, self.fields) for t in new_tweets]
+
+            if reached_watermark:
+                print("🔖 Reached tweets from the previous run")
+            elif hit_max:
+                print(f"🎯 Reached max tweets limit ({max_tweets})")
+            elif not has_next:
+                print("✅ No more pages available")
+            elif not next_cursor:
+                print("⚠️ has_next_page=true but no cursor provided")
+
+            if done:
+                progress["complete"] = complete
+                break
+
+            # Optional fixed delay on top of the shared limiter
+            if delay:
+                print(f"⏳ Waiting {delay}s before next request...")
+                time.sleep(delay)
+
+    def iter_tweets(self, user, **kwargs):
+        """Yield tweets one by one across pages (same options as iter_pages)."""
+        for page in self.iter_pages(user, **kwargs):
+            yield from page
+
+    def fetch_all(self, user, records=False, **kwargs):
+        """
+        All tweets of a user as one list (same options as iter_pages).
+
+        Args:
+            records: Return compact TweetRecords instead of the API dicts
+        """
+        if records:
+            return [TweetRecord.from_api(t) for t in self.iter_tweets(user, **kwargs)]
+        return list(self.iter_tweets(user, **kwargs))
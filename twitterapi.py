@@ -1,6 +1,9 @@
-import requests
-
 import environ
+import metrics
+from key_pool import twitter_keys
+from lazy import Lazy
+from twitter_client import TwitterAPIClient
+from tweet_store import get_store
 
 # ----------------------------------------------------------
 # ⚙️ Load environment variables
@@ -8,33 +11,20 @@ import environ
 env = environ.Env()
 env.read_env()
 
-API_KEY = env("TWITTER_API_KEY")
 USERNAME = "officialABAT"
-BASE_URL = "https://api.twitterapi.io/twitter/user/last_tweets"
-
-def get_latest_tweets(username, count=20):
-    headers = {"X-API-Key": API_KEY}
-    params = {"userName": username, "limit": count}
-
-    response = requests.get(BASE_URL, headers=headers, params=params)
 
-    if response.status_code != 200:
-        print(f"Error {response.status_code}: {response.text}")
-        return []
+twitter = Lazy(lambda: TwitterAPIClient(twitter_keys()))
 
-    data = response.json()
-
-    # ✅ tweets may be nested under "data"
-    tweets = data.get("tweets") or data.get("data", {}).get("tweets")
-    if not tweets:
-        print("Unexpected response format. Keys available:", data.keys())
-        return []
-
-    return tweets[:count]
+def get_latest_tweets(username, count=20):
+    return twitter.latest_tweets(username, count)
 
 
 if __name__ == "__main__":
+    metrics.start_run("twitterapi")
     tweets = get_latest_tweets(USERNAME)
+    store = get_store()
+    if store is not None:
+        store.upsert_raw(USERNAME, tweets)
     print(f"\n✅ Last {len(tweets)} tweets from @{USERNAME}:\n")
 
     for i, t in enumerate(tweets, start=1):
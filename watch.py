@@ -0,0 +1,269 @@
+import argparse
+import heapq
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import environ
+
+import metrics
+from cli import read_accounts
+from tweet_output import NDJSONWriter, output_path
+from tweet_store import get_store, parse_created_at
+from watermarks import load_watermark, save_watermark
+
+# ----------------------------------------------------------
+# ⚙️ Load environment variables
+# ----------------------------------------------------------
+env = environ.Env()
+env.read_env()
+
+# Bounds of the per-account polling interval, in seconds
+WATCH_MIN_INTERVAL = env.float("WATCH_MIN_INTERVAL", default=60.0)
+WATCH_MAX_INTERVAL = env.float("WATCH_MAX_INTERVAL", default=3600.0)
+# New tweets we aim to find per poll: the interval is this divided by the account's posting rate
+WATCH_TARGET_NEW = env.float("WATCH_TARGET_NEW", default=2.0)
+# Accounts polled at the same time
+WATCH_WORKERS = env.int("WATCH_WORKERS", default=4)
+# Tweets classified on the first poll of an account (the history before them is left to getalltweets)
+WATCH_SEED_TWEETS = env.int("WATCH_SEED_TWEETS", default=20)
+WATCH_STATE = env("WATCH_STATE", default=os.path.join(".cache", "watch_state.json"))
+
+# Weight of the latest poll in the posting-rate average
+RATE_SMOOTHING = 0.5
+SCOPE = "watch"
+
+
+# ----------------------------------------------------------
+# 📈 Posting-rate schedule
+# ----------------------------------------------------------
+class Schedule:
+    """
+    Per-account posting rate and polling interval, persisted between runs.
+
+    The rate (tweets per second) is a moving average of what each poll
+    found; the next poll is due after WATCH_TARGET_NEW tweets are expected,
+    clamped to [min_interval, max_interval]. Quiet accounts therefore drift
+    towards max_interval and busy ones towards min_interval.
+
+    Args:
+        path: JSON state file
+        min_interval / max_interval: Polling interval bounds in seconds
+        target_new: New tweets expected per poll
+    """
+
+    def __init__(self, path=WATCH_STATE, min_interval=WATCH_MIN_INTERVAL, max_interval=WATCH_MAX_INTERVAL,
+                 target_new=WATCH_TARGET_NEW):
+        self.path = path
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_new = target_new
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.accounts = json.load(f)
+        except FileNotFoundError:
+            self.accounts = {}
+
+    def interval_for(self, rate):
+        if rate <= 0:
+            return self.max_interval
+        return min(self.max_interval, max(self.min_interval, self.target_new / rate))
+
+    def get(self, username):
+        with self._lock:
+            return dict(self.accounts.get(username.lower()) or {})
+
+    def record_seed(self, username, tweets, now=None):
+        """Initial rate from the time span of an account's newest tweets; returns the interval."""
+        now = time.time() if now is None else now
+        stamps = sorted(filter(None, (parse_created_at(t.get("createdAt")) for t in tweets)))
+        rate = (len(stamps) - 1) / (stamps[-1] - stamps[0]) if len(stamps) > 1 and stamps[-1] > stamps[0] else 0.0
+        return self._update(username, rate, now)
+
+    def record_poll(self, username, new_count, now=None):
+        """Fold one poll's result into the rate; returns the interval until the next poll."""
+        now = time.time() if now is None else now
+        state = self.get(username)
+        elapsed = now - state.get("last_poll", now)
+        if elapsed <= 0:
+            return self._update(username, state.get("rate", 0.0), now)
+        observed = new_count / elapsed
+        rate = RATE_SMOOTHING * observed + (1 - RATE_SMOOTHING) * state.get("rate", observed)
+        return self._update(username, rate, now)
+
+    def record_error(self, username):
+        """Back off after a failed poll (double the interval, rate unchanged)."""
+        state = self.get(username)
+        interval = min(self.max_interval, max(self.min_interval, state.get("interval", self.min_interval) * 2))
+        with self._lock:
+            self.accounts.setdefault(username.lower(), {})["interval"] = interval
+        return interval
+
+    def _update(self, username, rate, now):
+        interval = self.interval_for(rate)
+        with self._lock:
+            self.accounts[username.lower()] = {"rate": rate, "interval": interval, "last_poll": now}
+        return interval
+
+    def save(self):
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with self._lock:
+            payload = json.dumps(self.accounts, indent=2, sort_keys=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp, self.path)
+
+
+# ----------------------------------------------------------
+# 👀 Watcher
+# ----------------------------------------------------------
+class Watcher:
+    """
+    Poll accounts on their own schedules and classify only their new tweets.
+
+    A heap of (due time, account) decides who is polled next; up to
+    `workers` accounts are polled at once. Each poll reads last_tweets down
+    to the account's "watch" watermark, classifies what is new, stores it
+    and appends health hits to one NDJSON file.
+
+    Args:
+        accounts: Usernames without @
+        workers: Accounts polled concurrently
+        schedule: Schedule instance (default: loaded from WATCH_STATE)
+    """
+
+    def __init__(self, accounts, workers=WATCH_WORKERS, schedule=None):
+        self.accounts = accounts
+        self.workers = workers
+        self.schedule = schedule or Schedule()
+        self.found = 0
+        self._stream = None
+        self._stream_lock = threading.Lock()
+
+    def poll(self, username):
+        """Fetch and classify an account's new tweets; returns seconds until its next poll."""
+        from getalltweets import classify_tweets, health_record, twitter
+
+        mark = load_watermark(username, SCOPE)
+        since_id = int(mark["tweet_id"]) if mark else None
+        progress = {}
+        tweets = []
+        # refresh: watch only ever wants live pages, however deep the poll goes
+        for page in twitter.iter_pages(username, since_id=since_id, progress=progress, refresh=True,
+                                       max_tweets=None if since_id else WATCH_SEED_TWEETS):
+            tweets.extend(page)
+        metrics.count("watch_polls")
+
+        if progress.get("error"):
+            metrics.count("watch_errors")
+            interval = self.schedule.record_error(username)
+            print(f"⚠️ @{username}: {progress['error']} (retrying in {interval:.0f}s)")
+            return interval
+
+        candidates = [t for t in tweets if t.get("text")]
+        verdicts = classify_tweets(candidates) if candidates else []
+        store = get_store()
+        if store is not None and candidates:
+            store.upsert_raw(username, candidates, verdicts)
+
+        hits = [health_record(username, t) for t, is_health in zip(candidates, verdicts) if is_health]
+        if hits:
+            with self._stream_lock:
+                if self._stream is None:
+                    self._stream = NDJSONWriter(output_path("watch", "health_tweets"))
+                self._stream.write_many(hits)
+                self._stream.flush_page()
+                self.found += len(hits)
+        for hit in hits:
+            print(f"✅ @{username} [{hit['tweet_id']}] Health-related!")
+
+        # Only advance the watermark when the poll reached it (or on the seed poll, which is capped on
+        # purpose); a poll cut short mid-timeline leaves a gap the next poll must still read
+        if tweets and (progress.get("complete") or since_id is None):
+            save_watermark(username, SCOPE, tweets)
+        metrics.count("watch_new_tweets", len(tweets))
+        interval = (self.schedule.record_poll(username, len(tweets)) if since_id
+                    else self.schedule.record_seed(username, tweets))
+        self.schedule.save()
+        print(f"👀 @{username}: {len(tweets)} new, {len(hits)} health-related, next poll in {interval:.0f}s")
+        return interval
+
+    def _safe_poll(self, username):
+        try:
+            return self.poll(username)
+        except Exception as e:
+            metrics.count("watch_errors")
+            print(f"⚠️ @{username}: {e}")
+            return self.schedule.record_error(username)
+
+    def run(self, duration=None):
+        """
+        Poll until interrupted (or for `duration` seconds).
+
+        Accounts already in the state file resume their schedule; new ones are
+        spread over the first minimum interval so they don't all start at once.
+        """
+        now = time.time()
+        deadline = now + duration if duration else None
+        heap = []
+        for username in self.accounts:
+            state = self.schedule.get(username)
+            if state.get("last_poll"):
+                due = state["last_poll"] + state.get("interval", self.schedule.min_interval)
+            else:
+                due = now + random.uniform(0, self.schedule.min_interval)
+            heapq.heappush(heap, (due, username))
+
+        print(f"👀 Watching {len(self.accounts)} accounts with {self.workers} workers (Ctrl+C to stop)")
+        running = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                while deadline is None or time.time() < deadline:
+                    now = time.time()
+                    while heap and heap[0][0] <= now and len(running) < self.workers:
+                        _, username = heapq.heappop(heap)
+                        running[pool.submit(self._safe_poll, username)] = username
+
+                    timeout = max(heap[0][0] - now, 0) if heap and len(running) < self.workers else None
+                    if deadline is not None:
+                        timeout = min(deadline - now, timeout) if timeout is not None else deadline - now
+                    if not running:
+                        time.sleep(max(timeout or 0, 0))
+                        continue
+
+                    done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        username = running.pop(future)
+                        heapq.heappush(heap, (time.time() + future.result(), username))
+        except KeyboardInterrupt:
+            print("\n👋 Stopping after the polls in flight...")
+        finally:
+            self.schedule.save()
+            if self._stream is not None:
+                self._stream.close()
+                print(f"\n💾 {self.found} health-related tweets streamed to {self._stream.path}")
+
+
+if __name__ == "__main__":
+    metrics.start_run("watch")
+    parser = argparse.ArgumentParser(description="Continuously watch accounts and classify their new tweets.")
+    parser.add_argument("usernames", nargs="*", help="Twitter usernames without @")
+    parser.add_argument("--accounts-file", help="File with one username per line")
+    parser.add_argument("--workers", type=int, default=WATCH_WORKERS)
+    parser.add_argument("--duration", type=float, default=None, help="Stop after this many seconds")
+    args = parser.parse_args()
+
+    accounts = read_accounts(args.usernames, args.accounts_file)
+    if not accounts:
+        parser.error("give usernames or --accounts-file")
+
+    # e.g. python watch.py WilliamsRuto JoeBiden
+    #      python watch.py --accounts-file accounts.txt --workers 8
+    Watcher(accounts, workers=args.workers).run(duration=args.duration)
@@ -0,0 +1,105 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+import environ
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialized
+    fcntl = None
+
+# ----------------------------------------------------------
+# ⚙️ Load environment variables
+# ----------------------------------------------------------
+env = environ.Env()
+env.read_env()
+
+WATERMARK_PATH = env("WATERMARK_PATH", default=os.path.join("data", "watermarks.json"))
+
+_lock = threading.Lock()
+
+
+# ----------------------------------------------------------
+# 🔖 Per-account high-water marks
+# ----------------------------------------------------------
+def _load_all(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+@contextmanager
+def _file_lock(path):
+    """Serialize read-modify-write of the watermark file across threads and worker processes."""
+    with _lock:
+        if fcntl is None:
+            yield
+            return
+        with open(f"{path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _key(username, scope):
+    return f"{scope}:{username.lower()}"
+
+
+def tweet_id_int(tweet):
+    """Numeric tweet id (snowflake ids grow with time), or 0 when missing."""
+    try:
+        return int(tweet.get("id") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def load_watermark(username, scope, path=WATERMARK_PATH):
+    """
+    Newest tweet already stored for an account, or None on a first crawl.
+
+    Args:
+        username: Twitter username without @
+        scope: Which pipeline stored it, e.g. "raw" (tweety) or "health" (getalltweets)
+
+    Returns:
+        {"tweet_id": "...", "created_at": "..."} or None
+    """
+    with _lock:
+        return _load_all(path).get(_key(username, scope))
+
+
+def save_watermark(username, scope, tweets, path=WATERMARK_PATH):
+    """
+    Advance an account's watermark to the newest of `tweets` (never moves it backwards).
+
+    Safe with several worker processes on one host: the update holds an
+    exclusive lock on `<path>.lock` and goes through a temp file unique to
+    the process and thread, so readers only ever see a complete file.
+    """
+    newest = max(tweets, key=tweet_id_int, default=None)
+    if newest is None or not tweet_id_int(newest):
+        return None
+
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with _file_lock(path):
+        marks = _load_all(path)
+        key = _key(username, scope)
+        current = marks.get(key)
+        if current and int(current["tweet_id"]) >= tweet_id_int(newest):
+            return current
+
+        marks[key] = {"tweet_id": str(newest.get("id")), "created_at": newest.get("createdAt")}
+
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(marks, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, path)
+        return marks[key]
@@ -0,0 +1,485 @@
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import environ
+
+from cli import read_accounts
+
+# ----------------------------------------------------------
+# ⚙️ Load environment variables
+# ----------------------------------------------------------
+env = environ.Env()
+env.read_env()
+
+# Queue location: a SQLite path (one host, any number of processes) or http://host:port of `work_queue.py serve`
+WORK_QUEUE = env("WORK_QUEUE", default=os.path.join(".cache", "work_queue.sqlite3"))
+# A worker that stops renewing its lease for this long is presumed dead and its task is handed out again
+LEASE_SECONDS = env.float("WORK_QUEUE_LEASE", default=300.0)
+MAX_ATTEMPTS = env.int("WORK_QUEUE_MAX_ATTEMPTS", default=3)
+
+JOBS = ("classify", "fetch")
+# Checkpoint scope of each job (see getalltweets.main / tweety.main)
+JOB_SCOPES = {"classify": "health", "fetch": "raw"}
+
+
+# ----------------------------------------------------------
+# 🗄️ SQLite backend
+# ----------------------------------------------------------
+class SQLiteQueue:
+    """
+    Leased task queue in a SQLite file, safe for many processes on one host.
+
+    A task is one account crawl for one job. lease() hands the oldest
+    pending task (or one whose lease expired) to a worker together with a
+    fresh lease token; heartbeat() extends the lease while the crawl runs;
+    complete()/fail() only count when the token still matches, so a worker
+    that lost its lease can't overwrite the result of the one that took over.
+    Crashed crawls resume from their checkpoint on the next lease.
+
+    Args:
+        path: SQLite file (created on first use)
+    """
+
+    def __init__(self, path=WORK_QUEUE):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job TEXT NOT NULL,
+                account TEXT NOT NULL,
+                options TEXT NOT NULL DEFAULT '{}',
+                status TEXT NOT NULL DEFAULT 'pending',
+                lease_token TEXT,
+                lease_owner TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                last_error TEXT,
+                updated_at REAL NOT NULL,
+                UNIQUE (job, account)
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, lease_expires)")
+
+    def _transaction(self, work):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(self._db, time.time())
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            return result
+
+    def enqueue(self, job, accounts, options=None, max_attempts=MAX_ATTEMPTS, reset=False):
+        """
+        Add one task per account; returns how many were new.
+
+        Accounts already queued for the job are left alone unless `reset`
+        puts them back to pending (e.g. for the next daily run).
+        """
+        payload = json.dumps(options or {})
+
+        def work(db, now):
+            added = 0
+            for account in accounts:
+                cursor = db.execute(
+                    "INSERT OR IGNORE INTO tasks (job, account, options, max_attempts, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (job, account, payload, max_attempts, now),
+                )
+                added += cursor.rowcount
+                if reset and not cursor.rowcount:
+                    db.execute(
+                        "UPDATE tasks SET status = 'pending', attempts = 0, last_error = NULL, options = ?, "
+                        "lease_token = NULL, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                        "WHERE job = ? AND account = ? AND status != 'leased'",
+                        (payload, now, job, account),
+                    )
+            return added
+
+        return self._transaction(work)
+
+    def lease(self, owner, lease_seconds=LEASE_SECONDS, job=None):
+        """
+        Take the next runnable task, or None when there is nothing to do right now.
+
+        Returns:
+            {"id", "job", "account", "options", "token", "attempts"}
+        """
+        def work(db, now):
+            # Leases that ran out past their last attempt are given up on
+            db.execute(
+                "UPDATE tasks SET status = 'failed', last_error = COALESCE(last_error, 'lease expired'), "
+                "updated_at = ? WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts",
+                (now, now),
+            )
+            sql = ("SELECT * FROM tasks WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?))"
+                   + (" AND job = ?" if job else "") + " ORDER BY attempts, id LIMIT 1")
+            row = db.execute(sql, (now, job) if job else (now,)).fetchone()
+            if row is None:
+                return None
+            token = uuid.uuid4().hex
+            db.execute(
+                "UPDATE tasks SET status = 'leased', lease_token = ?, lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (token, owner, now + lease_seconds, now, row["id"]),
+            )
+            return {"id": row["id"], "job": row["job"], "account": row["account"],
+                    "options": json.loads(row["options"]), "token": token, "attempts": row["attempts"] + 1}
+
+        return self._transaction(work)
+
+    def heartbeat(self, task_id, token, lease_seconds=LEASE_SECONDS):
+        """Extend a lease; False when it was lost (expired and taken over by someone else)."""
+        def work(db, now):
+            return db.execute(
+                "UPDATE tasks SET lease_expires = ?, updated_at = ? "
+                "WHERE id = ? AND lease_token = ? AND status = 'leased'",
+                (now + lease_seconds, now, task_id, token),
+            ).rowcount == 1
+
+        return self._transaction(work)
+
+    def complete(self, task_id, token):
+        """Mark a leased task done; False when the lease was lost."""
+        def work(db, now):
+            return db.execute(
+                "UPDATE tasks SET status = 'done', lease_token = NULL, lease_expires = NULL, last_error = NULL, "
+                "updated_at = ? WHERE id = ? AND lease_token = ? AND status = 'leased'",
+                (now, task_id, token),
+            ).rowcount == 1
+
+        return self._transaction(work)
+
+    def fail(self, task_id, token, error):
+        """Give a task back after an error: pending again, or failed once out of attempts."""
+        def work(db, now):
+            return db.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END, "
+                "lease_token = NULL, lease_owner = NULL, lease_expires = NULL, last_error = ?, updated_at = ? "
+                "WHERE id = ? AND lease_token = ? AND status = 'leased'",
+                (str(error)[:500], now, task_id, token),
+            ).rowcount == 1
+
+        return self._transaction(work)
+
+    def retry_failed(self, job=None):
+        """Put failed tasks back to pending with fresh attempts; returns how many."""
+        def work(db, now):
+            sql = "UPDATE tasks SET status = 'pending', attempts = 0, updated_at = ? WHERE status = 'failed'"
+            return db.execute(sql + (" AND job = ?" if job else ""), (now, job) if job else (now,)).rowcount
+
+        return self._transaction(work)
+
+    def stats(self):
+        """{"pending": n, "leased": n, "done": n, "failed": n} plus the failed tasks' errors."""
+        with self._lock:
+            counts = dict(self._db.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+            failed = [dict(row) for row in self._db.execute(
+                "SELECT job, account, attempts, last_error FROM tasks WHERE status = 'failed' ORDER BY id")]
+        summary = {status: counts.get(status, 0) for status in ("pending", "leased", "done", "failed")}
+        summary["failed_tasks"] = failed
+        return summary
+
+
+# ----------------------------------------------------------
+# 🌐 HTTP backend (several hosts, one queue)
+# ----------------------------------------------------------
+QUEUE_METHODS = ("enqueue", "lease", "heartbeat", "complete", "fail", "retry_failed", "stats")
+
+
+class _QueueHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        method = self.path.strip("/")
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            if method not in QUEUE_METHODS:
+                raise ValueError(f"unknown method {method!r}")
+            kwargs = json.loads(self.rfile.read(length) or b"{}")
+            status, body = 200, {"result": getattr(self.server.queue, method)(**kwargs)}
+        except Exception as e:
+            status, body = 400, {"error": str(e)}
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class QueueServer(ThreadingHTTPServer):
+    """
+    Expose a SQLiteQueue over HTTP so workers on other hosts share it.
+
+    Every queue method is a POST /<method> with its keyword arguments as a
+    JSON body; the SQLite file stays on this host only.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, queue, host="127.0.0.1", port=8765):
+        super().__init__((host, port), _QueueHandler)
+        self.queue = queue
+
+
+class HTTPQueue:
+    """Client for QueueServer with the same methods as SQLiteQueue."""
+
+    def __init__(self, url, timeout=30):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _call(self, method, **kwargs):
+        import urllib.error
+        import urllib.request
+
+        request = urllib.request.Request(f"{self.url}/{method}", data=json.dumps(kwargs).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())["result"]
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(json.loads(e.read() or b"{}").get("error", str(e))) from None
+
+    def __getattr__(self, name):
+        if name not in QUEUE_METHODS:
+            raise AttributeError(name)
+        return lambda **kwargs: self._call(name, **kwargs)
+
+
+BACKENDS = {
+    "sqlite": SQLiteQueue,
+    "http": HTTPQueue,
+    "https": HTTPQueue,
+}
+
+
+def register_backend(scheme, factory):
+    """Plug in another queue (e.g. redis://...): `factory(location)` must provide the SQLiteQueue methods."""
+    BACKENDS[scheme] = factory
+
+
+def open_queue(location=WORK_QUEUE):
+    """Queue for a location: "http://host:port", "<scheme>://..." of a registered backend, or a SQLite path."""
+    scheme, sep, rest = location.partition("://")
+    if not sep:
+        return SQLiteQueue(location)
+    if scheme not in BACKENDS:
+        raise ValueError(f"No work-queue backend for {scheme}:// (known: {', '.join(sorted(BACKENDS))})")
+    return BACKENDS[scheme](rest if scheme == "sqlite" else location)
+
+
+# ----------------------------------------------------------
+# 👷 Workers
+# ----------------------------------------------------------
+def run_task(task, cancel=None):
+    """
+    Crawl one account; returns None on success or the reason it is unfinished.
+
+    `cancel` (a threading.Event) stops the crawl between pages without
+    touching its checkpoint, which by then belongs to the next lease holder.
+
+    The crawl always resumes from the account's checkpoint, so a task
+    re-leased after a crash continues from its last page; watermarks and the
+    tweet store's upserts keep re-fetched pages from producing duplicates.
+    Checkpoints live in CHECKPOINT_DIR, so workers on several hosts should
+    share it (e.g. a network mount) to resume each other's crawls rather
+    than restart them from the first page.
+    """
+    from checkpoints import CrawlCheckpoint
+
+    options = task["options"]
+    account = task["account"]
+    if task["job"] == "classify":
+        import getalltweets
+
+        getalltweets.main(account, max_tweets=options.get("max_tweets"), incremental=not options.get("full"),
+                          resume=True, cancel=cancel)
+    elif task["job"] == "fetch":
+        import tweety
+
+        tweety.main(account, max_tweets=options.get("max_tweets"), incremental=not options.get("full"),
+                    resume=True, cancel=cancel)
+    else:
+        return f"unknown job {task['job']!r}"
+
+    if cancel is not None and cancel.is_set():
+        return "crawl cancelled"
+    # Every finished crawl clears its checkpoint; one left behind means it stopped early
+    if CrawlCheckpoint(account, JOB_SCOPES[task["job"]]).exists():
+        return "crawl stopped early (checkpoint kept for the next attempt)"
+    return None
+
+
+def _heartbeat(queue, task, lease_seconds, stop, lost):
+    """Renew the lease until `stop`; on losing it, set `lost` so the crawl is cancelled."""
+    while not stop.wait(lease_seconds / 3):
+        try:
+            if not queue.heartbeat(task_id=task["id"], token=task["token"], lease_seconds=lease_seconds):
+                print(f"⚠️ Lost the lease on @{task['account']}; another worker has it now, stopping the crawl")
+                lost.set()
+                return
+        except Exception as e:
+            print(f"⚠️ Heartbeat failed for @{task['account']}: {e}")
+
+
+def worker(location=WORK_QUEUE, job=None, lease_seconds=LEASE_SECONDS, wait=False, name=None):
+    """
+    Lease and run tasks until the queue is empty (or forever with wait=True).
+
+    Args:
+        location: Queue location (see open_queue)
+        job: Only this job ("classify" / "fetch"); None = any
+        lease_seconds: Lease length; renewed every third of it while a crawl runs
+        wait: Keep polling for new tasks instead of exiting once none are pending or leased
+        name: Worker id shown in the queue (default: host:pid)
+
+    Returns:
+        Number of tasks finished by this worker
+    """
+    queue = open_queue(location)
+    name = name or f"{socket.gethostname()}:{os.getpid()}"
+    finished = 0
+    while True:
+        task = queue.lease(owner=name, lease_seconds=lease_seconds, job=job)
+        if task is None:
+            # Tasks still leased elsewhere may come back if their worker died, so only an idle queue ends the run
+            if not wait and not queue.stats()["leased"]:
+                return finished
+            time.sleep(min(5.0, lease_seconds / 3))
+            continue
+
+        print(f"👷 [{name}] {task['job']} @{task['account']} (attempt {task['attempts']})")
+        stop = threading.Event()
+        lost = threading.Event()
+        beat = threading.Thread(target=_heartbeat, args=(queue, task, lease_seconds, stop, lost), daemon=True)
+        beat.start()
+        try:
+            error = run_task(task, cancel=lost)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            stop.set()
+            beat.join()
+
+        if lost.is_set():
+            # The task and its checkpoint belong to the new holder now
+            print(f"⚠️ [{name}] @{task['account']} abandoned after its lease was lost")
+        elif error is None and queue.complete(task_id=task["id"], token=task["token"]):
+            finished += 1
+            print(f"✅ [{name}] @{task['account']} done")
+        elif error is None:
+            print(f"⚠️ [{name}] @{task['account']} finished after its lease was lost; result kept by the new holder")
+        else:
+            queue.fail(task_id=task["id"], token=task["token"], error=error)
+            print(f"❌ [{name}] @{task['account']}: {error}")
+
+
+def _worker_process(location, job, lease_seconds, wait, index):
+    import metrics
+
+    metrics.start_run(f"worker-{index}")
+    worker(location, job, lease_seconds, wait)
+
+
+def run_workers(processes, location=WORK_QUEUE, job=None, lease_seconds=LEASE_SECONDS, wait=False):
+    """Start `processes` worker processes on this host and wait for them."""
+    procs = [multiprocessing.Process(target=_worker_process, args=(location, job, lease_seconds, wait, i))
+             for i in range(processes)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+
+
+def print_stats(queue):
+    stats = queue.stats()
+    print(f"📋 pending {stats['pending']}, leased {stats['leased']}, done {stats['done']}, failed {stats['failed']}")
+    for task in stats["failed_tasks"]:
+        print(f"   ❌ {task['job']} @{task['account']} after {task['attempts']} attempts: {task['last_error']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared work queue for account crawls.")
+    parser.add_argument("--queue", default=WORK_QUEUE, help="SQLite path or http://host:port")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_enqueue = sub.add_parser("enqueue", help="Queue accounts")
+    p_enqueue.add_argument("usernames", nargs="*")
+    p_enqueue.add_argument("--accounts-file")
+    p_enqueue.add_argument("--influencers", action="store_true", help="Queue influencertweetscrape.USERNAMES")
+    p_enqueue.add_argument("--job", choices=JOBS, default="classify")
+    p_enqueue.add_argument("--max-tweets", type=int, default=None)
+    p_enqueue.add_argument("--full", action="store_true", help="Crawl whole timelines, ignoring watermarks")
+    p_enqueue.add_argument("--reset", action="store_true", help="Re-run accounts that are already done")
+
+    p_work = sub.add_parser("work", help="Run workers on this host")
+    p_work.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    p_work.add_argument("--job", choices=JOBS, default=None)
+    p_work.add_argument("--lease", type=float, default=LEASE_SECONDS, help="Lease length in seconds")
+    p_work.add_argument("--wait", action="store_true", help="Keep waiting for new tasks")
+
+    p_serve = sub.add_parser("serve", help="Share a SQLite queue with other hosts over HTTP")
+    p_serve.add_argument("--host", default="127.0.0.1")
+    p_serve.add_argument("--port", type=int, default=8765)
+
+    sub.add_parser("status", help="Show task counts and failures")
+    sub.add_parser("retry", help="Put failed tasks back in the queue")
+    args = parser.parse_args()
+
+    # e.g. python work_queue.py enqueue --influencers
+    #      python work_queue.py work --processes 8
+    #      python work_queue.py serve --host 0.0.0.0   (then WORK_QUEUE=http://<host>:8765 on the other machines)
+    if args.command == "enqueue":
+        accounts = read_accounts(args.usernames, args.accounts_file)
+        if args.influencers:
+            from influencertweetscrape import USERNAMES
+
+            accounts = read_accounts(accounts + list(USERNAMES))
+        if not accounts:
+            parser.error("give usernames, --accounts-file or --influencers")
+        queue = open_queue(args.queue)
+        added = queue.enqueue(job=args.job, accounts=accounts,
+                              options={"max_tweets": args.max_tweets, "full": args.full}, reset=args.reset)
+        print(f"📥 Queued {added} new {args.job} tasks ({len(accounts) - added} already known)")
+        print_stats(queue)
+    elif args.command == "work":
+        run_workers(args.processes, args.queue, args.job, args.lease, args.wait)
+        print_stats(open_queue(args.queue))
+    elif args.command == "serve":
+        if "://" in args.queue:
+            parser.error("serve needs a local SQLite queue")
+        server = QueueServer(SQLiteQueue(args.queue), args.host, args.port)
+        print(f"🌐 Serving {args.queue} on http://{args.host}:{server.server_address[1]} (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n👋 Stopped")
+    elif args.command == "status":
+        print_stats(open_queue(args.queue))
+    else:
+        print(f"🔁 {open_queue(args.queue).retry_failed()} failed tasks queued again")